@@ -0,0 +1,115 @@
+# async_groq_client.py
+# asyncio front-end for groq_client so independent requests can overlap.
+
+import os
+import asyncio
+import weakref
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from groq_client import call_groq
+
+MAX_IN_FLIGHT = int(os.getenv("AITALK_MAX_IN_FLIGHT", "4"))
+# call_groq enforces the deadline itself; this is only how much longer we wait for it to do so
+DEADLINE_GRACE_SECONDS = 2.0
+
+
+class AsyncGroqClient:
+    """
+    Runs call_groq on a bounded worker pool so coroutines can fan out without
+    flooding the API. Requests share the pooled session, model map, cache and
+    error handling of the synchronous client; failures come back as None.
+    """
+
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT, deadline=None):
+        self.max_in_flight = max_in_flight
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="aitalk-groq")
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _get_semaphore(self):
+        # One per event loop: an asyncio.Semaphore only works on the loop it was first used on
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._semaphores:
+                self._semaphores[loop] = asyncio.Semaphore(self.max_in_flight)
+            return self._semaphores[loop]
+
+    async def call(self, prompt, task_type="create_project", system_prompt="You are a helpful assistant.",
+                   model=None, deadline=None):
+        """
+        Await one completion. deadline is in seconds and covers time spent
+        waiting for a free slot as well as the request itself. What is left of
+        it is passed to call_groq, which gives up by then; a worker thread
+        cannot be stopped from outside, so its slot is only freed when the
+        thread has finished, even if the caller stopped waiting.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        semaphore = self._get_semaphore()
+        await semaphore.acquire()
+        remaining = None if deadline is None else deadline - (loop.time() - started)
+        if remaining is not None and remaining <= 0:
+            semaphore.release()
+            print(f"⏱️ Groq request ({task_type}) timed out waiting for a free slot.")
+            return None
+        request = functools.partial(call_groq, prompt, task_type=task_type, system_prompt=system_prompt,
+                                    model=model, timeout=remaining)
+        future = loop.run_in_executor(self._executor, request)
+        future.add_done_callback(lambda _future: semaphore.release())
+        try:
+            # shield: cancelling or timing out this await must not mark the future done while the thread runs
+            return await asyncio.wait_for(asyncio.shield(future),
+                                          None if remaining is None else remaining + DEADLINE_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            print(f"⏱️ Groq request ({task_type}) exceeded its {deadline:.1f}s deadline.")
+            return None
+
+    async def gather(self, requests):
+        """
+        Run many calls concurrently (each a dict of call() keyword arguments)
+        and return their results in input order. If the gather is cancelled
+        or one call raises, every call still pending is cancelled too.
+        """
+        tasks = [asyncio.ensure_future(self.call(**request)) for request in requests]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+_async_client = None
+
+
+def get_async_client():
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncGroqClient()
+    return _async_client
+
+
+async def acall_groq(prompt, task_type="create_project", system_prompt="You are a helpful assistant.",
+                     model=None, deadline=None):
+    return await get_async_client().call(prompt, task_type=task_type, system_prompt=system_prompt,
+                                         model=model, deadline=deadline)
+
+
+def gather_groq(requests, max_in_flight=MAX_IN_FLIGHT, deadline=None):
+    """Synchronous entry point: run the requests concurrently and return results in input order."""
+    async def run():
+        async with AsyncGroqClient(max_in_flight=max_in_flight, deadline=deadline) as client:
+            return await client.gather(requests)
+    return asyncio.run(run())
@@ -0,0 +1,170 @@
+# build_manifest.py
+# Per-project record of a --create-project build, so an interrupted build can be resumed.
+#
+# Stored as .aitalk-build.json in the project directory and rewritten (atomically)
+# every time a file finishes, so at most the files in flight are lost on a crash.
+# The post-generation steps (git commit, npm install, lockfile commit) are recorded
+# too, so a resumed build does not repeat the ones that already succeeded.
+
+import os
+import json
+import time
+import hashlib
+import threading
+from system_utils import atomic_write
+
+BUILD_MANIFEST_NAME = ".aitalk-build.json"
+MANIFEST_VERSION = 1
+
+
+def description_hash(description):
+    return hashlib.sha256(" ".join(description.split()).encode("utf-8")).hexdigest()
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, project_dir, data):
+        self.project_dir = project_dir
+        self.path = os.path.join(project_dir, BUILD_MANIFEST_NAME)
+        self.data = data
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, project_dir, description, file_list, mode="files", project_name=None):
+        now = time.time()
+        manifest = cls(project_dir, {
+            "version": MANIFEST_VERSION,
+            "description": description,
+            "description_hash": description_hash(description),
+            "mode": mode,
+            "project_name": project_name or os.path.basename(project_dir),
+            "created": now,
+            "updated": now,
+            "file_list": list(file_list),
+            "files": {rel_path: {"status": "pending"} for rel_path in file_list},
+            "steps": {},
+        })
+        manifest.flush()
+        return manifest
+
+    @classmethod
+    def load(cls, project_dir):
+        """Return the project's manifest, or None if it has none (or it is unreadable)."""
+        path = os.path.join(project_dir, BUILD_MANIFEST_NAME)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable build manifest {path}: {e}")
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            print(f"⚠️ Ignoring build manifest {path}: unsupported version {data.get('version')}.")
+            return None
+        return cls(project_dir, data)
+
+    @property
+    def description(self):
+        return self.data["description"]
+
+    @property
+    def file_list(self):
+        return self.data["file_list"]
+
+    def flush(self):
+        with self._lock:
+            self.data["updated"] = time.time()
+            atomic_write(self.path, json.dumps(self.data, indent=2))
+
+    @property
+    def project_name(self):
+        return self.data.get("project_name") or os.path.basename(self.project_dir)
+
+    def mark_done(self, rel_path, written_content, source="llm"):
+        """Record a file as generated; written_content is what ended up on disk, source "llm" or a template version."""
+        with self._lock:
+            self.data["files"][rel_path] = {
+                "status": "done",
+                "source": source,
+                "sha256": content_hash(written_content),
+                "bytes": len(written_content.encode("utf-8")),
+                "generated": time.time(),
+            }
+        self.flush()
+
+    def record_update(self, change, written):
+        """Record an --update-project run; written is {rel_path: content on disk}, new files included."""
+        with self._lock:
+            for rel_path in written:
+                if rel_path not in self.data["file_list"]:
+                    self.data["file_list"].append(rel_path)
+            self.data.setdefault("updates", []).append(
+                {"change": change, "files": sorted(written), "time": time.time()})
+        for rel_path, content in written.items():
+            self.mark_done(rel_path, content, source="update")
+
+    def mark_failed(self, rel_path, error):
+        with self._lock:
+            self.data["files"][rel_path] = {"status": "failed", "error": str(error)[:500]}
+        self.flush()
+
+    def mark_step(self, name, fingerprint=None):
+        """Record a post-generation step ("git", "install", "lockfile") as done, for the given input hash."""
+        with self._lock:
+            self.data.setdefault("steps", {})[name] = {"status": "done", "fingerprint": fingerprint,
+                                                       "time": time.time()}
+        self.flush()
+
+    def step_done(self, name, fingerprint=None):
+        """Whether the step succeeded before (for the same input hash, when one is given)."""
+        entry = self.data.get("steps", {}).get(name, {})
+        return entry.get("status") == "done" and (fingerprint is None or entry.get("fingerprint") == fingerprint)
+
+    def is_complete(self):
+        return all(entry.get("status") == "done" for entry in self.data["files"].values())
+
+    def completed_files(self):
+        """
+        {rel_path: content} for files recorded as done that are still on disk.
+        Files that disappeared go back to pending; files edited since are kept as edited.
+        """
+        files = {}
+        for rel_path in self.file_list:
+            entry = self.data["files"].get(rel_path, {})
+            if entry.get("status") != "done":
+                continue
+            file_path = os.path.join(self.project_dir, rel_path)
+            try:
+                with open(file_path, "r") as f:
+                    content = f.read()
+            except OSError:
+                print(f"⚠️ {rel_path} is missing on disk; it will be generated again.")
+                entry["status"] = "pending"
+                continue
+            if content_hash(content) != entry.get("sha256"):
+                print(f"⚠️ {rel_path} changed since it was generated; keeping your version.")
+            files[rel_path] = content
+        return files
+
+
+def find_unfinished_builds(description, search_dir=None):
+    """Project directories under search_dir holding an incomplete build of the same description."""
+    search_dir = search_dir or os.getcwd()
+    wanted = description_hash(description)
+    found = []
+    try:
+        names = sorted(os.listdir(search_dir))
+    except OSError:
+        return found
+    for name in names:
+        project_dir = os.path.join(search_dir, name)
+        if not os.path.isfile(os.path.join(project_dir, BUILD_MANIFEST_NAME)):
+            continue
+        manifest = BuildManifest.load(project_dir)
+        if manifest and manifest.data.get("description_hash") == wanted and not manifest.is_complete():
+            found.append(project_dir)
+    return found
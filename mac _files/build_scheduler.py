@@ -0,0 +1,134 @@
+# build_scheduler.py
+# Dependency-ordered, concurrent file generation for --create-project.
+#
+# Files are ranked into layers (package.json, assets, shared modules, components,
+# pages, App, entry point, tests). A file depends only on files in lower layers,
+# so the graph is always acyclic and wall time grows with its depth, not file count.
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+BUILD_CONCURRENCY = int(os.getenv("AITALK_BUILD_CONCURRENCY", "4"))
+
+MANIFEST, ASSETS, SHARED, COMPONENTS, PAGES, APP, ENTRY, TESTS = range(8)
+LAYER_NAMES = ["manifest", "assets", "shared", "components", "pages", "app", "entry", "tests"]
+
+SHARED_DIRS = {"utils", "util", "lib", "hooks", "context", "contexts", "services", "api", "store",
+               "redux", "constants", "config", "helpers", "types", "data", "theme", "styles"}
+COMPONENT_DIRS = {"components", "component", "ui", "layout", "layouts", "widgets"}
+PAGE_DIRS = {"pages", "views", "screens", "routes", "containers", "features"}
+ASSET_EXTENSIONS = (".css", ".scss", ".sass", ".less", ".html", ".md", ".txt", ".svg", ".ico", ".png", ".json")
+STYLE_EXTENSIONS = (".css", ".scss", ".sass", ".less")
+GLOBAL_STYLE_STEMS = {"index", "main", "global", "globals", "styles"}
+TEST_PATTERN = re.compile(r"(\.test\.|\.spec\.|(^|/)__tests__/|(^|/)tests?/)")
+
+# Which lower layers each layer reads as context
+LAYER_DEPENDENCIES = {
+    SHARED: (MANIFEST,),
+    COMPONENTS: (MANIFEST, SHARED),
+    PAGES: (MANIFEST, SHARED, COMPONENTS),
+    APP: (MANIFEST, SHARED, COMPONENTS, PAGES),
+    ENTRY: (MANIFEST, APP),
+    TESTS: (MANIFEST,),
+}
+
+
+def _normalise(path):
+    return path.replace("\\", "/").lower()
+
+
+def _stem(path):
+    return _normalise(path).rsplit("/", 1)[-1].split(".")[0]
+
+
+def layer_of(path):
+    p = _normalise(path)
+    parts = p.split("/")
+    name, dirs = parts[-1], set(parts[:-1])
+    if name == "package.json":
+        return MANIFEST
+    if TEST_PATTERN.search(p) or name == "setuptests.js":
+        return TESTS
+    if name.endswith(ASSET_EXTENSIONS) or "public" in dirs or name.startswith(".") or ".config." in name:
+        return ASSETS
+    if dirs & SHARED_DIRS:
+        return SHARED
+    if dirs & PAGE_DIRS:
+        return PAGES
+    if dirs & COMPONENT_DIRS:
+        return COMPONENTS
+    if _stem(p) == "app":
+        return APP
+    if _stem(p) in ("index", "main") and len(parts) <= 2:
+        return ENTRY
+    return COMPONENTS
+
+
+def dependencies_of(path, layers):
+    """The files whose generated content `path` should see, given {file: layer} for the whole project."""
+    layer = layers[path]
+    wanted = LAYER_DEPENDENCIES.get(layer, ())
+    if layer == ASSETS and _normalise(path).endswith((".js", ".cjs", ".mjs", ".ts")):
+        wanted = (MANIFEST,)  # tool configs such as tailwind.config.js
+    deps = [other for other, other_layer in layers.items() if other_layer in wanted and other != path]
+    if layer == ENTRY:
+        # index.js pulls in its global stylesheet and helpers sitting next to it (e.g. reportWebVitals.js)
+        folder = os.path.dirname(_normalise(path))
+        deps += [other for other, other_layer in layers.items()
+                 if os.path.dirname(_normalise(other)) == folder and (
+                     other_layer in (SHARED, COMPONENTS)
+                     or (_normalise(other).endswith(STYLE_EXTENSIONS) and _stem(other) in GLOBAL_STYLE_STEMS))]
+    elif layer in (COMPONENTS, PAGES, APP):
+        # A component's own stylesheet (Button.js -> Button.css)
+        deps += [other for other, other_layer in layers.items()
+                 if other_layer == ASSETS and _normalise(other).endswith(STYLE_EXTENSIONS)
+                 and _stem(other) == _stem(path)]
+    elif layer == TESTS:
+        subject = _stem(path)
+        deps += [other for other, other_layer in layers.items()
+                 if other_layer < TESTS and other_layer != ASSETS and _stem(other) == subject]
+    return deps
+
+
+def build_dependency_graph(file_list, pending=None):
+    """
+    Return {file: [dependencies]} in file-list order, for every file or only
+    the pending ones (whose dependencies may then include finished files).
+    """
+    layers = {path: layer_of(path) for path in file_list}
+    return {path: dependencies_of(path, layers) for path in file_list if pending is None or path in pending}
+
+
+def graph_depth(graph):
+    depth = {}
+    for path in sorted(graph, key=lambda p: layer_of(p)):
+        depth[path] = 1 + max((depth.get(d, 0) for d in graph[path]), default=0)
+    return max(depth.values(), default=0)
+
+
+def run_graph(graph, generate, max_workers=BUILD_CONCURRENCY):
+    """
+    Call generate(path, dependencies) for every file once all of its
+    dependencies have finished (successfully or not), running up to
+    max_workers at a time (at least one). Ready files start in file-list order.
+    Dependencies that are not in the graph (already generated) are not waited for.
+    """
+    max_workers = max(max_workers, 1)
+    order = list(graph)
+    remaining = {path: set(deps) & set(graph) for path, deps in graph.items()}
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aitalk-build") as pool:
+        while remaining or running:
+            for path in order:
+                if path in remaining and not remaining[path] and len(running) < max_workers:
+                    del remaining[path]
+                    running[pool.submit(generate, path, graph[path])] = path
+            if not running:
+                break  # nothing runnable; cannot happen for graphs from build_dependency_graph
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished = running.pop(future)
+                future.result()
+                for deps in remaining.values():
+                    deps.discard(finished)
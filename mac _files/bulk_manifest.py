@@ -0,0 +1,141 @@
+# bulk_manifest.py
+# --create-project --mode=bulk: the whole project in one streamed response, parsed as it arrives.
+#
+# Expected response format (delimiters survive code that would need escaping in JSON):
+#   === PROJECT: todo-app ===
+#   === FILES: ["package.json", "src/index.js"] ===
+#   === FILE: package.json ===
+#   ...content...
+#   === END FILE ===
+
+import os
+import re
+import json5
+from groq_client import stream_groq
+
+BULK_MAX_FILES = int(os.getenv("AITALK_BULK_MAX_FILES", "12"))
+
+MARKER = re.compile(r"^\s*===\s*(PROJECT|FILES|FILE|END FILE)\s*(?::\s*(.*?))?\s*===\s*$")
+
+
+def generate_prompt_for_manifest(description, max_files=BULK_MAX_FILES):
+    return f"""
+You generate a complete, modern, production-ready React 18 app in a single response, based on this user description:
+\"\"\"{description}\"\"\"
+
+Keep it small: at most {max_files} files, including package.json, public/index.html and src/index.js.
+
+Output ONLY the following format, with no markdown, backticks or explanation outside the file contents:
+=== PROJECT: <short-kebab-case-name> ===
+=== FILES: ["package.json", "public/index.html", "src/index.js", ...] ===
+=== FILE: package.json ===
+<full content of package.json>
+=== END FILE ===
+=== FILE: public/index.html ===
+<full content of public/index.html>
+=== END FILE ===
+
+RULES:
+- The FILES line is a JSON array of every file path, relative to the project root.
+- Then output one FILE block for every path in FILES, in the same order.
+- package.json must be valid JSON.
+- File contents must work when written directly to disk.
+"""
+
+
+def strip_code_fences(text):
+    cleaned = text.strip()
+    cleaned = re.sub(r"^```[a-zA-Z]*\n?", "", cleaned)
+    cleaned = re.sub(r"```$", "", cleaned).strip()
+    return cleaned
+
+
+class ManifestParser:
+    """
+    Incremental parser for the bulk manifest: feed() it streamed text and it
+    reports each file as soon as its block is complete. A file still open
+    when the stream ends was cut off and is listed in .truncated instead.
+    """
+
+    def __init__(self):
+        self.project_name = None
+        self.file_list = []
+        self.files = {}
+        self.truncated = []
+        self._buffer = ""
+        self._current = None
+        self._lines = []
+
+    def feed(self, text):
+        """Consume a chunk; returns the paths of files completed by it."""
+        self._buffer += text
+        completed = []
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            finished = self._line(line)
+            if finished:
+                completed.append(finished)
+        return completed
+
+    def close(self):
+        """End of stream: flush the last line and mark an unterminated file as truncated."""
+        completed = []
+        if self._buffer:
+            finished = self._line(self._buffer)
+            self._buffer = ""
+            if finished:
+                completed.append(finished)
+        if self._current is not None:
+            self.truncated.append(self._current)
+            self._current = None
+            self._lines = []
+        return completed
+
+    def _line(self, line):
+        match = MARKER.match(line)
+        if not match:
+            if self._current is not None:
+                self._lines.append(line)
+            return None
+        kind, value = match.group(1), (match.group(2) or "").strip().strip("\"'`")
+        if kind == "PROJECT":
+            self.project_name = value
+            return None
+        if kind == "FILES":
+            try:
+                self.file_list = [p for p in json5.loads(value) if isinstance(p, str)]
+            except ValueError:
+                pass  # the FILE blocks still tell us what was generated
+            return None
+        # A new FILE marker before END FILE also closes the previous block
+        finished = self._finish() if self._current is not None else None
+        if kind == "FILE" and value:
+            self._current = value
+        return finished
+
+    def _finish(self):
+        path = self._current
+        self.files[path] = strip_code_fences("\n".join(self._lines))
+        self._current = None
+        self._lines = []
+        return path
+
+    def all_files(self):
+        return list(dict.fromkeys(self.file_list + list(self.files) + self.truncated))
+
+    def missing(self):
+        """Files that were announced (or started) but did not come back complete."""
+        return [path for path in self.all_files() if path not in self.files]
+
+
+def generate_manifest(description, on_file=None):
+    """Stream the manifest, calling on_file(path) as each file completes; returns the parser."""
+    parser = ManifestParser()
+    for token in stream_groq(generate_prompt_for_manifest(description), task_type="create_project"):
+        for path in parser.feed(token):
+            if on_file:
+                on_file(path)
+    for path in parser.close():
+        if on_file:
+            on_file(path)
+    return parser
@@ -1,6 +1,6 @@
 # chat_utils.py
 
-from groq_client import call_groq
+from groq_client import stream_groq, print_stream
 
 def chat():
     print("💬 Interactive Chat Mode (type 'exit' or 'quit' to leave)")
@@ -22,11 +22,11 @@ def chat():
             elif message["role"] == "assistant":
                 formatted_prompt += f"Assistant: {message['content']}\n"
 
-        # Call the Groq LLaMA model (let groq_client pick the right model)
-        response = call_groq(
+        # Stream the Groq LLaMA reply (let groq_client pick the right model)
+        print("Assistant: ", end="", flush=True)
+        response = print_stream(stream_groq(
             prompt=formatted_prompt,
             task_type="chat"
-        )
-
-        print(f"Assistant: {response}\n")
+        ))
+        print()
         conversation_history.append({"role": "assistant", "content": response})
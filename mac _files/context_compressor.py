@@ -0,0 +1,207 @@
+# context_compressor.py
+# Compact outlines of generated files for prompts that need to know about a file but
+# not its full text: imports, exports and signatures for code, selectors for CSS,
+# dependencies for package.json. Outlines are memoized per content hash, so each
+# version of a file is compressed once per build however many prompts include it.
+
+import re
+import json
+import hashlib
+import threading
+
+CODE_EXTENSIONS = (".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs")
+STYLE_EXTENSIONS = (".css", ".scss", ".sass", ".less")
+MAX_SELECTORS = 60
+MAX_LINE = 120
+
+IMPORT_STATEMENT = re.compile(r"^\s*import\b[^;]*?(?:from\s*)?['\"][^'\"]+['\"];?", re.MULTILINE)
+DECLARATION = re.compile(
+    r"^(?:export\s+(?:default\s+)?)?(?:async\s+)?(?:function\b|class\b|const\b|let\b|var\b|interface\b|type\b|enum\b)")
+EXPORT_ONLY = re.compile(r"^export\s+(?:default\s+[\w.$]+\s*;?$|\{[^}]*\}(?:\s*from\s*['\"][^'\"]+['\"])?;?$|\*)")
+ASSIGNMENT_TO_MEMBER = re.compile(r"^[A-Z][\w$]*\.(?:propTypes|defaultProps|displayName)\s*=")
+CSS_RULE = re.compile(r"([^{};]+)\{")
+CSS_VARIABLE = re.compile(r"(--[\w-]+)\s*:")
+HTML_TITLE = re.compile(r"<title>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+HTML_ID = re.compile(r"\bid=[\"']([^\"']+)[\"']")
+
+_memo = {}
+_memo_lock = threading.Lock()
+_memo_stats = {}  # {kind: [computed, reused]}
+
+
+def memoized(kind, content, compute):
+    """compute(content), cached by (kind, content hash) for the life of the process."""
+    key = (kind, hashlib.sha1(content.encode("utf-8")).hexdigest())
+    with _memo_lock:
+        counts = _memo_stats.setdefault(kind, [0, 0])
+        if key in _memo:
+            counts[1] += 1
+            return _memo[key]
+    value = compute(content)
+    with _memo_lock:
+        counts[0] += 1
+        _memo[key] = value
+    return value
+
+
+def memo_stats(prefix=""):
+    """(computed, reused) totals for the memoized kinds starting with prefix."""
+    with _memo_lock:
+        counts = [c for kind, c in _memo_stats.items() if kind.startswith(prefix)]
+        return sum(c[0] for c in counts), sum(c[1] for c in counts)
+
+
+def _blank_code(content):
+    """
+    (code, skeleton): code without comments; skeleton is the same text with string and
+    template literal contents blanked too, so braces in it are only real braces.
+    Both keep the original line structure.
+    """
+    code, skeleton = [], []
+    i, n = 0, len(content)
+    while i < n:
+        ch = content[i]
+        if content.startswith("//", i):
+            end = content.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        if content.startswith("/*", i):
+            end = content.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            blank = "\n" * content.count("\n", i, end)
+            code.append(blank)
+            skeleton.append(blank)
+            i = end
+            continue
+        if ch in "\"'`":
+            j = i + 1
+            while j < n and content[j] != ch and (ch == "`" or content[j] != "\n"):
+                j += 2 if content[j] == "\\" else 1
+            closed = j < n and content[j] == ch  # an apostrophe in JSX text never is
+            j = min(j + 1, n) if closed else j
+            code.append(content[i:j])
+            body = content[i + 1:j - 1] if closed else content[i + 1:j]
+            skeleton.append(ch + re.sub(r"[^\n]", " ", body) + (ch if closed else ""))
+            i = j
+            continue
+        code.append(ch)
+        skeleton.append(ch)
+        i += 1
+    return "".join(code), "".join(skeleton)
+
+
+def _shorten(line):
+    line = " ".join(line.split())
+    return line if len(line) <= MAX_LINE else line[:MAX_LINE - 1] + "…"
+
+
+def _header(lines, skeleton_lines, index):
+    """The declaration starting at lines[index], cut where its body or value starts."""
+    text, depth_paren = "", 0
+    for offset in range(index, min(index + 12, len(lines))):
+        skeleton = skeleton_lines[offset]
+        for pos, ch in enumerate(skeleton):
+            if ch == "(":
+                depth_paren += 1
+            elif ch == ")":
+                depth_paren -= 1
+            elif depth_paren == 0 and (ch == "{" or skeleton.startswith("=>", pos)):
+                head = text + lines[offset][:pos]
+                if ch == "{" and re.search(r"=\s*$", head):  # const x = { ... }: an object value
+                    return _shorten(head + "{…}")
+                return _shorten(head + ("=> …" if ch == "=" else "{…}"))
+        text += lines[offset] + " "
+        if depth_paren <= 0 and (skeleton_lines[offset].rstrip().endswith(";") or offset > index):
+            break
+    return _shorten(text)
+
+
+def compress_code(content):
+    code, skeleton = _blank_code(content)
+    lines, skeleton_lines = code.split("\n"), skeleton.split("\n")
+    outline = [_shorten(match.group(0)) for match in IMPORT_STATEMENT.finditer(code)]
+    depth = 0
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if depth == 0 and stripped and not stripped.startswith("import"):
+            if EXPORT_ONLY.match(stripped) or ASSIGNMENT_TO_MEMBER.match(stripped):
+                outline.append(_shorten(stripped) if "{" not in stripped or stripped.endswith("}") or stripped.endswith(";")
+                               else _shorten(stripped.split("{")[0] + "{…}"))
+            elif DECLARATION.match(stripped):
+                outline.append(_header(lines, skeleton_lines, index))
+        depth += skeleton_lines[index].count("{") - skeleton_lines[index].count("}")
+        depth = max(depth, 0)
+    return "\n".join(outline)
+
+
+def compress_css(content):
+    content = re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
+    selectors = []
+    for match in CSS_RULE.finditer(content):
+        for selector in match.group(1).split(","):
+            selector = " ".join(selector.split())
+            if selector and not selector.startswith(("from", "to")) and not re.match(r"^\d+%$", selector):
+                selectors.append(selector)
+    selectors = list(dict.fromkeys(selectors))
+    more = f" (+{len(selectors) - MAX_SELECTORS} more)" if len(selectors) > MAX_SELECTORS else ""
+    outline = [f"selectors: {', '.join(selectors[:MAX_SELECTORS]) or 'none'}{more}"]
+    variables = list(dict.fromkeys(CSS_VARIABLE.findall(content)))
+    if variables:
+        outline.append(f"variables: {', '.join(variables)}")
+    return "\n".join(outline)
+
+
+def compress_package_json(content):
+    try:
+        pkg = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(pkg, dict):
+        return None
+    outline = [f"name: {pkg.get('name', '?')}"]
+    for section in ("dependencies", "devDependencies", "peerDependencies"):
+        if isinstance(pkg.get(section), dict) and pkg[section]:
+            outline.append(f"{section}: " + ", ".join(f"{name}@{spec}" for name, spec in pkg[section].items()))
+    if isinstance(pkg.get("scripts"), dict):
+        outline.append(f"scripts: {', '.join(pkg['scripts'])}")
+    return "\n".join(outline)
+
+
+def compress_json(content):
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    if isinstance(data, dict):
+        return f"keys: {', '.join(data)}"
+    return f"array of {len(data)}" if isinstance(data, list) else None
+
+
+def compress_html(content):
+    title = HTML_TITLE.search(content)
+    outline = [f"title: {' '.join(title.group(1).split())}"] if title else []
+    ids = HTML_ID.findall(content)
+    outline.append(f"element ids: {', '.join(dict.fromkeys(ids)) or 'none'}")
+    return "\n".join(outline)
+
+
+def _compress(path, content):
+    if path.endswith("package.json"):
+        view = compress_package_json(content)
+    elif path.endswith(".json"):
+        view = compress_json(content)
+    elif path.endswith(CODE_EXTENSIONS):
+        view = compress_code(content)
+    elif path.endswith(STYLE_EXTENSIONS):
+        view = compress_css(content)
+    elif path.endswith((".html", ".htm")):
+        view = compress_html(content)
+    else:
+        view = "\n".join([_shorten(line) for line in content.splitlines() if line.strip()][:3])
+    return view if view is not None else content
+
+
+def compress(path, content):
+    """A compact view of a file: what other files need to know about it, not its full text."""
+    kind = path.rsplit("/", 1)[-1] if path.endswith("package.json") else "." + path.rsplit(".", 1)[-1]
+    return memoized(f"outline{kind}", content, lambda text: _compress(path, text))
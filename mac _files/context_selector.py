@@ -0,0 +1,181 @@
+# context_selector.py
+# Picks which generated files go into a file's prompt: whole files for the few it
+# most depends on, compressed outlines for the other related files, one-line
+# signatures for the rest, within a token budget.
+
+import os
+import re
+import json
+from token_budget import estimate_tokens
+from context_compressor import compress, memoized, CODE_EXTENSIONS
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("AITALK_CONTEXT_TOKENS", "6000"))
+CONTEXT_FULL_FILES = int(os.getenv("AITALK_CONTEXT_FULL_FILES", "2"))
+
+IMPORT_PATTERN = re.compile(
+    r"""(?:\bimport\s+(?:[\w*{}\s,]+?\s+from\s+)?|\brequire\(\s*|\bimport\(\s*)['"]([^'"]+)['"]""")
+CSS_IMPORT_PATTERN = re.compile(r"""@import\s+(?:url\()?\s*['"]?([^'")\s;]+)""")
+RESOLVE_SUFFIXES = ("", ".js", ".jsx", ".ts", ".tsx", ".css", ".scss", ".json",
+                    "/index.js", "/index.jsx", "/index.ts", "/index.tsx")
+
+EXPORT_PATTERNS = [
+    re.compile(r"export\s+default\s+(?:async\s+)?(function|class)\s*(\w*)\s*(\([^)]*\))?"),
+    re.compile(r"export\s+(?:async\s+)?(function)\s+(\w+)\s*(\([^)]*\))"),
+    re.compile(r"export\s+(const|let|var|class)\s+(\w+)()"),
+]
+EXPORT_DEFAULT_NAME = re.compile(r"export\s+default\s+(?!function|class|async)(\w+)")
+EXPORT_LIST = re.compile(r"export\s*\{([^}]*)\}")
+CSS_SELECTOR = re.compile(r"^\s*([.#]?[\w-][^{,\n]*?)\s*[{,]", re.MULTILINE)
+MAX_STUB_ITEMS = 8
+GENERIC_PATH_WORDS = {"src", "index", "components", "component", "pages", "page", "utils", "lib", "test", "tests"}
+
+
+def parse_imports(path, content):
+    """Import specifiers in a generated file: JS/JSX imports and requires, CSS @imports."""
+    if path.endswith((".css", ".scss", ".sass", ".less")):
+        return memoized("css-imports", content, CSS_IMPORT_PATTERN.findall)
+    if path.endswith(CODE_EXTENSIONS):
+        return memoized("imports", content, IMPORT_PATTERN.findall)
+    return []
+
+
+def resolve_import(importer, spec, known):
+    """Map an import specifier to a project path; bare package names map to package.json."""
+    if not spec.startswith((".", "/")):
+        return "package.json" if "package.json" in known else None
+    base = os.path.normpath(os.path.join(os.path.dirname(importer), spec)).replace("\\", "/")
+    for suffix in RESOLVE_SUFFIXES:
+        if base + suffix in known:
+            return base + suffix
+    return None
+
+
+def import_graph(files_content, all_files):
+    """{path: set of project paths it imports} for every generated file."""
+    known = set(all_files) | set(files_content)
+    graph = {}
+    for path, content in files_content.items():
+        targets = {resolve_import(path, spec, known) for spec in parse_imports(path, content)}
+        graph[path] = {t for t in targets if t and t != path}
+    return graph
+
+
+def signature(path, content):
+    """One-line stub: exports for code, dependencies for package.json, selectors for CSS."""
+    if path.endswith("package.json"):
+        try:
+            deps = sorted(json.loads(content).get("dependencies", {}))
+        except (ValueError, AttributeError):
+            deps = []
+        return f"dependencies: {', '.join(deps) or 'none'}"
+    if path.endswith((".css", ".scss", ".sass", ".less")):
+        selectors = list(dict.fromkeys(s.strip() for s in CSS_SELECTOR.findall(content)))
+        return f"selectors: {', '.join(selectors[:MAX_STUB_ITEMS]) or 'none'}"
+    exports = []
+    for pattern in EXPORT_PATTERNS:
+        for kind, name, params in pattern.findall(content):
+            default = "default " if pattern is EXPORT_PATTERNS[0] else ""
+            exports.append(f"{default}{kind} {name}{params or ''}".replace("  ", " ").strip())
+    exports += [f"default {name}" for name in EXPORT_DEFAULT_NAME.findall(content)]
+    for names in EXPORT_LIST.findall(content):
+        exports += [n.strip() for n in names.split(",") if n.strip()]
+    exports = [" ".join(e.split()) for e in dict.fromkeys(exports)]
+    return f"exports: {'; '.join(exports[:MAX_STUB_ITEMS]) or 'nothing'}"
+
+
+def name_words(path):
+    """Lowercase words of a path: "src/components/TodoItem.js" -> {"components", "todo", "item"}."""
+    words = re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+", os.path.splitext(path)[0])
+    return {w.lower() for w in words} - GENERIC_PATH_WORDS
+
+
+def rank_by_reliance(target, candidates, target_edges, related, graph):
+    """
+    candidates ordered by how much the target relies on them: import edges with the
+    target (it imports them, they import it), then edges with the target's other
+    related files (a hook or context every sibling uses), then path words shared
+    with the target (TodoItem for TodoList), then their original order.
+    """
+    target_words = name_words(target)
+
+    def score(item):
+        position, path = item
+        neighbourhood = sum(1 for other in related if other != path and other != target
+                            and (path in graph.get(other, ()) or other in graph.get(path, ())))
+        return (-target_edges.get(path, 0), -neighbourhood, -len(name_words(path) & target_words), position)
+
+    return [path for _, path in sorted(enumerate(candidates), key=score)]
+
+
+def select_context(target, dependencies, files_content, all_files, max_tokens=CONTEXT_TOKEN_BUDGET, stats=None):
+    """
+    Return (full, outlines): {path: content} of the few files worth showing whole,
+    and {path: outline} for the other generated files. Whole files are at most
+    CONTEXT_FULL_FILES code files, picked by rank_by_reliance from the target's own
+    dependencies that no other dependency imports (components a page uses come in
+    through the page) and the files that already import the target. The other related files get a compressed
+    outline (imports, exports and signatures; selectors; dependencies) and the rest
+    a one-line signature. Everything is fitted to max_tokens, whole files first.
+    If given, stats accumulates "outlined_files", "outline_tokens" and
+    "verbatim_tokens" (what those files would have cost whole).
+    """
+    graph = import_graph(files_content, all_files)
+    deps = [d for d in dependencies if d in files_content]
+    reached_through_deps = set()
+    for dep in deps:
+        reached_through_deps |= graph.get(dep, set())
+    importers = [p for p in files_content if target in graph.get(p, ())]
+    direct = [d for d in deps if d not in reached_through_deps]
+    related = dict.fromkeys(direct + importers + deps + sorted(reached_through_deps & set(files_content)))
+    target_edges = {}
+    for path in direct + importers:
+        target_edges[path] = target_edges.get(path, 0) + 1  # both ways when the two import each other
+
+    full, outlines = {}, {}
+    remaining = max_tokens
+    candidates = [p for p in dict.fromkeys(direct + importers) if p.endswith(CODE_EXTENSIONS)]
+    for path in rank_by_reliance(target, candidates, target_edges, related, graph)[:CONTEXT_FULL_FILES]:
+        cost = estimate_tokens(files_content[path]) + estimate_tokens(path)
+        if cost <= remaining:
+            full[path] = files_content[path]
+            remaining -= cost
+    for path in related:
+        if path in full or path == target:
+            continue
+        content = files_content[path]
+        outline = compress(path, content)
+        cost = estimate_tokens(outline) + estimate_tokens(path)
+        verbatim = estimate_tokens(content) + estimate_tokens(path)
+        if verbatim <= cost:  # small enough that the whole file is no dearer
+            if verbatim <= remaining:
+                full[path] = content
+                remaining -= verbatim
+            continue
+        if cost <= remaining:
+            outlines[path] = outline
+            remaining -= cost
+            if stats is not None:
+                stats["outlined_files"] = stats.get("outlined_files", 0) + 1
+                stats["outline_tokens"] = stats.get("outline_tokens", 0) + cost
+                stats["verbatim_tokens"] = stats.get("verbatim_tokens", 0) + verbatim
+    for path in files_content:
+        if path in full or path in outlines or path == target:
+            continue
+        stub = memoized(f"signature:{path}", files_content[path], lambda content: signature(path, content))
+        cost = estimate_tokens(stub) + estimate_tokens(path)
+        if cost <= remaining:
+            outlines[path] = stub
+            remaining -= cost
+    return full, outlines
+
+
+def format_outlines(outlines):
+    """Prompt text for select_context's outlines: one bullet per file, multi-line outlines indented."""
+    return "".join(f"\n- {path}:\n" + "\n".join(f"    {line}" for line in outline.splitlines())
+                   if "\n" in outline else f"\n- {path}: {outline}"
+                   for path, outline in outlines.items())
+
+
+def context_tokens(full, stubs):
+    return (sum(estimate_tokens(c) + estimate_tokens(p) for p, c in full.items())
+            + sum(estimate_tokens(s) + estimate_tokens(p) for p, s in stubs.items()))
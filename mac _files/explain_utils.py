@@ -1,31 +1,79 @@
+import io
 import os
-import getpass
 import re
-from groq_client import call_groq
+import mmap
+from groq_client import stream_groq, print_stream
 
-def explain_last_n_commands_with_output(n, log_path=os.path.expanduser('~/aitalk_session.log')):
-    if not os.path.exists(log_path):
-        print(f"❌ Log file not found: {log_path}")
-        print("Tip: Start your terminal session with: script ~/aitalk_session.log")
-        return
+# The session log is read backwards in blocks of this size, so only its end is ever read
+TAIL_BLOCK_SIZE = 64 * 1024
+ANSI_ESCAPE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
+# Line breaks as universal newlines mode sees them: zsh's PROMPT_SP ends lines with a lone \r
+NEWLINE = re.compile(rb'(\r\n|\r|\n)')
 
-    with open(log_path, 'r') as f:
-        lines = f.readlines()
+def strip_ansi(line):
+    return ANSI_ESCAPE.sub('', line)
 
-    def strip_ansi(line):
-        ansi_escape = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
-        return ansi_escape.sub('', line)
+def is_prompt(line):
+    """A shell prompt line: ends with $ or % once ANSI codes are stripped."""
+    clean = strip_ansi(line).strip()
+    return clean.endswith('$') or clean.endswith('%')
 
-    # Find indices of prompts (lines ending with $ or % after stripping ANSI codes)
-    prompt_indices = []
-    for i, line in enumerate(lines):
-        clean = strip_ansi(line).strip()
-        if clean.endswith('$') or clean.endswith('%'):
-            prompt_indices.append(i)
+def read_tail(log_path, prompts, block_size=TAIL_BLOCK_SIZE):
+    """
+    The end of the log, starting at a line boundary, holding at least `prompts` prompt
+    lines (or the whole log if it has fewer). Reads backwards in block_size chunks
+    through mmap when the file can be mapped, so the cost depends on how far back the
+    prompts are, not on the size of the log. Returns (text, bytes read).
+    """
+    with open(log_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        try:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):  # empty file, or a file that can't be mapped
+            view = None
 
-    if not prompt_indices:
-        print("❌ Could not find any command prompts in the log.")
-        return
+        def read(start, end):
+            if view is not None:
+                return view[start:end]
+            f.seek(start)
+            return f.read(end - start)
+
+        try:
+            end, found, carry, boundary = size, 0, b'', 0
+            while end > 0 and found < prompts:
+                start = max(0, end - block_size)
+                data = read(start, end) + carry
+                parts = NEWLINE.split(data)  # line, newline, line, ..., last line
+                lines, position = [], start
+                for i in range(0, len(parts), 2):
+                    lines.append((position, parts[i]))
+                    position += len(parts[i]) + (len(parts[i + 1]) if i + 1 < len(parts) else 0)
+                # The first line may start in an earlier block; it goes back with its newline,
+                # so a \r\n split across two blocks is still one line break
+                complete = lines if start == 0 else lines[1:]
+                carry = b'' if start == 0 else data[:lines[1][0] - start] if len(lines) > 1 else data
+                for line_start, piece in reversed(complete):
+                    if is_prompt(piece.decode('utf-8', errors='replace')):
+                        found += 1
+                        if found >= prompts:
+                            boundary = line_start
+                            break
+                end = start
+            return read(boundary, size).decode('utf-8', errors='replace'), size - end
+        finally:
+            if view is not None:
+                view.close()
+
+def last_command_blocks(log_path, n, block_size=TAIL_BLOCK_SIZE):
+    """
+    The last n prompt-to-prompt blocks (command and output) of a `script` session
+    log, oldest first, read from the end of the log. Returns (blocks, bytes read).
+    """
+    text, bytes_read = read_tail(log_path, n, block_size)
+    lines = io.StringIO(text, newline=None).readlines()
+
+    # Find indices of prompts (lines ending with $ or % after stripping ANSI codes)
+    prompt_indices = [i for i, line in enumerate(lines) if is_prompt(line)]
 
     # Get the last n command+output blocks
     blocks = []
@@ -33,11 +81,23 @@ def explain_last_n_commands_with_output(n, log_path=os.path.expanduser('~/aitalk
         start = prompt_indices[i]
         end = prompt_indices[i+1] if i+1 < len(prompt_indices) else len(lines)
         blocks.insert(0, "".join(lines[start:end]))
+    return blocks, bytes_read
+
+def explain_last_n_commands_with_output(n, log_path=os.path.expanduser('~/aitalk_session.log')):
+    if not os.path.exists(log_path):
+        print(f"❌ Log file not found: {log_path}")
+        print("Tip: Start your terminal session with: script ~/aitalk_session.log")
+        return
+
+    blocks, _ = last_command_blocks(log_path, n)
+    if not blocks:
+        print("❌ Could not find any command prompts in the log.")
+        return
 
     session_snippet = "\n".join(blocks)
 
     prompt = f"""Explain step by step what is happening in these shell commands and their outputs:\n\n{session_snippet}"""
-    explanation = call_groq(prompt, task_type="explain_x")
     print("------ LLM Explanation ------")
-    print(explanation)
-    print("-----------------------------")
\ No newline at end of file
+    explanation = print_stream(stream_groq(prompt, task_type="explain_x"))
+    print("-----------------------------")
+    return explanation
\ No newline at end of file
@@ -1,5 +1,7 @@
 import subprocess
-from groq_client import call_groq
+from groq_client import stream_groq, print_stream
+from model_router import TASK_MODEL_MAP
+from token_budget import fit_sections, prompt_budget, estimate_tokens, describe
 
 def get_git_info():
     try:
@@ -22,17 +24,25 @@ def get_git_info():
 
 def git_summary():
     log, status = get_git_info()
-    prompt = (
+    model = TASK_MODEL_MAP["summarize"]
+    instructions = (
         "You are a senior software engineer and git expert. "
         "Given the following git log and status, provide a professional, technical, and human-readable summary. "
         "Summarize all commits, merges, and stages in a concise manner. "
         "Offer insights, highlight important changes, and suggest improvements or next steps if appropriate.\n\n"
+    )
+    # Status is kept whole; the log is newest-first, so older history is cut first
+    budget = prompt_budget(model) - estimate_tokens(instructions, model) - 20
+    status, log = fit_sections([(status, 0, "head"), (log, 1, "head")], budget, model)
+    prompt = (
+        instructions +
         "=== GIT STATUS ===\n"
         f"{status}\n\n"
         "=== GIT LOG ===\n"
         f"{log}\n"
     )
-    summary = call_groq(prompt, task_type="summarize")
+    print(f"📏 {describe(estimate_tokens(prompt, model), model)}")
     print("------ Git Summary ------")
-    print(summary)
-    print("-------------------------")
\ No newline at end of file
+    summary = print_stream(stream_groq(prompt, task_type="summarize"))
+    print("-------------------------")
+    return summary
\ No newline at end of file
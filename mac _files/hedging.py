@@ -0,0 +1,93 @@
+# hedging.py
+# Hedged requests: when a call runs slower than usual, send a duplicate and keep the first answer.
+#
+# The hedge delay is a latency percentile of recent calls for the same task (seeded from the
+# --stats metrics log), and each task may only duplicate a small share of its calls.
+
+import os
+import threading
+from collections import deque
+import metrics
+
+HEDGING_ENABLED = os.getenv("AITALK_HEDGING", "1").lower() not in ("0", "false", "no")
+HEDGE_PERCENTILE = float(os.getenv("AITALK_HEDGE_PERCENTILE", "95"))
+# Never hedge sooner than this, however fast recent calls were
+MIN_HEDGE_DELAY = float(os.getenv("AITALK_HEDGE_MIN_DELAY", "1.0"))
+MIN_SAMPLES = 10
+WINDOW = 200
+HISTORY_BYTES = 256 * 1024
+
+# Only idempotent, non-streamed tasks are listed. budget is the largest share of the task's
+# calls that may be duplicated; delay is used until enough latencies have been observed.
+HEDGE_POLICY = {
+    "generate_prompt": {"budget": 0.20, "delay": 5.0},
+    "generate_project_name": {"budget": 0.20, "delay": 3.0},
+    "create_project": {"budget": 0.10, "delay": 20.0},
+    "fix_package_json": {"budget": 0.10, "delay": 20.0},
+    "update_project": {"budget": 0.10, "delay": 20.0},
+    "summarize": {"budget": 0.10, "delay": 30.0},
+}
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round((len(ordered) - 1) * pct / 100.0)))]
+
+
+class HedgePolicy:
+    def __init__(self, policy=HEDGE_POLICY, percentile=HEDGE_PERCENTILE, enabled=HEDGING_ENABLED):
+        self.policy = policy
+        self.percentile = percentile
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._calls = {}
+        self._hedges = {}
+
+    def _samples(self, task_type):
+        if task_type not in self._latencies:
+            history = [r.get("latency_s", 0.0) - (r.get("queue_wait_s") or 0.0)
+                       for r in metrics.tail(HISTORY_BYTES)
+                       if r.get("task_type") == task_type and r.get("ok") and not r.get("cache_hit")]
+            self._latencies[task_type] = deque(history, maxlen=WINDOW)
+        return self._latencies[task_type]
+
+    def delay_for(self, task_type):
+        """Seconds to wait before hedging a new call of this task, or None if it is never hedged."""
+        if not self.enabled or task_type not in self.policy:
+            return None
+        with self._lock:
+            self._calls[task_type] = self._calls.get(task_type, 0) + 1
+            samples = self._samples(task_type)
+            if len(samples) < MIN_SAMPLES:
+                return self.policy[task_type]["delay"]
+            return max(_percentile(samples, self.percentile), MIN_HEDGE_DELAY)
+
+    def allow(self, task_type):
+        """
+        Spend one hedge from the task's budget; False once the budget is used up. The
+        budget is a share of the calls made so far, so a 10% task hedges for the
+        first time on its 10th call, not its first.
+        """
+        with self._lock:
+            hedges = self._hedges.get(task_type, 0)
+            if hedges + 1 > self.policy[task_type]["budget"] * self._calls.get(task_type, 0):
+                return False
+            self._hedges[task_type] = hedges + 1
+            return True
+
+    def observe(self, task_type, seconds):
+        if task_type not in self.policy:
+            return
+        with self._lock:
+            self._samples(task_type).append(seconds)
+
+
+_policy = None
+
+
+def get_policy():
+    global _policy
+    if _policy is None:
+        _policy = HedgePolicy()
+    return _policy
@@ -0,0 +1,134 @@
+# metrics.py
+# Per-call LLM metrics appended to a JSONL file, plus the `aitalk --stats` report.
+
+import os
+import json
+import time
+import threading
+from system_utils import AITALK_HOME, make_dir
+from token_budget import estimate_cost
+
+METRICS_PATH = os.path.expanduser(os.getenv("AITALK_METRICS_FILE", os.path.join(AITALK_HOME, "metrics.jsonl")))
+METRICS_ENABLED = os.getenv("AITALK_METRICS", "1").lower() not in ("0", "false", "no")
+
+GROUP_WIDTH = 32
+
+_lock = threading.Lock()
+
+
+def record(entry, path=None):
+    """Append one call record. Metrics must never break a command, so I/O errors are ignored."""
+    if not METRICS_ENABLED:
+        return
+    path = path or METRICS_PATH
+    entry = dict(entry, ts=time.time(), pid=os.getpid())
+    line = json.dumps(entry) + "\n"
+    try:
+        make_dir(os.path.dirname(path))
+        with _lock:
+            # One write() per line in append mode keeps lines intact across processes
+            with open(path, "a") as f:
+                f.write(line)
+    except OSError:
+        pass
+
+
+def load(path=None):
+    path = path or METRICS_PATH
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # tolerate a torn last line
+    return records
+
+
+def tail(max_bytes, path=None):
+    """Records from roughly the last max_bytes of the log, so hot paths never parse all of it."""
+    path = path or METRICS_PATH
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(size - max_bytes, 0))
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    if size > max_bytes:
+        lines = lines[1:]  # first line is probably cut in half
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round((len(ordered) - 1) * pct / 100.0)))]
+
+
+def summarise_records(records, key):
+    groups = {}
+    for r in records:
+        groups.setdefault(key(r), []).append(r)
+    rows = []
+    for name in sorted(groups):
+        items = groups[name]
+        latencies = [r.get("latency_s") or 0.0 for r in items]
+        prompt_tokens = sum(r.get("prompt_tokens") or 0 for r in items)
+        completion_tokens = sum(r.get("completion_tokens") or 0 for r in items)
+        cost = sum(estimate_cost(r.get("prompt_tokens") or 0, r.get("completion_tokens") or 0, r.get("model"))
+                   for r in items if not r.get("cache_hit"))
+        rows.append({
+            "group": name,
+            "calls": len(items),
+            "errors": sum(1 for r in items if not r.get("ok", True)),
+            "cache_hits": sum(1 for r in items if r.get("cache_hit")),
+            "retries": sum(r.get("retries") or 0 for r in items),
+            "hedged": sum(1 for r in items if r.get("hedged")),
+            "fell_back": sum(1 for r in items if r.get("failed_attempts")),
+            "avg_latency_s": sum(latencies) / len(latencies),
+            "p95_latency_s": _percentile(latencies, 95),
+            "avg_queue_wait_s": sum(r.get("queue_wait_s") or 0.0 for r in items) / len(items),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd": cost,
+        })
+    return rows
+
+
+def _fit(text, width):
+    """text cut to width from the right, with an ellipsis, so the distinguishing start stays."""
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
+def _print_table(title, rows):
+    print(f"------ {title} ------")
+    print(f"{'':<{GROUP_WIDTH}}{'calls':>7}{'errors':>7}{'cached':>7}{'retries':>8}{'hedged':>7}{'fell back':>10}{'avg s':>8}{'p95 s':>8}"
+          f"{'queue s':>8}{'prompt tok':>12}{'compl tok':>11}{'est $':>9}")
+    for r in rows:
+        print(f"{_fit(str(r['group']), GROUP_WIDTH - 1):<{GROUP_WIDTH}}{r['calls']:>7}{r['errors']:>7}{r['cache_hits']:>7}{r['retries']:>8}{r['hedged']:>7}{r['fell_back']:>10}"
+              f"{r['avg_latency_s']:>8.2f}{r['p95_latency_s']:>8.2f}{r['avg_queue_wait_s']:>8.2f}"
+              f"{r['prompt_tokens']:>12}{r['completion_tokens']:>11}{r['cost_usd']:>9.4f}")
+
+
+def print_stats(path=None):
+    records = load(path)
+    if not records:
+        print(f"📊 No metrics recorded yet ({path or METRICS_PATH}).")
+        return
+    _print_table("By task type", summarise_records(records, lambda r: r.get("task_type", "?")))
+    _print_table("By model and route", summarise_records(
+        records, lambda r: f"{r.get('model', '?').split('/')[-1]} ({r.get('route', 'primary')})"))
+    _print_table("By day", summarise_records(
+        records, lambda r: time.strftime("%Y-%m-%d", time.localtime(r.get("ts", 0)))))
+    print(f"📁 {len(records)} calls recorded in {path or METRICS_PATH}")
@@ -0,0 +1,98 @@
+# model_router.py
+# Picks a model per task from a latency/quality policy, with ordered fallbacks.
+#
+# Override in ~/.aitalk/models.json (or AITALK_MODEL_CONFIG), e.g.:
+#   {
+#     "tiers": {"fast": "llama-3.1-8b-instant"},
+#     "tasks": {"chat": "quality",
+#               "summarize": {"model": "llama-3.3-70b-versatile", "fallbacks": ["meta-llama/llama-4-scout-17b-16e-instruct"]}}
+#   }
+
+import os
+import json
+from system_utils import AITALK_HOME
+
+MODEL_CONFIG_PATH = os.path.expanduser(os.getenv("AITALK_MODEL_CONFIG", os.path.join(AITALK_HOME, "models.json")))
+VERBOSE_ROUTING = os.getenv("AITALK_VERBOSE", "").lower() in ("1", "true", "yes")
+
+# Model used for each tier, and which tiers to fall back to (in order) if it times out or is overloaded
+MODEL_TIERS = {
+    "fast": "llama-3.1-8b-instant",
+    "balanced": "meta-llama/llama-4-scout-17b-16e-instruct",
+    "quality": "llama-3.3-70b-versatile",
+}
+TIER_FALLBACKS = {
+    "fast": ["balanced"],
+    "balanced": ["quality"],
+    "quality": ["balanced"],
+}
+
+# Cheap, short-answer tasks go to the fast tier; generated code stays on the balanced model
+TASK_POLICY = {
+    "generate_prompt": "fast",
+    "generate_project_name": "fast",
+    "create_project": "balanced",
+    "fix_package_json": "balanced",
+    "update_project": "balanced",
+    "summarize": "balanced",
+    "explain_x": "balanced",
+    "chat": "balanced",
+}
+DEFAULT_POLICY = "balanced"
+
+
+class Route:
+    def __init__(self, task_type, models, policy):
+        self.task_type = task_type
+        self.models = models
+        self.policy = policy
+
+    @property
+    def model(self):
+        return self.models[0]
+
+    def __repr__(self):
+        return f"{self.task_type} [{self.policy}] -> {' -> '.join(self.models)}"
+
+
+def _load_config(path=MODEL_CONFIG_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring invalid model config {path}: {e}")
+        return {}
+
+
+def _make_route(task_type, spec, tiers):
+    if isinstance(spec, dict):
+        models = [spec["model"]] + list(spec.get("fallbacks", []))
+        policy = "custom"
+    else:
+        models = [tiers[spec]] + [tiers[t] for t in TIER_FALLBACKS.get(spec, [])]
+        policy = spec
+    # Keep order, drop duplicates (e.g. a tier overridden to the same model as its fallback)
+    return Route(task_type, list(dict.fromkeys(models)), policy)
+
+
+def build_routes(config):
+    tiers = dict(MODEL_TIERS, **config.get("tiers", {}))
+    tasks = dict(TASK_POLICY, **config.get("tasks", {}))
+    return {task_type: _make_route(task_type, spec, tiers) for task_type, spec in tasks.items()}, tiers
+
+
+ROUTES, _TIERS = build_routes(_load_config())
+
+# Primary model per task (kept for callers that only need one model name)
+TASK_MODEL_MAP = {task_type: route.model for task_type, route in ROUTES.items()}
+
+
+def route_for(task_type):
+    route = ROUTES.get(task_type)
+    if route is None:
+        route = _make_route(task_type, DEFAULT_POLICY, _TIERS)
+    if VERBOSE_ROUTING:
+        print(f"🧭 Route: {route}")
+    return route
@@ -0,0 +1,239 @@
+# npm_repair.py
+# Diagnoses a failed `npm install` from its error output and fixes package.json.
+#
+# npm's errors are parsed into findings (missing package, no matching version, invalid
+# version tag, peer dependency conflict, malformed package.json). Findings with a known
+# fix are fixed locally; only when none applies is the LLM asked, and then only with the
+# error lines and the dependency sections of package.json.
+
+import os
+import re
+import json
+import subprocess
+import json5
+from groq_client import call_groq
+from system_utils import atomic_write
+from npm_cache import NPM_CACHE_DIR, NPM_CACHE_ENABLED
+from bulk_manifest import strip_code_fences
+
+NPM_REPAIR_ROUNDS = int(os.getenv("AITALK_NPM_REPAIR_ROUNDS", "3"))
+MAX_ERROR_LINES = 40
+
+DEPENDENCY_SECTIONS = ("dependencies", "devDependencies", "optionalDependencies", "peerDependencies")
+FRAGMENT_KEYS = DEPENDENCY_SECTIONS + ("overrides",)
+
+ERROR_LINE = re.compile(r"^npm (?:ERR!|error)\s?(.*)$")
+CODE = re.compile(r"^code (E[A-Z0-9]+)")
+NOT_IN_REGISTRY = re.compile(r"""404\s+'?(@?[^@'\s]+)@?([^'\s]*)'? is not in (?:the npm|this) registry""")
+NOT_FOUND_URL = re.compile(r"404 Not Found - GET https?://[^/\s]+/(@?[^/\s]+)")
+NO_MATCHING_VERSION = re.compile(r"No matching version found for (@?[^@\s]+)@(\S+?)\.?$")
+INVALID_TAG = re.compile(r'Invalid tag name "([^"]*)" of package "(@?[^@"]+)@')
+FOUND = re.compile(r"^Found: (@?[^@\s]+)@(\S+)")
+NEEDED_BY = re.compile(r'^(peer )?(@?[^@\s]+)@"([^"]+)" from (@?[^@\s]+)@(\S+)')
+LOG_FILE_LINE = re.compile(r"(complete log of this run|A complete log|\.npm/_logs/)", re.IGNORECASE)
+
+
+def error_lines(output):
+    """npm's own error lines with the prefix stripped, without log-file pointers, de-duplicated."""
+    lines = []
+    for raw in output.splitlines():
+        match = ERROR_LINE.match(raw.strip())
+        if match and match.group(1).strip() and not LOG_FILE_LINE.search(match.group(1)):
+            lines.append(match.group(1).rstrip())
+    return list(dict.fromkeys(lines))
+
+
+def parse_npm_errors(output):
+    """
+    Structured findings from npm's error output, each a dict with "code", "package",
+    "spec", "detail" and "lines" (the error lines that produced it).
+    """
+    lines = error_lines(output)
+    code = next((m.group(1) for m in map(CODE.match, lines) if m), None)
+    findings = []
+
+    def add(kind, package, spec, detail, line):
+        if not any(f["code"] == kind and f["package"] == package for f in findings):
+            findings.append({"code": kind, "package": package, "spec": spec, "detail": detail, "lines": [line]})
+
+    found = None
+    for line in lines:
+        match = NOT_IN_REGISTRY.search(line)
+        if match:
+            add("E404", match.group(1), match.group(2), f"{match.group(1)} does not exist in the registry", line)
+            continue
+        match = NOT_FOUND_URL.search(line)
+        if match:
+            package = match.group(1).replace("%2f", "/").replace("%2F", "/")
+            add("E404", package, "", f"{package} does not exist in the registry", line)
+            continue
+        match = NO_MATCHING_VERSION.search(line)
+        if match:
+            add("ETARGET", match.group(1), match.group(2), f"no version of {match.group(1)} matches {match.group(2)}", line)
+            continue
+        match = INVALID_TAG.search(line)
+        if match:
+            add("EINVALIDTAGNAME", match.group(2), match.group(1), f"{match.group(1)!r} is not a valid version of {match.group(2)}", line)
+            continue
+        match = FOUND.match(line)
+        if match:
+            found = match.groups()
+            continue
+        match = NEEDED_BY.match(line)
+        if match and code == "ERESOLVE" and match.group(4) not in ("the", "root"):
+            peer, needed, range_, dependent, version = match.groups()
+            detail = f"{dependent}@{version} needs {'peer ' if peer else ''}{needed}@{range_}"
+            if found and found[0] == needed:
+                detail += f", but {needed}@{found[1]} is installed"
+            add("ERESOLVE", dependent, range_, detail, line)
+
+    if code == "ERESOLVE" and not any(f["code"] == "ERESOLVE" for f in findings):
+        add("ERESOLVE", None, "", "conflicting dependency versions", next(l for l in lines if "ERESOLVE" in l))
+    if not findings and lines:
+        detail = next((line for line in lines if not CODE.match(line)), code)
+        findings.append({"code": code or "UNKNOWN", "package": None, "spec": "", "detail": detail,
+                         "lines": lines[-MAX_ERROR_LINES:]})
+    return findings
+
+
+def describe(finding):
+    return f"{finding['code']}: {finding['detail']}"
+
+
+def read_package_json(base_path):
+    """package.json, read leniently (comments, trailing commas) so EJSONPARSE can be fixed by rewriting it."""
+    with open(os.path.join(base_path, "package.json"), "r") as f:
+        return json5.load(f)
+
+
+def write_package_json(base_path, package_json):
+    atomic_write(os.path.join(base_path, "package.json"), json.dumps(package_json, indent=2) + "\n")
+
+
+def dependency_section(package_json, package):
+    """Name of the package.json section that lists package directly, or None for transitive packages."""
+    for section in DEPENDENCY_SECTIONS:
+        if isinstance(package_json.get(section), dict) and package in package_json[section]:
+            return section
+    return None
+
+
+def latest_version(package):
+    """Latest published version of package (from the shared cache when possible), or None."""
+    cmd = ["npm", "view", package, "version"]
+    if NPM_CACHE_ENABLED:
+        cmd += ["--prefer-offline", "--cache", NPM_CACHE_DIR]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r"(\d+\.\d+\.\d+\S*?)['\"]?\s*$", result.stdout) if result.returncode == 0 else None
+    return match.group(1) if match else None
+
+
+def apply_local_fixes(base_path, findings, applied):
+    """
+    Fix what can be fixed without the LLM. `applied` holds fixes from earlier rounds so
+    none is tried twice. Returns descriptions of the changes made (empty if none applied).
+    """
+    package_json = read_package_json(base_path)
+    changes = []
+    package_changed = False
+    for finding in findings:
+        package = finding["package"]
+        fix = (finding["code"], package)
+        if fix in applied:
+            continue
+        if finding["code"] == "ERESOLVE":
+            # Same as `npm install --legacy-peer-deps`, kept in .npmrc so later installs agree
+            npmrc_path = os.path.join(base_path, ".npmrc")
+            existing = open(npmrc_path).read() if os.path.exists(npmrc_path) else ""
+            if "legacy-peer-deps" not in existing:
+                atomic_write(npmrc_path, existing + ("" if not existing or existing.endswith("\n") else "\n")
+                             + "legacy-peer-deps=true\n")
+                changes.append("set legacy-peer-deps=true in .npmrc (peer dependency conflict)")
+            applied.add(fix)
+            continue
+        if finding["code"] == "EJSONPARSE":
+            changes.append("rewrote package.json as strict JSON")
+            applied.add(fix)
+            package_changed = True
+            continue
+        section = dependency_section(package_json, package) if package else None
+        if section is None:
+            continue  # a transitive package: nothing in package.json to change
+        if finding["code"] == "E404":
+            del package_json[section][package]
+            changes.append(f"removed {package} from {section} (not in the registry)")
+        elif finding["code"] in ("ETARGET", "EINVALIDTAGNAME"):
+            version = latest_version(package)
+            spec = f"^{version}" if version else "latest"
+            changes.append(f"pinned {package} to {spec} in {section} (was {package_json[section][package]})")
+            package_json[section][package] = spec
+        else:
+            continue
+        applied.add(fix)
+        package_changed = True
+    if package_changed:
+        write_package_json(base_path, package_json)
+    return changes
+
+
+def package_fragment(package_json):
+    return {key: package_json[key] for key in FRAGMENT_KEYS if isinstance(package_json.get(key), dict)}
+
+
+def generate_prompt_for_repair(findings, lines, fragment):
+    diagnosis = "\n".join(f"- {describe(f)}" for f in findings) or "- (no recognised error)"
+    return f"""
+You are an expert in fixing npm errors in React 18 projects.
+
+`npm install` failed. The relevant error lines are:
+{chr(10).join(lines)}
+
+Diagnosis:
+{diagnosis}
+
+These are the dependency sections of package.json:
+{json.dumps(fragment, indent=2)}
+
+Return ONLY a JSON object with the same keys, fixed so that `npm install` succeeds (no explanation, no backticks, no markdown).
+Keep every package the app needs and keep react-scripts.
+"""
+
+
+def llm_repair(base_path, findings, output):
+    """Last resort: ask the LLM to fix the dependency sections. Returns descriptions of the changes."""
+    package_json = read_package_json(base_path)
+    fragment = package_fragment(package_json)
+    lines = [line for f in findings for line in f["lines"]]
+    lines = list(dict.fromkeys(lines or error_lines(output)))[-MAX_ERROR_LINES:]
+    print("🤖 No local fix applies; asking Groq to fix the dependencies...")
+    answer = call_groq(generate_prompt_for_repair(findings, lines, fragment), task_type="fix_package_json")
+    if answer is None:  # retries or the deadline ran out
+        print("❌ Groq did not answer; no dependency fix from the LLM.")
+        return []
+    answer = strip_code_fences(answer)
+    start, end = answer.find("{"), answer.rfind("}")
+    try:
+        fixed = json5.loads(answer[start:end + 1]) if start != -1 else None
+    except ValueError:
+        fixed = None
+    if not isinstance(fixed, dict):
+        print("❌ Groq did not return valid dependency sections.")
+        return []
+    changes = []
+    for key in FRAGMENT_KEYS:
+        if isinstance(fixed.get(key), dict) and fixed[key] != package_json.get(key):
+            before, after = package_json.get(key) or {}, fixed[key]
+            removed = sorted(set(before) - set(after))
+            changed = sorted(name for name in after if before.get(name) != after[name])
+            package_json[key] = after
+            changes.append(f"{key}: " + ", ".join([f"-{name}" for name in removed]
+                                                  + [f"{name}@{after[name]}" for name in changed]))
+    deps = package_json.setdefault("dependencies", {})
+    if "react-scripts" in fragment.get("dependencies", {}) and "react-scripts" not in deps:
+        deps["react-scripts"] = fragment["dependencies"]["react-scripts"]
+    if changes:
+        write_package_json(base_path, package_json)
+    return changes
@@ -0,0 +1,173 @@
+# plan_cache.py
+# Remembers the plan (file list and project name) of every --create-project build, so
+# a new description close to an earlier one can reuse its plan instead of three
+# planning calls, or hand it to the LLM as a starting point.
+#
+# Descriptions are normalised (lowercased, stopwords dropped, crude plural stemming)
+# into token sets. A MinHash index with LSH banding finds candidates quickly and
+# TF-IDF cosine similarity over the cached descriptions ranks them.
+
+import os
+import re
+import json
+import math
+import time
+import zlib
+import random
+import hashlib
+from system_utils import AITALK_HOME, atomic_write, FileLock
+
+PLAN_CACHE_ENABLED = os.getenv("AITALK_PLAN_CACHE", "1").lower() not in ("0", "false", "no")
+PLAN_CACHE_PATH = os.path.expanduser(os.getenv("AITALK_PLAN_CACHE_PATH", os.path.join(AITALK_HOME, "plans.json")))
+PLAN_REUSE_THRESHOLD = float(os.getenv("AITALK_PLAN_REUSE", "0.85"))
+PLAN_SEED_THRESHOLD = float(os.getenv("AITALK_PLAN_SEED", "0.35"))
+PLAN_CACHE_MAX_ENTRIES = 500
+PLAN_CACHE_VERSION = 1
+
+MINHASH_PERMUTATIONS = 64
+LSH_ROWS = 2  # rows per band: with 32 bands, descriptions sharing half their words almost always collide
+MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240611)  # fixed seed: signatures are stored on disk and compared across runs
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+                for _ in range(MINHASH_PERMUTATIONS)]
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "with", "without", "for", "of", "to", "in", "on", "at", "by",
+    "from", "into", "that", "which", "where", "who", "this", "these", "those", "it", "its", "is", "are",
+    "be", "can", "could", "should", "would", "will", "has", "have", "i", "we", "you", "me", "my", "our",
+    "your", "some", "any", "all", "each", "so", "as", "also", "using", "use", "via", "like", "want",
+    "need", "please", "make", "build", "create", "simple", "basic", "modern", "nice", "small",
+    "react", "app", "application", "website", "site", "web", "page", "project",
+}
+
+_disabled = not PLAN_CACHE_ENABLED
+
+
+def disable():
+    """Bypass the plan cache for the rest of this process (aitalk --no-cache)."""
+    global _disabled
+    _disabled = True
+
+
+def normalise(description):
+    """Sorted, de-duplicated content words of a description ("Todo apps" and "a todo app" agree)."""
+    tokens = set()
+    for word in re.findall(r"[a-z0-9]+", description.lower()):
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        if word not in STOPWORDS:
+            tokens.add(word)
+    return sorted(tokens)
+
+
+def fingerprint(tokens):
+    return hashlib.sha1(" ".join(tokens).encode("utf-8")).hexdigest()
+
+
+def minhash(tokens):
+    hashes = [zlib.crc32(token.encode("utf-8")) for token in tokens]
+    if not hashes:
+        return [MERSENNE_PRIME] * MINHASH_PERMUTATIONS
+    return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS]
+
+
+def lsh_bands(signature):
+    return [f"{i}:{','.join(map(str, signature[i:i + LSH_ROWS]))}"
+            for i in range(0, len(signature), LSH_ROWS)]
+
+
+def tfidf_cosine(tokens, other, document_frequency, documents):
+    """Cosine similarity of two token sets, words weighted by how rare they are among cached plans."""
+    def weight(token):
+        return math.log((documents + 1) / (document_frequency.get(token, 0) + 1)) + 1
+
+    shared = set(tokens) & set(other)
+    if not shared:
+        return 0.0
+    dot = sum(weight(t) ** 2 for t in shared)
+    norm = math.sqrt(sum(weight(t) ** 2 for t in tokens)) * math.sqrt(sum(weight(t) ** 2 for t in other))
+    return dot / norm if norm else 0.0
+
+
+def _load():
+    try:
+        with open(PLAN_CACHE_PATH, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if not isinstance(data, dict) or data.get("version") != PLAN_CACHE_VERSION:
+        return []
+    return [e for e in data.get("entries", []) if isinstance(e, dict) and e.get("file_list")]
+
+
+def _save(entries):
+    entries = sorted(entries, key=lambda e: e.get("used_at", 0), reverse=True)[:PLAN_CACHE_MAX_ENTRIES]
+    atomic_write(PLAN_CACHE_PATH, json.dumps({"version": PLAN_CACHE_VERSION, "entries": entries}))
+
+
+def lookup(description):
+    """
+    (entry, score) for the cached plan most similar to description, or (None, 0.0).
+    entry holds "description", "file_list" and "name"; score is the TF-IDF cosine
+    similarity in [0, 1] (1.0 when the normalised descriptions are identical).
+    """
+    if _disabled:
+        return None, 0.0
+    tokens = normalise(description)
+    entries = _load()
+    if not tokens or not entries:
+        return None, 0.0
+    key = fingerprint(tokens)
+    exact = next((e for e in entries if e.get("fingerprint") == key), None)
+    if exact:
+        return exact, 1.0
+
+    index = {}
+    for position, entry in enumerate(entries):
+        for band in lsh_bands(entry.get("minhash") or minhash(entry.get("tokens", []))):
+            index.setdefault(band, []).append(position)
+    candidates = {p for band in lsh_bands(minhash(tokens)) for p in index.get(band, ())}
+    if not candidates:
+        return None, 0.0
+    document_frequency = {}
+    for entry in entries:
+        for token in entry.get("tokens", []):
+            document_frequency[token] = document_frequency.get(token, 0) + 1
+    scored = [(tfidf_cosine(tokens, entries[p].get("tokens", []), document_frequency, len(entries)), p)
+              for p in candidates]
+    score, best = max(scored)
+    return entries[best], score
+
+
+def store(description, file_list, name):
+    """Remember the plan of a build (replacing the plan of an identically normalised description)."""
+    if _disabled or not file_list:
+        return
+    tokens = normalise(description)
+    if not tokens:
+        return
+    key = fingerprint(tokens)
+    now = time.time()
+    try:
+        with FileLock(PLAN_CACHE_PATH + ".lock"):
+            entries = [e for e in _load() if e.get("fingerprint") != key]
+            entries.append({"fingerprint": key, "tokens": tokens, "minhash": minhash(tokens),
+                            "description": description, "file_list": list(file_list), "name": name,
+                            "created_at": now, "used_at": now})
+            _save(entries)
+    except OSError as e:
+        print(f"⚠️ Could not write the plan cache: {e}")
+
+
+def touch(entry):
+    """Mark a cached plan as just used, so eviction keeps the plans that keep being reused."""
+    try:
+        with FileLock(PLAN_CACHE_PATH + ".lock"):
+            entries = _load()
+            for e in entries:
+                if e.get("fingerprint") == entry.get("fingerprint"):
+                    e["used_at"] = time.time()
+                    e["hits"] = e.get("hits", 0) + 1
+            _save(entries)
+    except OSError:
+        pass
@@ -0,0 +1,208 @@
+# process_runner.py
+# Runs the external steps of a build (git, npm) as asyncio subprocesses on one event loop.
+#
+# Steps submitted from any thread run concurrently on a background loop. Output is
+# streamed live as it arrives, and only the last lines of each step are kept for error
+# analysis. Failed steps are retried with exponential backoff.
+
+import os
+import re
+import time
+import random
+import shutil
+import asyncio
+import threading
+from collections import deque
+
+OUTPUT_BUFFER_LINES = int(os.getenv("AITALK_OUTPUT_BUFFER_LINES", "200"))
+RETRY_BASE_DELAY = float(os.getenv("AITALK_STEP_RETRY_DELAY", "1.0"))
+RETRY_MAX_DELAY = 30.0
+READ_CHUNK = 4096
+
+_print_lock = threading.Lock()
+
+
+class StepResult:
+    """Outcome of one step: output holds only the last OUTPUT_BUFFER_LINES lines."""
+
+    def __init__(self, name, ok, returncode, output, elapsed, attempts):
+        self.name = name
+        self.ok = ok
+        self.returncode = returncode
+        self.output = output
+        self.elapsed = elapsed
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"StepResult({self.name!r}, ok={self.ok}, returncode={self.returncode}, {self.elapsed:.2f}s)"
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with jitter before retry number `attempt` (1-based)."""
+    return min(RETRY_BASE_DELAY * 2 ** (attempt - 1), RETRY_MAX_DELAY) * random.uniform(0.5, 1.0)
+
+
+def _emit(text, prefix):
+    with _print_lock:
+        if prefix:
+            for line in text.splitlines():
+                print(f"{prefix}{line}")
+        else:
+            print(text, end="", flush=True)
+
+
+async def _attempt(cmd, cwd, env, ring, prefix, responders, timeout, watch=None):
+    """Run cmd once, streaming its output; returns the exit code."""
+    executable = shutil.which(cmd[0]) or cmd[0]  # finds npm.cmd on Windows
+    process = await asyncio.create_subprocess_exec(
+        executable, *cmd[1:], cwd=cwd, env=env,
+        stdin=asyncio.subprocess.PIPE if responders else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+    answered = set()
+    partial = ""
+
+    async def pump():
+        nonlocal partial
+        while True:
+            chunk = await process.stdout.read(READ_CHUNK)
+            if not chunk:
+                break
+            decoded = chunk.decode("utf-8", errors="replace")
+            text = partial + decoded
+            lines = text.split("\n")
+            partial = lines.pop()
+            complete = "".join(line + "\n" for line in lines)
+            if complete:
+                ring.extend(lines)
+                _emit(complete, prefix)
+            if watch is not None:
+                watch.feed(decoded)
+            # Prompts wait for input without printing a newline, so check the partial line too
+            for pattern, answer in (responders or {}).items():
+                if pattern not in answered and re.search(pattern, complete + partial, re.IGNORECASE):
+                    if partial:
+                        _emit(partial + "\n", prefix)
+                        ring.append(partial)
+                        partial = ""
+                    _emit(f"⚠️ Answering {answer.strip()!r} to: {pattern}\n", prefix)
+                    answered.add(pattern)
+                    process.stdin.write(answer.encode())
+                    await process.stdin.drain()
+        if partial:
+            ring.append(partial)
+            _emit(partial + "\n", prefix)
+
+    try:
+        await asyncio.wait_for(asyncio.gather(pump(), process.wait()), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        ring.append(f"Timed out after {timeout:g}s")
+        _emit(f"⏰ {' '.join(cmd)} timed out after {timeout:g}s\n", prefix)
+    except BaseException:
+        if process.returncode is None:
+            process.kill()  # cancelled or interrupted: don't leave the child running
+        raise
+    return process.returncode
+
+
+async def run_step(name, cmd, cwd=None, retries=1, env=None, responders=None, prefix=None, timeout=None,
+                   watch=None):
+    """
+    Run one step, retrying failures (up to `retries` attempts in total) with exponential backoff.
+    responders maps a regex seen in the output to the text to type in reply (answered once).
+    Output lines are printed as they arrive, prefixed with `prefix` (default "[name] "), and
+    passed as they are read to watch.feed(text) when a watch object is given.
+    """
+    prefix = f"   [{name}] " if prefix is None else prefix
+    env = dict(os.environ, **(env or {}))
+    ring = deque(maxlen=OUTPUT_BUFFER_LINES)
+    start = time.perf_counter()
+    returncode = None
+    attempt = 0
+    for attempt in range(1, retries + 1):
+        note = f" (attempt {attempt}/{retries})" if retries > 1 else ""
+        _emit(f"🔄 Running {name}{note}: {' '.join(cmd)}\n", "")
+        ring.clear()
+        try:
+            returncode = await _attempt(cmd, cwd, env, ring, prefix, responders, timeout, watch)
+        except OSError as e:  # e.g. the command is not installed
+            ring.append(str(e))
+            returncode = None
+            _emit(f"❌ Could not run {cmd[0]}: {e}\n", "")
+            break
+        if returncode == 0:
+            break
+        if attempt < retries:
+            delay = backoff_delay(attempt)
+            _emit(f"⚠️ {name} exited with {returncode}; retrying in {delay:.1f}s...\n", "")
+            await asyncio.sleep(delay)
+    return StepResult(name, returncode == 0, returncode, "\n".join(ring), time.perf_counter() - start, attempt)
+
+
+async def run_chain(steps):
+    """Run (name, cmd, kwargs) steps one after another, stopping at the first failure."""
+    results = []
+    for name, cmd, kwargs in steps:
+        result = await run_step(name, cmd, **kwargs)
+        results.append(result)
+        if not result.ok:
+            break
+    return results
+
+
+class StepRunner:
+    """An event loop on a daemon thread that steps can be submitted to from any thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.results = []
+        self._lock = threading.Lock()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True, name="aitalk-steps")
+        self.thread.start()
+
+    def submit(self, coro):
+        """Schedule a coroutine; returns a concurrent.futures.Future for its result."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(self._collect)
+        return future
+
+    def run(self, coro):
+        """Run a coroutine on the loop and wait for its result."""
+        future = self.submit(coro)
+        try:
+            return future.result()
+        except KeyboardInterrupt:
+            future.cancel()
+            raise
+
+    def _collect(self, future):
+        if future.cancelled() or future.exception():
+            return
+        result = future.result()
+        with self._lock:
+            self.results.extend(result if isinstance(result, list) else [result])
+
+    def timing_report(self, wall=None):
+        """One line with every finished step's time and, given the wall-clock time they took, the overlap."""
+        with self._lock:
+            results = [r for r in self.results if isinstance(r, StepResult)]
+        if not results:
+            return None
+        steps = ", ".join(f"{r.name} {r.elapsed:.2f}s" + (f" ({r.attempts} attempts)" if r.attempts > 1 else "")
+                          + ("" if r.ok else " ❌") for r in results)
+        total = sum(r.elapsed for r in results)
+        overlap = f" in {wall:.2f}s wall-clock" if wall is not None and wall < total else ""
+        return f"⏱️ Steps: {steps}; {total:.2f}s of work{overlap}."
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = StepRunner()
+        return _runner
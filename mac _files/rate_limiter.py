@@ -0,0 +1,162 @@
+# rate_limiter.py
+# Client-side pacing for the Groq API, driven by its x-ratelimit-* response headers.
+
+import os
+import re
+import time
+import random
+import threading
+
+REQUESTS_PER_MINUTE = float(os.getenv("AITALK_REQUESTS_PER_MINUTE", "30"))
+# Starting point only: the x-ratelimit-limit-tokens header replaces it after the first response,
+# unless AITALK_TOKENS_PER_MINUTE is set, which then caps what the server reports
+TOKENS_PER_MINUTE = float(os.getenv("AITALK_TOKENS_PER_MINUTE", "30000"))
+TOKENS_PER_MINUTE_SET = "AITALK_TOKENS_PER_MINUTE" in os.environ
+# Window of each x-ratelimit-limit-* header: Groq reports requests per day and tokens per minute
+LIMIT_WINDOWS = {"requests": 24 * 3600, "tokens": 60}
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_reset(value):
+    """Parse Groq reset values such as '7.66s', '2m59.56s', '1h2m' or '250ms' into seconds."""
+    if value is None:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    def __init__(self, limit, window_seconds=60):
+        self.capacity = limit
+        self.available = limit
+        self.refill_per_second = limit / window_seconds
+        self.updated = time.monotonic()
+
+    def resize(self, limit, window_seconds):
+        """Adopt a limit reported by the server, keeping what has been spent from the bucket."""
+        self.available = max(0.0, min(limit, self.available + limit - self.capacity))
+        self.capacity = limit
+        self.refill_per_second = limit / window_seconds
+
+    def refill(self, now):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def wait_time(self, amount):
+        # Requests larger than the whole bucket only wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.refill_per_second
+
+
+class RateLimiter:
+    """
+    Request and token buckets shared by every thread using the client. Buckets
+    pace calls before the API rejects them, response headers set their limits
+    and correct the local estimate, and a 429/overload blocks all callers until
+    the backoff expires.
+    """
+
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=None):
+        self._lock = threading.Lock()
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(TOKENS_PER_MINUTE if tokens_per_minute is None else tokens_per_minute)
+        # An explicit token rate caps the server's; otherwise the server's limit is used as is
+        self.max_tokens_per_minute = tokens_per_minute if tokens_per_minute is not None else (
+            TOKENS_PER_MINUTE if TOKENS_PER_MINUTE_SET else None)
+        self.daily_requests = None  # created from x-ratelimit-limit-requests
+        self.blocked_until = 0.0
+
+    def acquire(self, estimated_tokens=0, max_wait=None):
+        """
+        Block until a request of estimated_tokens may be sent; returns seconds
+        spent waiting, or None (without sending) if that would exceed max_wait.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                if self.daily_requests:
+                    self.daily_requests.refill(now)
+                wait = max(self.blocked_until - now,
+                           self.requests.wait_time(1),
+                           self.daily_requests.wait_time(1) if self.daily_requests else 0.0,
+                           self.tokens.wait_time(estimated_tokens))
+                if wait <= 0:
+                    self.requests.available -= 1
+                    if self.daily_requests:
+                        self.daily_requests.available -= 1
+                    self.tokens.available -= min(estimated_tokens, self.tokens.capacity)
+                    return waited
+            if max_wait is not None and waited + wait > max_wait:
+                return None
+            time.sleep(wait)
+            waited += wait
+
+    def _apply_limit(self, kind, value, now):
+        """Size the bucket for kind from its x-ratelimit-limit-* header; returns that bucket."""
+        try:
+            limit = float(value)
+        except (TypeError, ValueError):
+            limit = 0.0
+        if kind == "tokens":
+            if limit > 0:
+                if self.max_tokens_per_minute:
+                    limit = min(limit, self.max_tokens_per_minute)
+                if limit != self.tokens.capacity:
+                    self.tokens.refill(now)
+                    self.tokens.resize(limit, LIMIT_WINDOWS[kind])
+            return self.tokens
+        if limit > 0:
+            if self.daily_requests is None:
+                self.daily_requests = TokenBucket(limit, LIMIT_WINDOWS[kind])
+            elif limit != self.daily_requests.capacity:
+                self.daily_requests.refill(now)
+                self.daily_requests.resize(limit, LIMIT_WINDOWS[kind])
+        # The per-minute request bucket keeps the configured pace: Groq reports no per-minute limit
+        return self.daily_requests or self.requests
+
+    def update_from_headers(self, headers):
+        with self._lock:
+            now = time.monotonic()
+            for kind in ("requests", "tokens"):
+                bucket = self._apply_limit(kind, headers.get(f"x-ratelimit-limit-{kind}"), now)
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                if remaining is None:
+                    continue
+                try:
+                    remaining = float(remaining)
+                except ValueError:
+                    continue
+                reset = parse_reset(headers.get(f"x-ratelimit-reset-{kind}"))
+                if remaining <= 0 and reset:
+                    # Out of quota: nobody sends until the server's window resets
+                    self.blocked_until = max(self.blocked_until, now + reset)
+                else:
+                    # Trust the server when it says we have less than we think
+                    bucket.available = min(bucket.available, remaining)
+
+    def backoff(self, attempt, retry_after=None):
+        """Pause every caller after a rejection; returns the delay chosen."""
+        delay = parse_reset(retry_after) if retry_after else None
+        if delay is None:
+            delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+        # Jitter so concurrent callers don't all retry in the same instant
+        delay *= random.uniform(1.0, 1.5)
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        return delay
@@ -1,5 +1,8 @@
 import os
-from groq_client import call_groq
+from groq_client import stream_groq, print_stream
+from async_groq_client import gather_groq
+from model_router import TASK_MODEL_MAP
+from token_budget import fit_to_budget, estimate_tokens, describe
 
 def extract_text(file_path):
     ext = os.path.splitext(file_path)[1].lower()
@@ -29,6 +32,14 @@ def extract_text(file_path):
         print(f"❌ Unsupported file type: {ext}")
         return None
 
+SUMMARY_MODEL = TASK_MODEL_MAP["summarize"]
+
+def build_summary_prompt(prompt, content):
+    header = f"Summarize this file based on the following instruction: '{prompt}'.\n\nFile content:\n"
+    # Long documents keep their beginning and end; the middle is elided
+    content = fit_to_budget(content, SUMMARY_MODEL, overhead=header, strategy="middle")
+    return header + content
+
 def summarise_file(prompt, file_path):
     if not os.path.exists(file_path):
         print(f"❌ File not found: {file_path}")
@@ -37,8 +48,31 @@ def summarise_file(prompt, file_path):
     if not content:
         print("❌ Could not extract text from file.")
         return
-    llm_prompt = f"Summarize this file based on the following instruction: '{prompt}'.\n\nFile content:\n{content}"
-    summary = call_groq(llm_prompt, task_type="summarize")
+    llm_prompt = build_summary_prompt(prompt, content)
+    print(f"📏 {describe(estimate_tokens(llm_prompt, SUMMARY_MODEL), SUMMARY_MODEL)}")
     print("------ Summary ------")
-    print(summary)
-    print("---------------------")
\ No newline at end of file
+    summary = print_stream(stream_groq(llm_prompt, task_type="summarize"))
+    print("---------------------")
+    return summary
+
+def summarise_files(prompt, file_paths):
+    """Summarise several files concurrently, printing the summaries in the order given."""
+    jobs = []
+    for file_path in file_paths:
+        if not os.path.exists(file_path):
+            print(f"❌ File not found: {file_path}")
+            continue
+        content = extract_text(file_path)
+        if not content:
+            print(f"❌ Could not extract text from {file_path}.")
+            continue
+        jobs.append((file_path, {"prompt": build_summary_prompt(prompt, content), "task_type": "summarize"}))
+    if not jobs:
+        return []
+
+    summaries = gather_groq([request for _, request in jobs])
+    for (file_path, _), summary in zip(jobs, summaries):
+        print(f"------ Summary: {file_path} ------")
+        print(summary)
+    print("---------------------")
+    return summaries
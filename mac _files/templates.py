@@ -0,0 +1,234 @@
+# templates.py
+# Versioned local templates for boilerplate files, rendered instead of asking the LLM.
+#
+# Built-in templates live below; files in ~/.aitalk/templates (or AITALK_TEMPLATE_DIR)
+# override or extend them, keyed by their path relative to that directory, e.g.
+# ~/.aitalk/templates/src/index.js. Templates use $placeholders (see template_context).
+
+import os
+import re
+import json
+from string import Template
+from system_utils import AITALK_HOME
+
+TEMPLATE_STORE_VERSION = 1
+TEMPLATES_ENABLED = os.getenv("AITALK_TEMPLATES", "1").lower() not in ("0", "false", "no")
+USER_TEMPLATE_DIR = os.path.expanduser(os.getenv("AITALK_TEMPLATE_DIR", os.path.join(AITALK_HOME, "templates")))
+
+BASE_DEPENDENCIES = {
+    "react": "^18.2.0",
+    "react-dom": "^18.2.0",
+    "react-scripts": "5.0.1",
+}
+# Extra packages implied by words in the project description
+DEPENDENCY_HINTS = [
+    (r"\b(rout(e|er|ing)|pages?|navigation|multi-page)\b", {"react-router-dom": "^6.22.0"}),
+    (r"\b(charts?|graphs?|analytics|dashboard)\b", {"recharts": "^2.12.0"}),
+    (r"\b(api|fetch|http|rest|backend)\b", {"axios": "^1.6.7"}),
+    (r"\bredux\b", {"@reduxjs/toolkit": "^2.2.1", "react-redux": "^9.1.0"}),
+    (r"\b(dates?|calendar|schedul\w*)\b", {"date-fns": "^3.3.1"}),
+    (r"\bicons?\b", {"react-icons": "^5.0.1"}),
+    (r"\bstyled[- ]components\b", {"styled-components": "^6.1.8"}),
+    (r"\bforms?\b", {"react-hook-form": "^7.50.1"}),
+    (r"\b(todos?|uuid|unique ids?)\b", {"uuid": "^9.0.1"}),
+]
+TESTING_DEPENDENCIES = {
+    "@testing-library/jest-dom": "^5.17.0",
+    "@testing-library/react": "^13.4.0",
+    "@testing-library/user-event": "^13.5.0",
+}
+
+BUILTIN_TEMPLATES = {
+    "package.json": {"version": 1, "content": """{
+  "name": "$project_name",
+  "version": "0.1.0",
+  "private": true,
+  "dependencies": $dependencies,
+  "scripts": {
+    "start": "react-scripts start",
+    "build": "react-scripts build",
+    "test": "react-scripts test",
+    "eject": "react-scripts eject"
+  },
+  "eslintConfig": {
+    "extends": ["react-app", "react-app/jest"]
+  },
+  "browserslist": {
+    "production": [">0.2%", "not dead", "not op_mini all"],
+    "development": ["last 1 chrome version", "last 1 firefox version", "last 1 safari version"]
+  }
+}
+"""},
+    "public/index.html": {"version": 1, "content": """<!DOCTYPE html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1" />
+    <meta name="theme-color" content="#000000" />
+    <meta name="description" content="$description_html" />
+    <title>$title</title>
+  </head>
+  <body>
+    <noscript>You need to enable JavaScript to run this app.</noscript>
+    <div id="root"></div>
+  </body>
+</html>
+"""},
+    "src/index.js": {"version": 1, "content": """import React from 'react';
+import ReactDOM from 'react-dom/client';
+${index_css_import}import App from './App';
+${web_vitals_import}
+const root = ReactDOM.createRoot(document.getElementById('root'));
+root.render(
+  <React.StrictMode>
+    <App />
+  </React.StrictMode>
+);
+${web_vitals_call}"""},
+    "src/reportWebVitals.js": {"version": 1, "content": """const reportWebVitals = onPerfEntry => {
+  if (onPerfEntry && onPerfEntry instanceof Function) {
+    import('web-vitals').then(({ getCLS, getFID, getFCP, getLCP, getTTFB }) => {
+      getCLS(onPerfEntry);
+      getFID(onPerfEntry);
+      getFCP(onPerfEntry);
+      getLCP(onPerfEntry);
+      getTTFB(onPerfEntry);
+    });
+  }
+};
+
+export default reportWebVitals;
+"""},
+    "src/setupTests.js": {"version": 1, "content": """// Adds custom jest matchers for asserting on DOM nodes, e.g. expect(element).toHaveTextContent(/react/i)
+import '@testing-library/jest-dom';
+"""},
+    ".gitignore": {"version": 3, "content": """# dependencies
+/node_modules
+/.pnp
+.pnp.js
+
+# testing
+/coverage
+
+# production
+/build
+
+# misc
+.DS_Store
+.env
+.env.local
+.env.development.local
+.env.test.local
+.env.production.local
+
+npm-debug.log*
+yarn-debug.log*
+yarn-error.log*
+
+# aitalk build record and --detach dev server
+.aitalk-build.json
+.aitalk-dev-server.pid
+.aitalk-dev-server.log
+"""},
+    "README.md": {"version": 1, "content": """# $title
+
+$description
+
+## Getting Started
+
+```bash
+npm install
+npm start
+```
+
+Open [http://localhost:3000](http://localhost:3000) to view it in the browser.
+
+## Scripts
+
+- `npm start` runs the app in development mode.
+- `npm test` runs the test runner in watch mode.
+- `npm run build` builds the app for production into the `build` folder.
+"""},
+    "public/robots.txt": {"version": 1, "content": """# https://www.robotstxt.org/robotstxt.html
+User-agent: *
+Disallow:
+"""},
+    "public/manifest.json": {"version": 1, "content": """{
+  "short_name": "$title",
+  "name": "$title",
+  "start_url": ".",
+  "display": "standalone",
+  "theme_color": "#000000",
+  "background_color": "#ffffff"
+}
+"""},
+}
+
+
+def infer_dependencies(description, file_list=()):
+    deps = dict(BASE_DEPENDENCIES)
+    for pattern, packages in DEPENDENCY_HINTS:
+        if re.search(pattern, description, re.IGNORECASE):
+            deps.update(packages)
+    if "src/reportWebVitals.js" in file_list:
+        deps["web-vitals"] = "^2.1.4"
+    if any(re.search(r"(\.test\.|setupTests)", path) for path in file_list):
+        deps.update(TESTING_DEPENDENCIES)
+    return dict(sorted(deps.items()))
+
+
+def template_context(description, project_name, file_list):
+    """Values available to templates as $name."""
+    title = " ".join(word.capitalize() for word in re.split(r"[-_\s]+", project_name) if word) or "React App"
+    has_vitals = "src/reportWebVitals.js" in file_list
+    return {
+        "project_name": project_name,
+        "title": title,
+        "description": description.strip(),
+        "description_html": description.strip().replace("&", "&amp;").replace('"', "&quot;").replace("<", "&lt;"),
+        "dependencies": json.dumps(infer_dependencies(description, file_list)),
+        "index_css_import": "import './index.css';\n" if "src/index.css" in file_list else "",
+        "web_vitals_import": "import reportWebVitals from './reportWebVitals';\n" if has_vitals else "",
+        "web_vitals_call": "\nreportWebVitals();\n" if has_vitals else "",
+    }
+
+
+def load_templates(user_dir=USER_TEMPLATE_DIR):
+    """{rel_path: {"version", "content"}}: built-ins, overridden by the user template directory."""
+    templates = {path: dict(template, version=f"builtin-v{template['version']}")
+                 for path, template in BUILTIN_TEMPLATES.items()}
+    if os.path.isdir(user_dir):
+        for root, _dirs, files in os.walk(user_dir):
+            for name in files:
+                full_path = os.path.join(root, name)
+                rel_path = os.path.relpath(full_path, user_dir).replace(os.sep, "/")
+                try:
+                    with open(full_path, "r") as f:
+                        templates[rel_path] = {"version": "user", "content": f.read()}
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"⚠️ Skipping template {full_path}: {e}")
+    return templates
+
+
+def render_templates(file_list, context, templates=None):
+    """
+    Render every file in file_list that has a template.
+    Returns {rel_path: (content, template_version)}.
+    """
+    if not TEMPLATES_ENABLED:
+        return {}
+    templates = load_templates() if templates is None else templates
+    rendered = {}
+    for rel_path in file_list:
+        template = templates.get(rel_path)
+        if template is None:
+            continue
+        content = Template(template["content"]).safe_substitute(context)
+        if rel_path.endswith(".json"):
+            try:
+                content = json.dumps(json.loads(content), indent=2) + "\n"
+            except ValueError as e:
+                print(f"⚠️ Template for {rel_path} did not render to valid JSON ({e}); generating it instead.")
+                continue
+        rendered[rel_path] = (content, template["version"])
+    return rendered
@@ -0,0 +1,141 @@
+# token_budget.py
+# Local prompt-size estimates, per-model budgets and truncation strategies.
+# Estimates are deliberately O(1) so oversized prompts are caught before any network call.
+
+import os
+from rate_limiter import TOKENS_PER_MINUTE
+
+DEFAULT_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+
+# context window (tokens), typical characters per token, and USD price per 1M tokens
+MODEL_LIMITS = {
+    "meta-llama/llama-4-scout-17b-16e-instruct": {
+        "context": 131072, "chars_per_token": 3.8, "input_per_m": 0.11, "output_per_m": 0.34},
+    "meta-llama/llama-4-maverick-17b-128e-instruct": {
+        "context": 131072, "chars_per_token": 3.8, "input_per_m": 0.20, "output_per_m": 0.60},
+    "llama-3.3-70b-versatile": {
+        "context": 131072, "chars_per_token": 3.8, "input_per_m": 0.59, "output_per_m": 0.79},
+    "llama-3.1-8b-instant": {
+        "context": 131072, "chars_per_token": 3.8, "input_per_m": 0.05, "output_per_m": 0.08},
+}
+
+# Tokens kept free for the model's answer
+OUTPUT_RESERVE_TOKENS = int(os.getenv("AITALK_OUTPUT_RESERVE_TOKENS", "4096"))
+# Optional hard cap on prompt size regardless of the model's context window
+MAX_PROMPT_TOKENS = int(os.getenv("AITALK_MAX_PROMPT_TOKENS", "0")) or None
+
+ELISION_MARKER = "\n\n[... {count} characters omitted to fit the model's context window ...]\n\n"
+
+
+class PromptTooLargeError(ValueError):
+    def __init__(self, estimated, budget, model):
+        super().__init__(f"Prompt is ~{estimated} tokens, over the {budget}-token budget for {model}.")
+        self.estimated = estimated
+        self.budget = budget
+        self.model = model
+
+
+def model_limits(model):
+    return MODEL_LIMITS.get(model, MODEL_LIMITS[DEFAULT_MODEL])
+
+
+def estimate_tokens(text, model=DEFAULT_MODEL):
+    if not text:
+        return 0
+    return int(len(text) / model_limits(model)["chars_per_token"]) + 1
+
+
+def prompt_budget(model, reserve=OUTPUT_RESERVE_TOKENS):
+    # Groq also rejects any single request larger than the per-minute token limit
+    budget = min(model_limits(model)["context"], int(TOKENS_PER_MINUTE)) - reserve
+    if MAX_PROMPT_TOKENS:
+        budget = min(budget, MAX_PROMPT_TOKENS)
+    return budget
+
+
+def estimate_cost(prompt_tokens, completion_tokens=0, model=DEFAULT_MODEL):
+    limits = model_limits(model)
+    return (prompt_tokens * limits["input_per_m"] + completion_tokens * limits["output_per_m"]) / 1_000_000
+
+
+def check_prompt(prompt, model, system_prompt=""):
+    """Return the estimated prompt tokens, or raise PromptTooLargeError if over budget."""
+    estimated = estimate_tokens(prompt, model) + estimate_tokens(system_prompt, model)
+    budget = prompt_budget(model)
+    if estimated > budget:
+        raise PromptTooLargeError(estimated, budget, model)
+    return estimated
+
+
+def describe(tokens, model, completion_tokens=0):
+    cost = estimate_cost(tokens, completion_tokens, model)
+    return f"~{tokens} prompt tokens (est. ${cost:.4f})"
+
+
+# --- Truncation strategies: (text, max_chars) -> text ---
+
+def keep_head(text, max_chars):
+    if len(text) <= max_chars:
+        return text
+    marker = ELISION_MARKER.format(count=len(text) - max_chars)
+    return text[:max(max_chars - len(marker), 0)] + marker
+
+
+def keep_tail(text, max_chars):
+    if len(text) <= max_chars:
+        return text
+    marker = ELISION_MARKER.format(count=len(text) - max_chars)
+    return marker + text[len(text) - max(max_chars - len(marker), 0):]
+
+
+def elide_middle(text, max_chars):
+    if len(text) <= max_chars:
+        return text
+    marker = ELISION_MARKER.format(count=len(text) - max_chars)
+    keep = max(max_chars - len(marker), 0)
+    head = keep // 2
+    return text[:head] + marker + text[len(text) - (keep - head):]
+
+
+TRUNCATION_STRATEGIES = {
+    "head": keep_head,
+    "tail": keep_tail,
+    "middle": elide_middle,
+}
+
+
+def fit_text(text, max_tokens, model=DEFAULT_MODEL, strategy="middle"):
+    """Shrink text to roughly max_tokens using a named (or callable) truncation strategy."""
+    if estimate_tokens(text, model) <= max_tokens:
+        return text
+    truncate = TRUNCATION_STRATEGIES[strategy] if isinstance(strategy, str) else strategy
+    max_chars = int(max(max_tokens, 0) * model_limits(model)["chars_per_token"])
+    return truncate(text, max_chars)
+
+
+def fit_sections(sections, max_tokens, model=DEFAULT_MODEL):
+    """
+    Section-priority truncation. sections is a list of (text, priority, strategy);
+    lower priority numbers are kept whole first, later sections get whatever budget
+    is left and are truncated with their own strategy. Returns texts in input order.
+    """
+    remaining = max_tokens
+    fitted = [None] * len(sections)
+    for index in sorted(range(len(sections)), key=lambda i: sections[i][1]):
+        text, _priority, strategy = sections[index]
+        fitted[index] = fit_text(text, remaining, model, strategy)
+        remaining -= estimate_tokens(fitted[index], model)
+    return fitted
+
+
+def fit_to_budget(text, model=DEFAULT_MODEL, overhead="", strategy="middle"):
+    """
+    Truncate text so that text + overhead (the fixed part of the prompt) fits
+    the model's prompt budget. Prints a notice when anything was cut.
+    """
+    available = prompt_budget(model) - estimate_tokens(overhead, model)
+    fitted = fit_text(text, available, model, strategy)
+    if fitted is not text:
+        print(f"✂️ Input trimmed from ~{estimate_tokens(text, model)} to ~{estimate_tokens(fitted, model)} "
+              f"tokens to fit {model}.")
+    return fitted
@@ -20,26 +20,50 @@ set ARG3=%3
 :: --create-project
 if "%ARG1%"=="--create-project" (
     shift
-    "%VENV_PYTHON%" "%AITALK_PATH%" --create-project %ARG2%
+    "%VENV_PYTHON%" "%AITALK_PATH%" %*
+    exit /b
+)
+
+:: --resume <project-dir>
+if "%ARG1%"=="--resume" (
+    "%VENV_PYTHON%" "%AITALK_PATH%" %*
+    exit /b
+)
+
+:: --update-project <project-dir> "<change>"
+if "%ARG1%"=="--update-project" (
+    "%VENV_PYTHON%" "%AITALK_PATH%" %*
+    exit /b
+)
+
+:: --stop-server [project-dir]
+if "%ARG1%"=="--stop-server" (
+    "%VENV_PYTHON%" "%AITALK_PATH%" %*
     exit /b
 )
 
 :: --explain-X (match like --explain-5)
 echo %ARG1% | findstr /r "^--explain-[0-9][0-9]*$" >nul
 if %errorlevel%==0 (
-    "%VENV_PYTHON%" "%AITALK_PATH%" %ARG1%
+    "%VENV_PYTHON%" "%AITALK_PATH%" %*
     exit /b
 )
 
 :: --chat
 if "%ARG1%"=="--chat" (
-    "%VENV_PYTHON%" "%AITALK_PATH%" --chat
+    "%VENV_PYTHON%" "%AITALK_PATH%" %*
     exit /b
 )
 
 :: --git-summary
 if "%ARG1%"=="--git-summary" (
-    "%VENV_PYTHON%" "%AITALK_PATH%" --git-summary
+    "%VENV_PYTHON%" "%AITALK_PATH%" %*
+    exit /b
+)
+
+:: --stats
+if "%ARG1%"=="--stats" (
+    "%VENV_PYTHON%" "%AITALK_PATH%" --stats
     exit /b
 )
 
@@ -53,7 +77,7 @@ if "%ARG1%"=="--summarise" (
         echo ❌ File not found: %ARG3%
         exit /b 1
     )
-    "%VENV_PYTHON%" "%AITALK_PATH%" --summarise "%ARG2%" "%ARG3%"
+    "%VENV_PYTHON%" "%AITALK_PATH%" %*
     exit /b
 )
 
@@ -61,9 +85,15 @@ if "%ARG1%"=="--summarise" (
 if "%ARG1%"=="--help" (
     echo Usage:
     echo   aitalk --create-project "make a react app"
+    echo   aitalk --create-project "make a react app" --detach
+    echo   aitalk --resume .\my-app
+    echo   aitalk --stop-server .\my-app
+    echo   aitalk --update-project .\my-app "add a dark mode toggle"
     echo   aitalk --explain-5
     echo   aitalk --git-summary
     echo   aitalk --summarise "summarise this file" file.txt
+    echo   aitalk --git-summary --no-cache
+    echo   aitalk --stats
     exit /b
 )
 
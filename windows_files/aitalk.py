@@ -1,20 +1,68 @@
 import sys
 import re
-from project_builder import build_project
+from dotenv import load_dotenv
+load_dotenv()  # before the imports below, which read AITALK_* settings at import time
+from project_builder import build_project, resume_project
+from dev_server import stop_dev_server
+from project_updater import update_project
 from explain_utils import explain_last_n_commands_with_output
-from summarise_utils import summarise_file
+from summarise_utils import summarise_file, summarise_files
 from chat_utils import chat
 from git_summary_utils import git_summary
+from metrics import print_stats
+import llm_cache
+import plan_cache
 
 if __name__ == "__main__":
+    if '--no-cache' in sys.argv:
+        sys.argv.remove('--no-cache')
+        llm_cache.disable()
+        plan_cache.disable()
+
     if '--create-project' in sys.argv:
         idx = sys.argv.index('--create-project')
         if len(sys.argv) > idx + 1:
             desc = sys.argv[idx + 1]
-            build_project(desc)
+            mode = "files"
+            for arg in sys.argv:
+                if arg.startswith('--mode='):
+                    mode = arg.split('=', 1)[1]
+            if mode not in ("files", "bulk"):
+                print(f"❌ Unknown mode: {mode} (use --mode=files or --mode=bulk)")
+            else:
+                if build_project(desc, run_post_steps='--no-install' not in sys.argv, mode=mode,
+                                 detach='--detach' in sys.argv) is False:
+                    sys.exit(1)
         else:
             print("❌ Missing project description.")
     
+    elif '--resume' in sys.argv:
+        idx = sys.argv.index('--resume')
+        if len(sys.argv) > idx + 1:
+            if resume_project(sys.argv[idx + 1], run_post_steps='--no-install' not in sys.argv,
+                              detach='--detach' in sys.argv) is False:
+                sys.exit(1)
+        else:
+            print("❌ Usage: aitalk --resume <project-dir> [--no-install] [--detach]")
+
+    elif '--stop-server' in sys.argv:
+        idx = sys.argv.index('--stop-server')
+        stop_dev_server(sys.argv[idx + 1] if len(sys.argv) > idx + 1 else ".")
+
+    elif '--update-project' in sys.argv:
+        idx = sys.argv.index('--update-project')
+        select = "llm"
+        for arg in sys.argv:
+            if arg.startswith('--select='):
+                select = arg.split('=', 1)[1]
+        if len(sys.argv) <= idx + 2:
+            print("❌ Usage: aitalk --update-project <project-dir> \"<change>\" [--yes] [--dry-run] [--no-install] [--select=graph]")
+        elif select not in ("llm", "graph"):
+            print(f"❌ Unknown selection: {select} (use --select=llm or --select=graph)")
+        else:
+            update_project(sys.argv[idx + 1], sys.argv[idx + 2], run_post_steps='--no-install' not in sys.argv,
+                           select=select, assume_yes='--yes' in sys.argv, dry_run='--dry-run' in sys.argv)
+
     elif "--chat" in sys.argv:
         chat()
 
@@ -22,12 +70,17 @@ if __name__ == "__main__":
         idx = sys.argv.index('--summarise')
         if len(sys.argv) > idx + 2:
             prompt = sys.argv[idx + 1]
-            file_path = sys.argv[idx + 2]
-            summarise_file(prompt, file_path)
+            file_paths = sys.argv[idx + 2:]
+            if len(file_paths) == 1:
+                summarise_file(prompt, file_paths[0])
+            else:
+                summarise_files(prompt, file_paths)
         else:
             print("❌ Usage: aitalk --summarise \"prompt\" file.txt")
     elif '--git-summary' in sys.argv:
         git_summary()
+    elif '--stats' in sys.argv:
+        print_stats()
     else:
         explain_flag = None
         for arg in sys.argv:
@@ -40,7 +93,12 @@ if __name__ == "__main__":
             explain_last_n_commands_with_output(explain_flag)
         else:
             print("Usage:")
-            print("  aitalk --create-project \"build a react todo app\"")
+            print("  aitalk --create-project \"build a react todo app\" [--no-install] [--mode=bulk] [--detach]")
+            print("  aitalk --resume <project-dir> [--no-install] [--detach]   # finish an interrupted --create-project")
+            print("  aitalk --stop-server [project-dir]  # stop a dev server started with --detach")
+            print("  aitalk --update-project <project-dir> \"change\" [--yes] [--dry-run] [--select=graph]")
             print("  aitalk --explain-5")
             print("  aitalk --summarise \"summarise this file\" file.txt")
-            print("  aitalk --git-summary")
\ No newline at end of file
+            print("  aitalk --git-summary")
+            print("  aitalk --stats                    # latency/token report from recorded LLM calls")
+            print("  aitalk <command> --no-cache       # bypass the local LLM response and plan caches")
\ No newline at end of file
@@ -0,0 +1,217 @@
+# benchmark.py
+# End-to-end throughput benchmark: drives aitalk commands against fake_groq_server.
+#
+#   python benchmark.py --runs 3 --latency lognormal:-1.5,0.6 --error-rate-429 0.02
+#   python benchmark.py --log-reader --log-sizes 1,10,100
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from fake_groq_server import FakeGroq, start_server
+from explain_utils import last_command_blocks, is_prompt
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+AITALK = os.path.join(HERE, "aitalk.py")
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def prepare_workspace(root):
+    """Create the inputs the commands need: a home dir with a session log, a text file and a git repo."""
+    home = os.path.join(root, "home")
+    os.makedirs(home)
+    with open(os.path.join(home, "aitalk_session.log"), "w") as f:
+        for i in range(20):
+            f.write(f"user@host ~/project $\n ls -la src\nApp.js index.js file{i}.txt\n")
+        f.write("user@host ~/project $\n")
+
+    text_file = os.path.join(root, "notes.txt")
+    with open(text_file, "w") as f:
+        f.write("Quarterly engineering notes.\n" * 400)
+
+    repo = os.path.join(root, "repo")
+    os.makedirs(repo)
+    git_env = dict(os.environ, GIT_AUTHOR_NAME="bench", GIT_AUTHOR_EMAIL="bench@example.com",
+                   GIT_COMMITTER_NAME="bench", GIT_COMMITTER_EMAIL="bench@example.com")
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True, env=git_env)
+    for i in range(5):
+        with open(os.path.join(repo, f"file{i}.txt"), "w") as f:
+            f.write(f"change {i}\n")
+        subprocess.run(["git", "add", "."], cwd=repo, check=True, env=git_env)
+        subprocess.run(["git", "commit", "-q", "-m", f"Commit {i}"], cwd=repo, check=True, env=git_env)
+
+    projects = os.path.join(root, "projects")
+    os.makedirs(projects)
+    return home, text_file, repo, projects
+
+
+def run_command(name, args, cwd, env):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, AITALK] + args, cwd=cwd, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        print(f"❌ {name} exited with {result.returncode}:\n{result.stdout[-2000:]}")
+    return elapsed
+
+
+# zsh's PROMPT_SP: a reverse-video % padded to the terminal width, then \r \r, before every prompt
+ZSH_PROMPT_SP = "\x1b[1m\x1b[7m%\x1b[27m\x1b[1m\x1b[0m" + " " * 79 + "\r \r"
+
+
+def write_session_log(path, size_mb, shell="bash"):
+    """
+    A `script`-style session log of about size_mb MB: coloured prompts, commands and
+    output, as bash writes them or, with shell="zsh", as zsh does (the prompt and the
+    command share a line, preceded by PROMPT_SP, so the prompts are only \r-separated).
+    """
+    output = "".join(f"  PASS src/components/Widget{i}.test.js (0.{i}s)\r\n" for i in range(30))
+    if shell == "zsh":
+        entry = ZSH_PROMPT_SP + "\x1b[01;32muser@host\x1b[00m ~/project % npm test\r\n" + output
+        last = ZSH_PROMPT_SP + "\x1b[01;32muser@host\x1b[00m ~/project % "
+    else:
+        entry = "\x1b[01;32muser@host\x1b[00m:\x1b[01;34m~/project\x1b[00m$ \r\n npm test\r\n" + output
+        last = "\x1b[01;32muser@host\x1b[00m:~/project$ \r\n"
+    chunk = entry.encode("utf-8") * 256
+    with open(path, "wb") as f:
+        for _ in range(max(1, int(size_mb * 1024 * 1024) // len(chunk))):
+            f.write(chunk)
+        f.write(last.encode("utf-8"))
+
+
+def read_whole_log(path, n):
+    """What --explain-N did before the tail reader: read and ANSI-strip every line of the log."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        lines = f.readlines()
+    prompt_indices = [i for i, line in enumerate(lines) if is_prompt(line)]
+    return "".join(lines[prompt_indices[-n]:]) if len(prompt_indices) >= n else "".join(lines)
+
+
+def benchmark_log_reader(sizes_mb, n=3, runs=5):
+    """
+    Time finding the last n commands in bash and zsh session logs of growing size,
+    tail reader vs. whole-file scan.
+    """
+    root = tempfile.mkdtemp(prefix="aitalk-log-bench-")
+    results = []
+    try:
+        for shell, size_mb in [(shell, size_mb) for shell in ("bash", "zsh") for size_mb in sizes_mb]:
+            path = os.path.join(root, f"session-{shell}-{size_mb}.log")
+            write_session_log(path, size_mb, shell)
+            tail_times, bytes_read = [], 0
+            for _ in range(runs):
+                start = time.perf_counter()
+                _, bytes_read = last_command_blocks(path, n)
+                tail_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            read_whole_log(path, n)
+            full = time.perf_counter() - start
+            results.append({"shell": shell, "log_mb": os.path.getsize(path) / 1024 / 1024, "tail_ms": percentile(tail_times, 50) * 1000,
+                            "tail_bytes_read": bytes_read, "whole_file_ms": full * 1000})
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark aitalk commands against a local fake Groq API")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--commands", default="create-project,summarise,git-summary,explain",
+                        help="comma-separated subset of create-project,create-project-bulk,summarise,git-summary,explain")
+    parser.add_argument("--latency", default="lognormal:-2.0,0.5")
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--error-rate-429", type=float, default=0.0)
+    parser.add_argument("--error-rate-5xx", type=float, default=0.0)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--requests-per-minute", type=float, default=100000,
+                        help="client-side pacing limit passed to aitalk")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--log-reader", action="store_true",
+                        help="benchmark the --explain-N session log reader instead of the commands")
+    parser.add_argument("--log-sizes", default="1,10,100", help="session log sizes in MB for --log-reader")
+    args = parser.parse_args(argv)
+
+    if args.log_reader:
+        results = benchmark_log_reader([float(s) for s in args.log_sizes.split(",") if s.strip()])
+        if args.json:
+            print(json.dumps(results, indent=2))
+            return results
+        print(f"{'shell':<6}{'log MB':>8}{'tail ms':>10}{'tail bytes read':>17}{'whole file ms':>15}")
+        for r in results:
+            print(f"{r['shell']:<6}{r['log_mb']:>8.1f}{r['tail_ms']:>10.2f}{r['tail_bytes_read']:>17}{r['whole_file_ms']:>15.1f}")
+        return results
+
+    fake = FakeGroq(latency=args.latency, token_delay=args.token_delay, error_rate_429=args.error_rate_429,
+                    error_rate_5xx=args.error_rate_5xx, file_count=args.files)
+    server, base_url = start_server(fake)
+    root = tempfile.mkdtemp(prefix="aitalk-bench-")
+    try:
+        home, text_file, repo, projects = prepare_workspace(root)
+        env = dict(os.environ,
+                   HOME=home,
+                   USERPROFILE=home,
+                   GROQ_API_BASE=base_url,
+                   GROQ_API_KEY="fake-key",
+                   AITALK_HOME=os.path.join(home, ".aitalk"),
+                   AITALK_NO_CACHE="1",
+                   AITALK_REQUESTS_PER_MINUTE=str(args.requests_per_minute),
+                   AITALK_TOKENS_PER_MINUTE="100000000",
+                   PYTHONIOENCODING="utf-8")
+        commands = {
+            "create-project": (["--create-project", "a todo app with filters", "--no-install"], projects),
+            "create-project-bulk": (["--create-project", "a todo app with filters", "--no-install", "--mode=bulk"],
+                                    projects),
+            "summarise": (["--summarise", "summarise for a manager", text_file], root),
+            "git-summary": (["--git-summary"], repo),
+            "explain": (["--explain-3"], root),
+        }
+        results = []
+        for name in [c.strip() for c in args.commands.split(",") if c.strip()]:
+            cmd_args, cwd = commands[name]
+            fake.reset()
+            walls = [run_command(name, cmd_args, cwd, env) for _ in range(args.runs)]
+            stats = fake.stats()
+            wall = sum(walls)
+            results.append({
+                "command": name,
+                "runs": args.runs,
+                "wall_s": wall,
+                "wall_per_run_s": wall / args.runs,
+                "requests": stats["requests"],
+                "requests_per_s": stats["requests"] / wall if wall else 0.0,
+                "p50_ms": percentile(stats["latencies"], 50) * 1000,
+                "p95_ms": percentile(stats["latencies"], 95) * 1000,
+                "p99_ms": percentile(stats["latencies"], 99) * 1000,
+                "statuses": stats["statuses"],
+            })
+    finally:
+        server.shutdown()
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return results
+
+    print(f"{'command':<21}{'runs':>5}{'wall/run s':>12}{'req':>6}{'req/s':>8}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses")
+    for r in results:
+        print(f"{r['command']:<21}{r['runs']:>5}{r['wall_per_run_s']:>12.2f}{r['requests']:>6}"
+              f"{r['requests_per_s']:>8.2f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}  {r['statuses']}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
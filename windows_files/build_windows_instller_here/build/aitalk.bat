@@ -13,26 +13,50 @@ set ARG3=%3
 :: --create-project
 if "%ARG1%"=="--create-project" (
     shift
-    "%AITALK_EXE%" --create-project %ARG2%
+    "%AITALK_EXE%" %*
+    exit /b
+)
+
+:: --resume <project-dir>
+if "%ARG1%"=="--resume" (
+    "%AITALK_EXE%" %*
+    exit /b
+)
+
+:: --update-project <project-dir> "<change>"
+if "%ARG1%"=="--update-project" (
+    "%VENV_PYTHON%" "%AITALK_PATH%" %*
+    exit /b
+)
+
+:: --stop-server [project-dir]
+if "%ARG1%"=="--stop-server" (
+    "%VENV_PYTHON%" "%AITALK_PATH%" %*
     exit /b
 )
 
 :: --explain-X (match like --explain-5)
 echo %ARG1% | findstr /r "^--explain-[0-9][0-9]*$" >nul
 if %errorlevel%==0 (
-    "%AITALK_EXE%" %ARG1%
+    "%AITALK_EXE%" %*
     exit /b
 )
 
 :: --chat
 if "%ARG1%"=="--chat" (
-    "%AITALK_EXE%" --chat
+    "%AITALK_EXE%" %*
     exit /b
 )
 
 :: --git-summary
 if "%ARG1%"=="--git-summary" (
-    "%AITALK_EXE%" --git-summary
+    "%AITALK_EXE%" %*
+    exit /b
+)
+
+:: --stats
+if "%ARG1%"=="--stats" (
+    "%AITALK_EXE%" --stats
     exit /b
 )
 
@@ -46,7 +70,7 @@ if "%ARG1%"=="--summarise" (
         echo ❌ File not found: %ARG3%
         exit /b 1
     )
-    "%AITALK_EXE%" --summarise "%ARG2%" "%ARG3%"
+    "%AITALK_EXE%" %*
     exit /b
 )
 
@@ -54,9 +78,15 @@ if "%ARG1%"=="--summarise" (
 if "%ARG1%"=="--help" (
     echo Usage:
     echo   aitalk --create-project "make a react app"
+    echo   aitalk --create-project "make a react app" --detach
+    echo   aitalk --resume .\my-app
+    echo   aitalk --stop-server .\my-app
+    echo   aitalk --update-project .\my-app "add a dark mode toggle"
     echo   aitalk --explain-5
     echo   aitalk --git-summary
     echo   aitalk --summarise "summarise this file" file.txt
+    echo   aitalk --git-summary --no-cache
+    echo   aitalk --stats
     exit /b
 )
 
@@ -0,0 +1,49 @@
+# deadline.py
+# End-to-end time budgets for LLM calls, shared by queueing, retries and fallbacks.
+
+import os
+import time
+
+# Total seconds a call may take, from entering the rate limiter to the last byte.
+# Override per task with AITALK_DEADLINE_<TASK> (e.g. AITALK_DEADLINE_CREATE_PROJECT=60).
+TASK_DEADLINES = {
+    "generate_prompt": 30,
+    "generate_project_name": 20,
+    "create_project": 120,
+    "fix_package_json": 120,
+    "update_project": 120,
+    "summarize": 180,
+    "explain_x": 120,
+    "chat": 120,
+}
+DEFAULT_DEADLINE = float(os.getenv("AITALK_DEADLINE", "180"))
+
+
+def deadline_seconds(task_type):
+    override = os.getenv(f"AITALK_DEADLINE_{task_type.upper()}")
+    if override:
+        return float(override)
+    return float(TASK_DEADLINES.get(task_type, DEFAULT_DEADLINE))
+
+
+class Deadline:
+    """An absolute point in time; every step of a call asks it how long it may still take."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def for_task(cls, task_type, seconds=None):
+        return cls(deadline_seconds(task_type) if seconds is None else seconds)
+
+    def remaining(self):
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def cap(self, timeout):
+        """Shorten a per-step timeout so it cannot outlive the deadline."""
+        remaining = self.remaining()
+        return remaining if timeout is None else min(timeout, remaining)
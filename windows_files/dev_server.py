@@ -0,0 +1,215 @@
+# dev_server.py
+# Starts the generated project's dev server (npm start) and tells when it is ready.
+#
+# Output goes through a line matcher that also checks the unfinished last line, so
+# prompts and messages split across reads are still seen. The server is either run in
+# the foreground until interrupted, or detached: aitalk waits until it is ready, leaves
+# it running with a PID file in the project and returns (for CI and scripts).
+
+import os
+import re
+import time
+import shutil
+import signal
+import socket
+import subprocess
+from process_runner import get_runner, run_step
+
+DEV_SERVER_TIMEOUT = float(os.getenv("AITALK_DEV_SERVER_TIMEOUT", "180"))
+DEV_SERVER_PID_FILE = ".aitalk-dev-server.pid"
+DEV_SERVER_LOG_FILE = ".aitalk-dev-server.log"
+POLL_INTERVAL = 0.1
+
+NPM_START_PROMPTS = {r"would you like to run the app on another port": "Y\n"}
+READY_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"compiled successfully",
+    r"compiled with warnings",
+    r"webpack compiled",
+    r"\bready in \d",
+    r"listening (?:on|at) ",
+    r"server running at ",
+)]
+FAILED_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"failed to compile",
+    r"^npm (?:ERR!|error) ",
+    r"error: cannot find module",
+    r"\bEADDRINUSE\b",
+)]
+URL_PATTERN = re.compile(r"https?://(?:localhost|127\.0\.0\.1|0\.0\.0\.0|\[::1?\]):\d+[^\s]*")
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+
+def free_port(preferred, attempts=20):
+    """preferred if nothing listens on it, else the next free port after it."""
+    for port in range(preferred, preferred + attempts):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            if sock.connect_ex(("127.0.0.1", port)) != 0:
+                return port
+    return preferred
+
+
+class ReadinessWatcher:
+    """
+    Matches dev server output line by line, including the partial last line, and
+    records the first sign of readiness or failure, how long it took and the URL.
+    """
+
+    def __init__(self, port, on_change=None):
+        self.start = time.perf_counter()
+        self.url = f"http://localhost:{port}"
+        self.state = None  # "ready" or "failed" once known
+        self.detail = None
+        self.ready_after = None
+        self.on_change = on_change
+        self._partial = ""
+        self._url_seen = False
+
+    def feed(self, text):
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        for line in lines + [self._partial]:
+            self._check(ANSI_ESCAPE.sub("", line).strip())
+
+    def _check(self, line):
+        if not line:
+            return
+        url = URL_PATTERN.search(line)
+        if url and not self._url_seen and "network" not in line.lower():
+            self.url, self._url_seen = url.group(0).rstrip("/"), True
+        if self.state:
+            return
+        if any(p.search(line) for p in FAILED_PATTERNS):
+            self.state, self.detail = "failed", line
+        elif any(p.search(line) for p in READY_PATTERNS) or line.lower().startswith("local:"):
+            self.state, self.detail = "ready", line
+        else:
+            return
+        self.ready_after = time.perf_counter() - self.start
+        if self.on_change:
+            self.on_change(self)
+
+
+def _report(watcher):
+    if watcher.state == "ready":
+        print(f"✅ Dev server ready at {watcher.url} in {watcher.ready_after:.1f}s.", flush=True)
+    else:
+        print(f"❌ Dev server reported a problem after {watcher.ready_after:.1f}s: {watcher.detail}", flush=True)
+
+
+def run_foreground(cwd, port):
+    """npm start in the foreground until it exits or is interrupted, reporting when it is ready."""
+    watcher = ReadinessWatcher(port, on_change=_report)
+    result = get_runner().run(run_step("npm start", ["npm", "start"], cwd=cwd, env={"PORT": str(port)},
+                                       responders=NPM_START_PROMPTS, prefix="", watch=watcher))
+    if watcher.state is None:
+        print(f"⚠️ The dev server exited before it was ready (exit code {result.returncode}).")
+    return result.ok
+
+
+def _process_alive(pid):
+    if os.name == "nt":
+        result = subprocess.run(["tasklist", "/FI", f"PID eq {pid}", "/NH"], capture_output=True, text=True)
+        return str(pid) in result.stdout
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _kill_tree(pid):
+    """Stop pid and the processes it started (npm starts node, which may start more)."""
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/PID", str(pid), "/T", "/F"], capture_output=True)
+        return
+    try:
+        os.killpg(pid, signal.SIGTERM)  # detached servers lead their own process group
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def running_server(cwd):
+    """PID of the detached dev server of this project if it is still running, else None."""
+    try:
+        with open(os.path.join(cwd, DEV_SERVER_PID_FILE), "r") as f:
+            pid = int(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pid if _process_alive(pid) else None
+
+
+def start_detached(cwd, port, timeout=DEV_SERVER_TIMEOUT):
+    """
+    Start npm start in its own session, wait until it is ready and leave it running.
+    Returns True when ready; on failure or timeout the server is stopped and False returned.
+    """
+    pid_path = os.path.join(cwd, DEV_SERVER_PID_FILE)
+    log_path = os.path.join(cwd, DEV_SERVER_LOG_FILE)
+    pid = running_server(cwd)
+    if pid:
+        print(f"✅ A dev server for this project is already running (PID {pid}); see {log_path}.")
+        return True
+
+    env = dict(os.environ, PORT=str(port), BROWSER="none")
+    if os.name == "nt":
+        options = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS}
+    else:
+        options = {"start_new_session": True}
+    watcher = ReadinessWatcher(port)
+    with open(log_path, "wb") as log_file:
+        try:
+            process = subprocess.Popen([shutil.which("npm") or "npm", "start"], cwd=cwd, env=env,
+                                       stdin=subprocess.DEVNULL, stdout=log_file, stderr=subprocess.STDOUT,
+                                       **options)
+        except OSError as e:
+            print(f"❌ Could not run npm: {e}")
+            return False
+    with open(pid_path, "w") as f:
+        f.write(f"{process.pid}\n")
+
+    # The server writes to the log file; follow it until the server is ready, fails or times out
+    pending = ""
+    with open(log_path, "rb") as log_file:
+        while True:
+            text = log_file.read().decode("utf-8", errors="replace")
+            if text:
+                watcher.feed(text)
+                *lines, pending = (pending + text).split("\n")
+                for line in lines:
+                    print(f"   [npm start] {line}", flush=True)
+            elif watcher.state or process.poll() is not None or time.perf_counter() - watcher.start > timeout:
+                break
+            else:
+                time.sleep(POLL_INTERVAL)
+
+    if watcher.state == "ready":
+        print(f"✅ Dev server ready at {watcher.url} in {watcher.ready_after:.1f}s, running in the background "
+              f"(PID {process.pid}, written to {DEV_SERVER_PID_FILE}; output in {DEV_SERVER_LOG_FILE}). "
+              f"Stop it with `aitalk --stop-server {cwd}`.")
+        return True
+    if watcher.state == "failed":
+        print(f"❌ Dev server reported a problem after {watcher.ready_after:.1f}s: {watcher.detail}")
+    elif process.poll() is not None:
+        print(f"❌ The dev server exited before it was ready (exit code {process.returncode}).")
+    else:
+        print(f"⏰ The dev server was not ready after {timeout:g}s.")
+    _kill_tree(process.pid)
+    process.wait()
+    os.remove(pid_path)
+    print(f"🛑 Stopped it; its output is in {log_path}.")
+    return False
+
+
+def stop_dev_server(cwd):
+    """Stop the detached dev server of the project in cwd (aitalk --stop-server)."""
+    pid = running_server(cwd)
+    pid_path = os.path.join(cwd, DEV_SERVER_PID_FILE)
+    if pid is None:
+        print(f"ℹ️ No detached dev server is running in {os.path.abspath(cwd)}.")
+    else:
+        _kill_tree(pid)
+        print(f"🛑 Stopped the dev server (PID {pid}).")
+    if os.path.exists(pid_path):
+        os.remove(pid_path)
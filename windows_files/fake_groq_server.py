@@ -0,0 +1,287 @@
+# fake_groq_server.py
+# Local OpenAI-compatible stand-in for the Groq API, for benchmarks and offline runs.
+#
+#   python fake_groq_server.py --port 8765 --latency lognormal:-1.2,0.5 --error-rate-429 0.05
+#   GROQ_API_BASE=http://127.0.0.1:8765/v1 python aitalk.py --git-summary
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ("the quick build step reads each file then runs the command and prints a short report "
+         "about what changed in the project and why it matters for the next release").split()
+
+# Default responder: enough canned answers to drive every aitalk command end to end
+DEFAULT_RULES = [
+    (r"Write a prompt for an LLM that will cause it to output ONLY a JSON array",
+     "Output ONLY a JSON array of file paths for this React 18 app."),
+    (r"Return ONLY a short hyphenated name", "benchmark-app"),
+]
+
+
+def parse_latency(spec):
+    """
+    Build a latency sampler (seconds) from 'fixed:0.2', 'uniform:0.1,0.5',
+    'normal:0.3,0.1' or 'lognormal:mu,sigma'.
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def file_list_response(file_count):
+    files = ["package.json", "public/index.html", "src/index.js", "src/App.js", "src/App.css"]
+    for i in range(max(file_count - len(files), 0)):
+        files.append(f"src/components/Widget{i + 1}.js")
+    return json.dumps(files[:max(file_count, 1)])
+
+
+def file_content_response(filepath):
+    if filepath.endswith("package.json"):
+        return json.dumps({
+            "name": "benchmark-app",
+            "version": "0.1.0",
+            "private": True,
+            "dependencies": {"react": "^18.2.0", "react-dom": "^18.2.0", "react-scripts": "5.0.1"},
+            "scripts": {"start": "react-scripts start", "build": "react-scripts build"}
+        }, indent=2)
+    if filepath.endswith(".html"):
+        return '<!DOCTYPE html>\n<html lang="en">\n<body>\n  <div id="root"></div>\n</body>\n</html>'
+    if filepath.endswith(".css"):
+        return ".App {\n  text-align: center;\n}"
+    if filepath.endswith("index.js"):
+        return ("import React from 'react';\nimport ReactDOM from 'react-dom/client';\nimport App from './App';\n\n"
+                "ReactDOM.createRoot(document.getElementById('root')).render(<App />);")
+    name = re.sub(r"\W", "", filepath.rsplit("/", 1)[-1].split(".")[0]) or "Component"
+    return (f"import React from 'react';\n\nexport default function {name}() {{\n"
+            f"  return <div className=\"{name}\">{name}</div>;\n}}")
+
+
+def file_update_response(filepath):
+    """An --update-project answer: the canned content with a visible change for code files."""
+    content = file_content_response(filepath)
+    if filepath.endswith((".js", ".jsx", ".ts", ".tsx")):
+        content += "\n\n// Updated by the fake Groq API\n"
+    return content
+
+
+def manifest_response(file_count):
+    """A --mode=bulk manifest with every file of the canned file list."""
+    files = json.loads(file_list_response(file_count))
+    blocks = ["=== PROJECT: benchmark-app ===", f"=== FILES: {json.dumps(files)} ==="]
+    for path in files:
+        blocks += [f"=== FILE: {path} ===", file_content_response(path), "=== END FILE ==="]
+    return "\n".join(blocks)
+
+
+class FakeGroq:
+    """Shared server state: response rules, fault injection settings and recorded request latencies."""
+
+    def __init__(self, latency="fixed:0.05", token_delay=0.0, error_rate_429=0.0, error_rate_5xx=0.0,
+                 file_count=8, response_words=120, rules=None):
+        self.sample_latency = parse_latency(latency)
+        self.token_delay = token_delay
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.file_count = file_count
+        self.response_words = response_words
+        self.rules = [(re.compile(pattern, re.DOTALL), response) for pattern, response in (rules or [])]
+        self.rules += [(re.compile(pattern, re.DOTALL), response) for pattern, response in DEFAULT_RULES]
+        self._lock = threading.Lock()
+        self.latencies = []
+        self.statuses = {}
+
+    def respond(self, prompt):
+        for pattern, response in self.rules:
+            if pattern.search(prompt):
+                return response
+        if "=== END FILE ===" in prompt:
+            return manifest_response(self.file_count)
+        if "JSON array of file paths" in prompt:
+            return file_list_response(self.file_count)
+        if "Adapt that file list" in prompt:
+            return json.dumps({"name": "benchmark-app", "files": json.loads(file_list_response(self.file_count))})
+        if "must be modified or created" in prompt:
+            return json.dumps(["src/App.js", "src/components/Widget1.js"])
+        match = re.search(r'return the full updated content of the file: "([^"]+)"', prompt)
+        if match:
+            return file_update_response(match.group(1))
+        match = re.search(r'generate the full content of the file: "([^"]+)"', prompt)
+        if match:
+            return file_content_response(match.group(1))
+        return " ".join(random.choice(WORDS) for _ in range(self.response_words))
+
+    def pick_status(self):
+        roll = random.random()
+        if roll < self.error_rate_429:
+            return 429
+        if roll < self.error_rate_429 + self.error_rate_5xx:
+            return random.choice([500, 502, 503])
+        return 200
+
+    def record(self, status, elapsed):
+        with self._lock:
+            self.latencies.append(elapsed)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {"requests": len(self.latencies), "latencies": list(self.latencies),
+                    "statuses": dict(self.statuses)}
+
+    def reset(self):
+        with self._lock:
+            self.latencies = []
+            self.statuses = {}
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/stats"):
+                self._send_json(200, fake.stats())
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_DELETE(self):
+            if self.path.rstrip("/").endswith("/stats"):
+                fake.reset()
+                self._send_json(200, {"ok": True})
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            start = time.perf_counter()
+            length = int(self.headers.get("Content-Length", 0))
+            data = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            time.sleep(fake.sample_latency())
+            status = fake.pick_status()
+            if status != 200:
+                headers = {"retry-after": "0.5"} if status == 429 else {}
+                if status == 429:
+                    headers.update({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "500ms"})
+                self._send_json(status, {"error": {"message": f"injected {status}", "type": "fake_error"}}, headers)
+                fake.record(status, time.perf_counter() - start)
+                return
+
+            messages = data.get("messages") or [{}]
+            prompt = messages[-1].get("content", "")
+            content = fake.respond(prompt)
+            prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                     "total_tokens": prompt_tokens + len(content) // 4}
+            headers = {"x-ratelimit-remaining-requests": "10000", "x-ratelimit-remaining-tokens": "1000000"}
+            if data.get("stream"):
+                self._stream(data.get("model"), content, usage, headers)
+            else:
+                self._send_json(200, {
+                    "id": "fake-completion",
+                    "object": "chat.completion",
+                    "model": data.get("model"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}],
+                    "usage": usage,
+                }, headers)
+            fake.record(200, time.perf_counter() - start)
+
+        def _stream(self, model, content, usage, headers):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            tokens = re.findall(r"\S+\s*|\s+", content)
+            for i, token in enumerate(tokens):
+                chunk = {"object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+                if i == len(tokens) - 1:
+                    chunk["x_groq"] = {"usage": usage}
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+                if fake.token_delay:
+                    time.sleep(fake.token_delay)
+            self._write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _write_chunk(self, text):
+            raw = text.encode()
+            self.wfile.write(f"{len(raw):x}\r\n".encode() + raw + b"\r\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+def start_server(fake, host="127.0.0.1", port=0):
+    """Start the server on a background thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def load_rules(path):
+    """A script file is a JSON list of {"match": regex, "response": text} rules, tried in order."""
+    with open(path, "r") as f:
+        return [(rule["match"], rule["response"]) for rule in json.load(f)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible fake Groq server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0.05", help="fixed:S | uniform:A,B | normal:M,SD | lognormal:MU,SIGMA")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed tokens")
+    parser.add_argument("--error-rate-429", type=float, default=0.0)
+    parser.add_argument("--error-rate-5xx", type=float, default=0.0)
+    parser.add_argument("--files", type=int, default=8, help="files returned for --create-project file lists")
+    parser.add_argument("--response-words", type=int, default=120)
+    parser.add_argument("--script", help="JSON file of {match, response} rules")
+    args = parser.parse_args(argv)
+
+    fake = FakeGroq(latency=args.latency, token_delay=args.token_delay, error_rate_429=args.error_rate_429,
+                    error_rate_5xx=args.error_rate_5xx, file_count=args.files,
+                    response_words=args.response_words, rules=load_rules(args.script) if args.script else None)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fake))
+    print(f"🧪 Fake Groq API listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down fake Groq API.")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
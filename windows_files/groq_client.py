@@ -1,42 +1,548 @@
 import requests
 import os
+import json
+import queue
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 load_dotenv()
+import llm_cache
+from rate_limiter import RateLimiter
+import metrics
+from token_budget import check_prompt, estimate_tokens, PromptTooLargeError
+from model_router import route_for
+from deadline import Deadline
+import hedging
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Point at any OpenAI-compatible server (e.g. fake_groq_server.py) via GROQ_API_BASE
+GROQ_API_BASE = os.getenv("GROQ_API_BASE", "https://api.groq.com/openai/v1")
+GROQ_API_URL = f"{GROQ_API_BASE.rstrip('/')}/chat/completions"
 
-TASK_MODEL_MAP = {
-    "create_project": "meta-llama/llama-4-scout-17b-16e-instruct",
-    "summarize": "meta-llama/llama-4-scout-17b-16e-instruct",
-    "explain_x": "meta-llama/llama-4-scout-17b-16e-instruct",
-    "chat": "meta-llama/llama-4-scout-17b-16e-instruct"  # <-- Add this line
-}
-
-def call_groq(prompt, task_type="create_project", system_prompt="You are a helpful assistant.", model=None):
-    if model is None:
-        model = TASK_MODEL_MAP.get(task_type, "meta-llama/llama-4-scout-17b-16e-instruct")
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    data = {
+# Connection pool / timeout settings (override via .env)
+POOL_SIZE = int(os.getenv("AITALK_POOL_SIZE", "10"))
+CONNECT_TIMEOUT = float(os.getenv("AITALK_CONNECT_TIMEOUT", "10"))
+READ_TIMEOUT = float(os.getenv("AITALK_READ_TIMEOUT", "120"))
+MAX_RECONNECTS = int(os.getenv("AITALK_MAX_RECONNECTS", "2"))
+DEFAULT_TEMPERATURE = 0.2
+MAX_RATE_LIMIT_RETRIES = int(os.getenv("AITALK_MAX_RATE_LIMIT_RETRIES", "5"))
+# 429 = rate limited, 498 = Groq flex-tier capacity exceeded, 5xx = overloaded/unavailable
+RETRYABLE_STATUSES = {429, 498, 500, 502, 503, 504}
+
+# Retries on the same model before moving on to the route's next fallback model
+RETRIES_BEFORE_FALLBACK = 1
+# Statuses that mean "this model is busy or down right now", so another model may do better
+FALLBACK_STATUSES = {429, 498, 500, 502, 503, 504}
+
+
+class GroqRateLimitError(requests.exceptions.HTTPError):
+    """Raised when Groq keeps rejecting a request after every paced retry."""
+
+    def __init__(self, message, response=None, model=None):
+        super().__init__(message, response=response)
+        self.model = model
+        self.retry_after = None
+        if response is not None:
+            self.retry_after = response.headers.get("retry-after")
+
+
+class GroqClient:
+    """
+    Groq chat-completions client backed by a pooled keep-alive session.
+    One instance is shared by the whole process (see get_client()), so
+    back-to-back calls reuse the same TCP/TLS connection.
+    """
+
+    def __init__(self, api_key=None, url=GROQ_API_URL, pool_size=POOL_SIZE,
+                 connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_reconnects=MAX_RECONNECTS, rate_limiter=None,
+                 max_rate_limit_retries=MAX_RATE_LIMIT_RETRIES):
+        self.api_key = api_key or GROQ_API_KEY
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_reconnects = max_reconnects
+        # Groq rate limits are per model, so each model gets its own shared limiter
+        self._rate_limiters = {}
+        self._default_rate_limiter = rate_limiter
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+        # Only connection-level failures are retried here: nothing has been
+        # sent yet, so retrying a POST cannot duplicate a completion.
+        retry = Retry(total=max_reconnects, connect=max_reconnects, read=0, status=0,
+                      other=0, backoff_factor=0.2, allowed_methods=None,
+                      respect_retry_after_header=False, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        adapter.poolmanager.pool_classes_by_scheme = {
+            scheme: self._counting_pool(pool_class)
+            for scheme, pool_class in adapter.poolmanager.pool_classes_by_scheme.items()}
+        self.requests_sent = 0
+        self.connections_opened = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    def _pool_manager(self):
+        return self.session.get_adapter(self.url).poolmanager
+
+    def _counting_pool(self, pool_class):
+        """
+        pool_class counting the connections it opens for the calling thread, so each
+        request knows whether it opened one, however many others run alongside it.
+        """
+        local = self._local
+
+        class CountingPool(pool_class):
+            def _new_conn(self):
+                local.new_connections = getattr(local, "new_connections", 0) + 1
+                return super()._new_conn()
+
+        return CountingPool
+
+    def _timeout(self, timeout):
+        # A caller deadline caps both the connect and the read timeout
+        if timeout is None:
+            return self.timeout
+        return (min(self.timeout[0], timeout), min(self.timeout[1], timeout))
+
+    def _post(self, data, stream=False, timeout=None):
+        self._local.new_connections = 0
+        start = time.perf_counter()
+        resp = self.session.post(self.url, json=data, timeout=self._timeout(timeout), stream=stream)
+        opened = self._local.new_connections
+        with self._lock:
+            self.requests_sent += 1
+            self.connections_opened += opened
+        self._local.last_call = {
+            "elapsed": time.perf_counter() - start,
+            "ttfb": resp.elapsed.total_seconds(),
+            "reused_connection": opened == 0,
+            "cache_hit": False,
+        }
+        return resp
+
+    def post(self, data, stream=False, timeout=None):
+        """POST a chat-completions payload, reconnecting if a pooled connection went stale."""
+        for attempt in range(self.max_reconnects + 1):
+            try:
+                return self._post(data, stream=stream, timeout=timeout)
+            except requests.exceptions.ConnectionError:
+                # The server may have closed an idle keep-alive socket between
+                # calls; drop the pool and try again on a fresh connection.
+                if attempt >= self.max_reconnects:
+                    raise
+                self._pool_manager().clear()
+
+    def limiter_for(self, model):
+        with self._lock:
+            if model not in self._rate_limiters:
+                self._rate_limiters[model] = self._default_rate_limiter or RateLimiter()
+            return self._rate_limiters[model]
+
+    def send(self, data, stream=False, timeout=None, max_retries=None, deadline=None, cancelled=None,
+             on_sending=None):
+        """
+        Pace the request through the model's shared rate limiter, then POST it,
+        retrying rate-limit and overload responses with jittered backoff. With a
+        deadline, queueing and retries stop (Timeout) once it has passed; a set
+        cancelled event stops retrying. on_sending(True) is called when the
+        limiter lets a request go out, on_sending(False) when it backs off to retry.
+        """
+        max_retries = self.max_rate_limit_retries if max_retries is None else max_retries
+        limiter = self.limiter_for(data["model"])
+        estimated_tokens = sum(estimate_tokens(m["content"], data["model"]) for m in data["messages"])
+        queue_wait = 0.0
+        for attempt in range(max_retries + 1):
+            waited = limiter.acquire(estimated_tokens, max_wait=deadline.remaining() if deadline else None)
+            if waited is None or (deadline and deadline.expired()):
+                raise requests.exceptions.Timeout(
+                    f"Deadline of {deadline.seconds:g}s reached waiting for the {data['model']} rate limit")
+            queue_wait += waited
+            if on_sending:
+                on_sending(True)
+            resp = self.post(data, stream=stream, timeout=deadline.cap(timeout) if deadline else timeout)
+            limiter.update_from_headers(resp.headers)
+            self._local.last_call["queue_wait"] = queue_wait
+            self._local.last_call["retries"] = attempt
+            if resp.status_code not in RETRYABLE_STATUSES:
+                return resp
+            if attempt >= max_retries or (cancelled is not None and cancelled.is_set()):
+                break
+            delay = limiter.backoff(attempt, resp.headers.get("retry-after"))
+            if on_sending:
+                on_sending(False)
+            print(f"⚠️ Groq returned {resp.status_code}. Retrying in {delay:.1f}s "
+                  f"({attempt + 1}/{max_retries})...")
+            resp.close()
+        if resp.status_code == 429:
+            raise GroqRateLimitError(
+                f"429 rate limit: giving up after {max_retries} retries", response=resp, model=data["model"])
+        return resp
+
+    def complete(self, messages, model, temperature=DEFAULT_TEMPERATURE, timeout=None, max_retries=None,
+                 deadline=None, hedge_after=None, allow_hedge=None):
+        """
+        Return the completion text. With a deadline the call is abandoned
+        (Timeout) when it runs out. With hedge_after, a duplicate request is
+        sent if no answer has come back after that many seconds (and
+        allow_hedge() agrees); the first answer wins and the other is dropped.
+        """
+        data = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature
+        }
+        if deadline is None and hedge_after is None:
+            return self._attempt(data, timeout, max_retries)
+        return self._race(data, timeout, max_retries, deadline, hedge_after, allow_hedge)
+
+    def _attempt(self, data, timeout, max_retries, deadline=None, cancelled=None, on_sending=None):
+        resp = self.send(data, stream=True, timeout=timeout, max_retries=max_retries,
+                         deadline=deadline, cancelled=cancelled, on_sending=on_sending)
+        try:
+            if cancelled is not None and cancelled.is_set():
+                return None  # lost the race: close without reading the body
+            resp.raise_for_status()
+            result = resp.json()
+        finally:
+            resp.close()
+        self._local.last_call["usage"] = result.get("usage")
+        return result["choices"][0]["message"]["content"]
+
+    def _race(self, data, timeout, max_retries, deadline, hedge_after, allow_hedge):
+        """
+        Run copies of the request on daemon threads and return the first
+        success. The hedge clock only runs while the first copy's request is on
+        the wire: it starts when the rate limiter lets it go out and stops while
+        a 429 or overload is backed off, so queueing is never mistaken for a slow
+        answer. A losing copy cannot be interrupted mid-read, so it is told to
+        stop retrying and drop its response; being a daemon it never holds up exit.
+        """
+        results = queue.Queue()
+        cancelled = threading.Event()
+
+        def run(copy):
+            self.begin_call()
+
+            def on_sending(sending):
+                results.put(("sending" if sending else "waiting", copy, None, None, None))
+
+            try:
+                content = self._attempt(data, timeout, max_retries, deadline, cancelled, on_sending)
+                results.put(("done", copy, content, None, self.last_call()))
+            except Exception as e:  # handed back to the waiting caller
+                results.put(("done", copy, None, e, self.last_call()))
+
+        def launch(copy):
+            threading.Thread(target=run, args=(copy,), daemon=True, name=f"aitalk-hedge-{copy}").start()
+
+        launch(0)
+        copies = pending = 1
+        hedge_at = None  # set while the first copy's request is on the wire
+        error = None
+        call = {}
+        while pending:
+            waits = [t for t in (deadline.remaining() if deadline else None,
+                                 None if hedge_at is None else max(hedge_at - time.monotonic(), 0.0))
+                     if t is not None]
+            try:
+                event, copy, content, exc, call = results.get(timeout=min(waits) if waits else None)
+            except queue.Empty:
+                if deadline and deadline.expired():
+                    cancelled.set()
+                    raise requests.exceptions.Timeout(
+                        f"No response from {data['model']} within the {deadline.seconds:g}s deadline")
+                hedge_at = None
+                if allow_hedge is None or allow_hedge():
+                    print(f"🪞 {data['model']} is slow to answer; sending a hedged duplicate request.")
+                    with self._lock:
+                        self.hedges_sent += 1
+                    launch(1)
+                    copies += 1
+                    pending += 1
+                continue
+            if event != "done":
+                if copy == 0 and copies == 1 and hedge_after is not None:
+                    hedge_at = time.monotonic() + hedge_after if event == "sending" else None
+                continue
+            pending -= 1
+            if exc is None:
+                cancelled.set()
+                if copy == 1:
+                    with self._lock:
+                        self.hedges_won += 1
+                self._local.last_call = dict(call or {}, hedged=copies > 1, hedge_won=copy == 1)
+                return content
+            error = exc
+            hedge_at = None  # the primary failed outright; retries/fallbacks handle that, not hedging
+        self._local.last_call = dict(call or {}, hedged=copies > 1)
+        raise error
+
+    def stream(self, messages, model, temperature=DEFAULT_TEMPERATURE, max_retries=None, deadline=None):
+        """Yield completion tokens as they arrive on the server-sent event stream."""
+        data = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": True
+        }
+        start = time.perf_counter()
+        # The deadline bounds the wait for the stream to start; once tokens flow the read timeout applies
+        resp = self.send(data, stream=True, max_retries=max_retries, deadline=deadline)
+        try:
+            resp.raise_for_status()
+            first_token = True
+            for line in resp.iter_lines():
+                line = line.decode("utf-8", errors="ignore").strip()
+                if not line.startswith("data:"):
+                    continue
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    break
+                chunk = json.loads(payload)
+                # Groq reports usage on the final chunk under x_groq; OpenAI-style servers at the top level
+                usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+                if usage:
+                    self._local.last_call["usage"] = usage
+                choices = chunk.get("choices") or []
+                token = choices[0].get("delta", {}).get("content") if choices else None
+                if not token:
+                    continue
+                if first_token:
+                    self._local.last_call["time_to_first_token"] = time.perf_counter() - start
+                    first_token = False
+                yield token
+            self._local.last_call["elapsed"] = time.perf_counter() - start
+        finally:
+            resp.close()
+
+    def begin_call(self):
+        self._local.last_call = {}
+
+    def note_cache_hit(self, elapsed):
+        self._local.last_call = {"elapsed": elapsed, "reused_connection": False, "cache_hit": True}
+
+    def last_call(self):
+        """Timing info for the most recent call made from the current thread."""
+        return getattr(self._local, "last_call", None)
+
+    def connection_summary(self):
+        reused = max(self.requests_sent - self.connections_opened, 0)
+        summary = (f"{self.requests_sent} request(s) over {self.connections_opened} "
+                   f"connection(s), {reused} reused")
+        if self.hedges_sent:
+            summary += f", {self.hedges_sent} hedged ({self.hedges_won} won)"
+        return summary
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide GroqClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GroqClient()
+    return _client
+
+
+def _models_for(task_type, model):
+    """Models to try in order: an explicit model is used alone, otherwise the task's route."""
+    if model is not None:
+        return [model]
+    return route_for(task_type).models
+
+
+def _should_fall_back(e):
+    if isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    return e.response is not None and e.response.status_code in FALLBACK_STATUSES
+
+
+def _error_summary(e):
+    if e.response is not None:
+        return f"HTTP {e.response.status_code}"
+    return type(e).__name__
+
+
+def _build_messages(prompt, system_prompt):
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _report_api_error(e):
+    print(f"Groq API Error: {e}")
+    if e.response is not None:
+        print("Groq API response:", e.response.text)
+
+
+def _cached(key, task_type):
+    start = time.perf_counter()
+    content = llm_cache.get(key, task_type)
+    if content is not None:
+        get_client().note_cache_hit(time.perf_counter() - start)
+    return content
+
+
+def _record_call(task_type, model, prompt, system_prompt, started, content, streamed=False, route_index=0,
+                 failed_attempts=None):
+    """
+    Append this thread's last call to the metrics log. A call that fell back is one
+    record, of the model that answered (or failed last); failed_attempts lists the
+    {"model", "error"} of the models tried before it.
+    """
+    call = get_client().last_call() or {}
+    usage = call.get("usage") or {}
+    record = {
+        "task_type": task_type,
         "model": model,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.2
+        "route": "primary" if route_index == 0 else f"fallback-{route_index}",
+        "prompt_tokens": usage.get("prompt_tokens") or estimate_tokens(prompt + system_prompt, model),
+        "completion_tokens": usage.get("completion_tokens") or estimate_tokens(content or "", model),
+        "queue_wait_s": call.get("queue_wait", 0.0),
+        "ttfb_s": call.get("ttfb"),
+        "ttft_s": call.get("time_to_first_token"),
+        "latency_s": time.perf_counter() - started,
+        "retries": call.get("retries", 0),
+        "cache_hit": call.get("cache_hit", False),
+        "hedged": call.get("hedged", False),
+        "streamed": streamed,
+        "ok": content is not None,
     }
-    try:
-        resp = requests.post(url, headers=headers, json=data)
-        resp.raise_for_status()
-        result = resp.json()
-        return result["choices"][0]["message"]["content"]
-    except requests.exceptions.RequestException as e:
-        print(f"Groq API Error: {e}")
+    if failed_attempts:
+        record["failed_attempts"] = failed_attempts
+    metrics.record(record)
+
+
+def call_groq(prompt, task_type="create_project", system_prompt="You are a helpful assistant.", model=None, timeout=None,
+              raise_errors=False):
+    """
+    Return the completion text, or None on API/network errors. Unless a model
+    is given, the task's route decides the model and the fallbacks tried on
+    timeouts or overload. timeout is the total budget in seconds for the whole
+    call (queueing, retries and fallbacks; default: the task's deadline), and
+    slow calls of idempotent tasks may be hedged. With raise_errors=True the
+    final RequestException (e.g. GroqRateLimitError) is re-raised after being reported.
+    """
+    started = time.perf_counter()
+    deadline = Deadline.for_task(task_type, timeout)
+    models = _models_for(task_type, model)
+    get_client().begin_call()
+    key = llm_cache.cache_key(models[0], system_prompt, prompt, DEFAULT_TEMPERATURE)
+    content = _cached(key, task_type)
+    if content is not None:
+        _record_call(task_type, models[0], prompt, system_prompt, started, content)
+        return content
+    messages = _build_messages(prompt, system_prompt)
+    policy = hedging.get_policy()
+    hedge_after = policy.delay_for(task_type)
+    failed_attempts = []
+    for index, candidate in enumerate(models):
+        has_fallback = index + 1 < len(models)
+        get_client().begin_call()
+        attempt_started = time.perf_counter()
         try:
-            print("Groq API response:", resp.text)
-        except Exception:
-            pass
-        return None
\ No newline at end of file
+            check_prompt(prompt, candidate, system_prompt)
+            content = get_client().complete(messages, candidate, deadline=deadline, hedge_after=hedge_after,
+                                            allow_hedge=lambda: policy.allow(task_type),
+                                            max_retries=RETRIES_BEFORE_FALLBACK if has_fallback else None)
+        except PromptTooLargeError as e:
+            print(f"❌ {e} Not sent.")
+            if raise_errors:
+                raise
+            return None
+        except requests.exceptions.RequestException as e:
+            if has_fallback and _should_fall_back(e) and not deadline.expired():
+                print(f"↪️ {candidate} unavailable ({_error_summary(e)}); falling back to {models[index + 1]}.")
+                failed_attempts.append({"model": candidate, "error": _error_summary(e)})
+                continue
+            _record_call(task_type, candidate, prompt, system_prompt, started, None, route_index=index,
+                         failed_attempts=failed_attempts)
+            _report_api_error(e)
+            if raise_errors:
+                raise
+            return None
+        policy.observe(task_type, time.perf_counter() - attempt_started
+                       - (get_client().last_call() or {}).get("queue_wait", 0.0))
+        _record_call(task_type, candidate, prompt, system_prompt, started, content, route_index=index,
+                     failed_attempts=failed_attempts)
+        if index == 0:  # the key names the primary model; a fallback's answer is not its answer
+            llm_cache.put(key, task_type, content)
+        return content
+
+
+def stream_groq(prompt, task_type="create_project", system_prompt="You are a helpful assistant.", model=None,
+                timeout=None):
+    """
+    Streaming counterpart of call_groq: a generator of tokens as the model
+    produces them. The deadline (timeout) covers the wait for the first token.
+    """
+    started = time.perf_counter()
+    deadline = Deadline.for_task(task_type, timeout)
+    models = _models_for(task_type, model)
+    get_client().begin_call()
+    key = llm_cache.cache_key(models[0], system_prompt, prompt, DEFAULT_TEMPERATURE)
+    content = _cached(key, task_type)
+    if content is not None:
+        _record_call(task_type, models[0], prompt, system_prompt, started, content, streamed=True)
+        yield content
+        return
+    messages = _build_messages(prompt, system_prompt)
+    failed_attempts = []
+    for index, candidate in enumerate(models):
+        has_fallback = index + 1 < len(models)
+        get_client().begin_call()
+        parts = []
+        try:
+            check_prompt(prompt, candidate, system_prompt)
+            for token in get_client().stream(messages, candidate, deadline=deadline,
+                                             max_retries=RETRIES_BEFORE_FALLBACK if has_fallback else None):
+                parts.append(token)
+                yield token
+        except PromptTooLargeError as e:
+            print(f"❌ {e} Not sent.")
+            return
+        except requests.exceptions.RequestException as e:
+            # Only switch models if nothing has been shown to the user yet
+            if has_fallback and not parts and _should_fall_back(e) and not deadline.expired():
+                print(f"↪️ {candidate} unavailable ({_error_summary(e)}); falling back to {models[index + 1]}.")
+                failed_attempts.append({"model": candidate, "error": _error_summary(e)})
+                continue
+            _record_call(task_type, candidate, prompt, system_prompt, started, None, streamed=True,
+                         route_index=index, failed_attempts=failed_attempts)
+            print()
+            _report_api_error(e)
+            return
+        content = "".join(parts)
+        _record_call(task_type, candidate, prompt, system_prompt, started, content, streamed=True,
+                     route_index=index, failed_attempts=failed_attempts)
+        if index == 0:
+            llm_cache.put(key, task_type, content)
+        return
+
+
+def print_stream(tokens):
+    """Echo streamed tokens as they arrive and return the full text (None if nothing came back)."""
+    parts = []
+    for token in tokens:
+        print(token, end="", flush=True)
+        parts.append(token)
+    print()
+    return "".join(parts) or None
@@ -0,0 +1,148 @@
+# llm_cache.py
+# Content-addressed on-disk cache for Groq responses, shared by every aitalk process.
+
+import os
+import json
+import time
+import hashlib
+from system_utils import AITALK_HOME, atomic_write, FileLock
+
+CACHE_DIR = os.path.expanduser(os.getenv("AITALK_CACHE_DIR", os.path.join(AITALK_HOME, "cache")))
+CACHE_MAX_BYTES = int(float(os.getenv("AITALK_CACHE_MAX_MB", "200")) * 1024 * 1024)
+# Running total of the entry sizes, so a write only walks the cache when it is over the cap
+SIZE_FILE = os.path.join(CACHE_DIR, ".size")
+
+# How long a response stays valid, per task type (seconds). 0 = never cache.
+TASK_TTL_SECONDS = {
+    "create_project": 7 * 24 * 3600,
+    "generate_prompt": 30 * 24 * 3600,
+    "generate_project_name": 30 * 24 * 3600,
+    "fix_package_json": 24 * 3600,
+    "update_project": 24 * 3600,
+    "summarize": 24 * 3600,
+    "explain_x": 3600,
+    "chat": 0,
+}
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+_enabled = os.getenv("AITALK_NO_CACHE", "").lower() not in ("1", "true", "yes")
+
+
+def disable():
+    """Bypass the cache for the rest of this process (aitalk --no-cache)."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled(task_type):
+    return _enabled and TASK_TTL_SECONDS.get(task_type, DEFAULT_TTL_SECONDS) > 0
+
+
+def cache_key(model, system_prompt, prompt, temperature):
+    payload = json.dumps([model, system_prompt, prompt, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.json")
+
+
+def get(key, task_type):
+    """Return the cached response for key, or None if missing/expired."""
+    if not is_enabled(task_type):
+        return None
+    path = _entry_path(key)
+    try:
+        with open(path, 'r') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    ttl = TASK_TTL_SECONDS.get(task_type, DEFAULT_TTL_SECONDS)
+    if time.time() - entry.get("created_at", 0) > ttl:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            _add_to_size(-size)
+        except OSError:
+            pass
+        return None
+    try:
+        # mtime doubles as the LRU timestamp used by evict()
+        os.utime(path, None)
+    except OSError:
+        pass
+    return entry.get("content")
+
+
+def _read_size():
+    try:
+        with open(SIZE_FILE, "r") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _add_to_size(delta):
+    """Add delta bytes to the running total; returns the new total, or None if it is not known yet."""
+    with FileLock(os.path.join(CACHE_DIR, ".lock")):
+        total = _read_size()
+        if total is None:
+            return None
+        total = max(total + delta, 0)
+        atomic_write(SIZE_FILE, str(total))
+        return total
+
+
+def put(key, task_type, content):
+    if not content or not is_enabled(task_type):
+        return
+    entry = {
+        "task_type": task_type,
+        "created_at": time.time(),
+        "content": content,
+    }
+    path = _entry_path(key)
+    data = json.dumps(entry)
+    try:
+        replaced = os.path.getsize(path) if os.path.exists(path) else 0
+        atomic_write(path, data)
+        total = _add_to_size(len(data.encode("utf-8")) - replaced)
+        if total is None or total > CACHE_MAX_BYTES:
+            evict()
+    except OSError as e:
+        print(f"⚠️ Could not write LLM cache entry: {e}")
+
+
+def evict(max_bytes=None):
+    """
+    Delete least-recently-used entries until the cache fits in max_bytes. Walks the
+    whole cache, so put() only calls it when the running total is over the cap (or
+    not known yet); the walk also resets the running total to the real size.
+    """
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with FileLock(os.path.join(CACHE_DIR, ".lock")):
+        entries = []
+        total = 0
+        for root, _dirs, files in os.walk(CACHE_DIR):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        if total > max_bytes:
+            # Trim to 90% of the cap so we don't evict again on the very next write
+            target = int(max_bytes * 0.9)
+            for _mtime, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+        atomic_write(SIZE_FILE, str(total))
@@ -0,0 +1,102 @@
+# npm_cache.py
+# Shared npm package cache and a library of resolved lockfiles for generated projects.
+#
+# Every install uses one cache directory with --prefer-offline, so packages downloaded
+# for one project are reused by the next. After a successful install the project's
+# package-lock.json is stored under a key of its normalised dependency set; a later
+# project with the same dependencies starts from that lockfile and skips resolution.
+
+import os
+import json
+import hashlib
+from system_utils import AITALK_HOME, atomic_write, make_dir
+
+NPM_CACHE_ENABLED = os.getenv("AITALK_NPM_CACHE", "1").lower() not in ("0", "false", "no")
+NPM_CACHE_DIR = os.path.expanduser(os.getenv("AITALK_NPM_CACHE_DIR", os.path.join(AITALK_HOME, "npm-cache")))
+LOCKFILE_DIR = os.path.expanduser(os.getenv("AITALK_LOCKFILE_DIR", os.path.join(AITALK_HOME, "lockfiles")))
+
+DEPENDENCY_FIELDS = ("dependencies", "devDependencies", "optionalDependencies", "peerDependencies", "overrides")
+
+
+def normalised_dependencies(package_json):
+    """The parts of package.json that decide what npm resolves, with stable ordering and spacing."""
+    normalised = {}
+    for field in DEPENDENCY_FIELDS:
+        value = package_json.get(field)
+        if isinstance(value, dict) and value:
+            normalised[field] = {name.strip().lower(): " ".join(str(spec).split())
+                                 for name, spec in value.items()}
+    return normalised
+
+
+def dependency_key(package_json):
+    blob = json.dumps(normalised_dependencies(package_json), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def read_package_json(base_path):
+    try:
+        with open(os.path.join(base_path, "package.json"), "r") as f:
+            package_json = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return package_json if isinstance(package_json, dict) else None
+
+
+def install_command():
+    """npm install against the shared cache, preferring cached packages over the network."""
+    if not NPM_CACHE_ENABLED:
+        return ["npm", "install"]
+    make_dir(NPM_CACHE_DIR)
+    return ["npm", "install", "--prefer-offline", "--no-audit", "--no-fund", "--cache", NPM_CACHE_DIR]
+
+
+def _lockfile_path(key):
+    return os.path.join(LOCKFILE_DIR, f"{key}.json")
+
+
+def restore_lockfile(base_path):
+    """
+    Copy a stored lockfile matching the project's dependencies into base_path.
+    Returns the dependency key (None if caching is off or package.json is unreadable)
+    and whether a lockfile was restored.
+    """
+    package_json = read_package_json(base_path) if NPM_CACHE_ENABLED else None
+    if package_json is None:
+        return None, False
+    key = dependency_key(package_json)
+    lock_path = os.path.join(base_path, "package-lock.json")
+    if os.path.exists(lock_path):
+        return key, False  # never replace a lockfile the project already has
+    try:
+        with open(_lockfile_path(key), "r") as f:
+            lockfile = json.load(f)
+    except (OSError, ValueError):
+        return key, False
+    # The stored lockfile came from another project; only the root package's name differs
+    for root in (lockfile, lockfile.get("packages", {}).get("")):
+        if isinstance(root, dict):
+            for field in ("name", "version"):
+                if field in package_json:
+                    root[field] = package_json[field]
+    atomic_write(lock_path, json.dumps(lockfile, indent=2) + "\n")
+    return key, True
+
+
+def store_lockfile(base_path, key):
+    """Save the project's lockfile for its dependency set after a successful install."""
+    if not key:
+        return
+    package_json = read_package_json(base_path)
+    if package_json is None or dependency_key(package_json) != key:
+        return  # package.json changed during the install; the lockfile belongs to neither
+    try:
+        with open(os.path.join(base_path, "package-lock.json"), "r") as f:
+            content = f.read()
+        json.loads(content)
+    except (OSError, ValueError):
+        return
+    try:
+        atomic_write(_lockfile_path(key), content)
+    except OSError as e:
+        print(f"⚠️ Could not store lockfile in {LOCKFILE_DIR}: {e}")
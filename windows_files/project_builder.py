@@ -2,15 +2,35 @@ import sys
 import io
 import os
 import json
-import subprocess
 import re
-from system_utils import make_dir, write_file, run_command
-from groq_client import call_groq
+from system_utils import make_dir, write_file
+from groq_client import call_groq, get_client, GroqRateLimitError
+from build_scheduler import build_dependency_graph, graph_depth, run_graph, BUILD_CONCURRENCY
+from context_selector import select_context, context_tokens, format_outlines
+from context_compressor import memo_stats
+from bulk_manifest import generate_manifest, BULK_MAX_FILES
+from build_manifest import BuildManifest, find_unfinished_builds, content_hash, BUILD_MANIFEST_NAME
+from templates import render_templates, template_context
+from npm_cache import install_command, restore_lockfile, store_lockfile
+from npm_repair import parse_npm_errors, describe, apply_local_fixes, llm_repair, NPM_REPAIR_ROUNDS
+from validator import validate_project, VALIDATION_ROUNDS
+from process_runner import get_runner, run_step, run_chain
+from dev_server import free_port, run_foreground, start_detached, DEV_SERVER_PID_FILE, DEV_SERVER_LOG_FILE
+import plan_cache
+from plan_cache import PLAN_REUSE_THRESHOLD, PLAN_SEED_THRESHOLD
 import json5
 import shutil
 import time
+import asyncio
 import threading
 
+_print_lock = threading.Lock()
+
+def log(message):
+    """print() for concurrent generation workers, one whole line at a time."""
+    with _print_lock:
+        print(message, flush=True)
+
 # --- Meta-prompt generators ---
 
 def generate_prompt_for_file_list(description):
@@ -27,10 +47,17 @@ Return ONLY the prompt string to use. Do NOT include markdown or explanation.
         sys.exit(1)
     return prompt_string.strip().replace('“', '"').replace('”', '"')
 
-def generate_prompt_for_file_content(description, filepath, previous_files):
+def generate_prompt_for_file_content(description, filepath, previous_files, all_files=None, stubs=None,
+                                     problems=None):
     context_str = ""
     for fpath, content in previous_files.items():
         context_str += f"\nFile: {fpath}\n---\n{content}\n---\n"
+    stubs_str = format_outlines(stubs or {})
+    problems_str = ""
+    if problems:
+        problems_str = ("\nA previous version of this file was rejected by a syntax check:\n"
+                        + "".join(f"- {problem}\n" for problem in problems)
+                        + "The new version must not have these problems.\n")
 
     meta_prompt = f"""
 You are a prompt engineer creating an ultra-precise prompt for an LLM that generates the full content of a single file in a modern React project.
@@ -38,11 +65,17 @@ You are a prompt engineer creating an ultra-precise prompt for an LLM that gener
 Project Description:
 \"\"\"{description}\"\"\"
 
+All files in this project (import only from these):
+{", ".join(all_files or [filepath])}
+
 Previously generated files with their content:
 {context_str}
 
-Now generate the full content of the file: "{filepath}"
+Other generated files (outlines only: imports, exports, signatures, selectors, dependencies):
+{stubs_str or " none"}
 
+Now generate the full content of the file: "{filepath}"
+{problems_str}
 RULES:
 - Output only valid file content, no markdown or explanation.
 - If it's JSON (like package.json), return valid JSON.
@@ -136,9 +169,61 @@ def get_file_list(description):
         print("Error:", e)
         sys.exit(1)
 
-def get_file_content_with_context(description, filepath, previous_files):
-    prompt = generate_prompt_for_file_content(description, filepath, previous_files)
-    response = call_groq(prompt, task_type="create_project")
+def generate_prompt_for_seeded_plan(description, similar):
+    return f"""
+You are planning the files of a modern, production-ready React 18 app for this description:
+\"\"\"{description}\"\"\"
+
+A similar app was built earlier from this description:
+\"\"\"{similar['description']}\"\"\"
+with these files:
+{json.dumps(similar['file_list'])}
+
+Adapt that file list to the new description: keep the files it still needs, drop the ones it does not and add any that are missing.
+Also give the app a short hyphenated name (lowercase, no spaces, no punctuation), like "{similar.get('name') or 'admin-dashboard'}".
+
+Return ONLY a JSON object like {{"name": "todo-app", "files": ["package.json", "src/index.js", "public/index.html"]}}, with no explanations and no markdown.
+"""
+
+def get_seeded_plan(description, similar):
+    """(file_list, project_name) from one call that adapts a similar cached plan, or None."""
+    response = call_groq(generate_prompt_for_seeded_plan(description, similar), task_type="create_project")
+    candidate = extract_first_json_object(response or "")
+    plan = json.loads(candidate) if candidate else {}
+    files = plan.get("files") if isinstance(plan, dict) else None
+    if not isinstance(files, list) or not files or not all(isinstance(f, str) for f in files):
+        return None
+    name = re.sub(r"[^\w\-]", "", str(plan.get("name") or "").strip().lower()) or similar.get("name") or "react-app"
+    return files, name
+
+def plan_project(description):
+    """
+    (file_list, project_name): reused from the plan cache when an earlier description is
+    close enough, adapted from a similar cached plan in one call, or planned from scratch.
+    """
+    start = time.perf_counter()
+    similar, score = plan_cache.lookup(description)
+    if similar and score >= PLAN_REUSE_THRESHOLD:
+        plan_cache.touch(similar)
+        print(f"♻️ Reusing the plan of a similar earlier build ({score:.2f} similar to \"{similar['description']}\"): "
+              f"{len(similar['file_list'])} files, name \"{similar.get('name')}\" "
+              f"(planned in {time.perf_counter() - start:.3f}s).")
+        return list(similar["file_list"]), similar.get("name") or get_project_name_from_description(description)
+    plan = None
+    if similar and score >= PLAN_SEED_THRESHOLD:
+        print(f"🌱 Adapting the plan of a similar earlier build ({score:.2f} similar to \"{similar['description']}\")...")
+        plan = get_seeded_plan(description, similar)
+        if plan is None:
+            print("⚠️ Could not read the adapted plan; planning from scratch.")
+    if plan is None:
+        plan = get_file_list(description), get_project_name_from_description(description)
+    print(f"🗺️ Planned {len(plan[0])} files in {time.perf_counter() - start:.2f}s.")
+    plan_cache.store(description, *plan)
+    return plan
+
+def get_file_content_with_context(description, filepath, previous_files, all_files=None, stubs=None, problems=None):
+    prompt = generate_prompt_for_file_content(description, filepath, previous_files, all_files, stubs, problems)
+    response = call_groq(prompt, task_type="create_project", raise_errors=True)
     if not response:
         raise RuntimeError(f"Groq API did not return content for {filepath}.")
     cleaned = response.strip()
@@ -146,97 +231,312 @@ def get_file_content_with_context(description, filepath, previous_files):
     cleaned = re.sub(r"```$", "", cleaned).strip()
     return cleaned
 
-def build_project(description):
-    file_list = get_file_list(description)
-    project_name = get_project_name_from_description(description)
-    base_path = get_unique_project_dir(project_name)
-    print(f"📁 Creating project in: {base_path}")
-    make_dir(base_path)
+def finalise_package_json(content):
+    """package.json as it is written to disk: plain JSON with browserslist, react-scripts and a start script."""
+    json_content = extract_first_json_object(content)
+    if not json_content:
+        log("⚠️ Warning: Could not extract a valid JSON object from package.json content.")
+        return content
+    try:
+        pkg = json.loads(json_content)
+    except Exception as e:
+        log(f"⚠️ Warning: Could not parse extracted package.json content: {e}")
+        return content
+    # Add browserslist only if not already present
+    if "browserslist" not in pkg:
+        pkg["browserslist"] = {
+            "production": [
+                ">0.2%",
+                "not dead",
+                "not op_mini all"
+            ],
+            "development": [
+                "last 1 chrome version",
+                "last 1 firefox version",
+                "last 1 safari version"
+            ]
+        }
+    # --- Inject react-scripts and start script ---
+    scripts = pkg.setdefault('scripts', {})
+    dependencies = pkg.setdefault('dependencies', {})
+    if 'start' not in scripts:
+        scripts['start'] = 'react-scripts start'
+    if 'react-scripts' not in dependencies:
+        dependencies['react-scripts'] = '5.0.1'
+    return json.dumps(pkg, indent=2)
+
+def write_generated_file(base_path, rel_path, content):
+    """Write one generated file (patching package.json on the way) and return what ended up on disk."""
+    file_path = os.path.join(base_path, rel_path)
+    make_dir(os.path.dirname(file_path))
+    log(f"💾 Writing file: {file_path}")
+    if rel_path == 'package.json':
+        content = finalise_package_json(content)
+    write_file(file_path, content)
+    return content
+
+def save_generated_file(base_path, rel_path, content, manifest, source="llm"):
+    manifest.mark_done(rel_path, write_generated_file(base_path, rel_path, content), source)
+
+def package_json_hash(base_path):
+    try:
+        with open(os.path.join(base_path, "package.json"), "r", encoding="utf-8") as f:
+            return content_hash(f.read())
+    except OSError:
+        return None
 
-    # Save context of generated files
-    files_content = {}
-    failed_files = []
+class BackgroundInstall:
+    """
+    `npm install` on the step runner, started as soon as package.json is written. If
+    package.json changes while it runs (regenerated after validation, say), the install
+    is stopped and started again; if it changes after the install, the next start() or
+    join() installs again.
+    """
+
+    def __init__(self, base_path):
+        self.base_path = base_path
+        self.future = None
+        self.started = None
+        self.installed_hash = None  # package.json the last started install is for
+
+    async def _install(self):
+        while True:
+            self.installed_hash = package_json_hash(self.base_path)
+            step = asyncio.ensure_future(npm_install_step(self.base_path))
+            while not step.done():
+                await asyncio.wait({step}, timeout=PACKAGE_JSON_POLL_SECONDS)
+                if not step.done() and package_json_hash(self.base_path) != self.installed_hash:
+                    log("📦 package.json changed; restarting npm install...")
+                    step.cancel()  # kills npm
+                    await asyncio.gather(step, return_exceptions=True)
+                    break
+            else:
+                if package_json_hash(self.base_path) == self.installed_hash:
+                    return step.result()
+                log("📦 package.json changed during npm install; installing again...")
+
+    def start(self):
+        if self.future is None:
+            log("📦 package.json is ready; starting npm install in the background...")
+            self.started = time.perf_counter()
+        elif not self.future.done() or package_json_hash(self.base_path) == self.installed_hash:
+            return  # running installs watch package.json themselves
+        else:
+            log("📦 package.json changed after npm install; installing again...")
+        self.future = get_runner().submit(self._install())
 
-    print("🔄 Starting sequential generation with context passing...")
-    i = 0
-    while i < len(file_list):
-        rel_path = file_list[i]
-        print(f"📝 Generating content for: {rel_path} with context of {len(files_content)} files")
+    def join(self):
+        """Wait for the install of the current package.json (starting it if needed); returns (success, output)."""
+        self.start()
+        wait_start = time.perf_counter()
+        try:
+            result = self.future.result()
+        except Exception as e:  # reported like a failed install
+            return False, str(e)
+        waited = time.perf_counter() - wait_start
+        print(f"⏱️ npm install took {result.elapsed:.1f}s; {max(result.elapsed - waited, 0):.1f}s of it "
+              f"overlapped with file generation and git.")
+        return result.ok, result.output
+
+def get_bulk_manifest(description):
+    print(f"📦 Requesting the whole project as one manifest (up to {BULK_MAX_FILES} files)...")
+    start = time.perf_counter()
+
+    def on_file(rel_path):
+        log(f"⏱️ {rel_path} generated in {time.perf_counter() - start:.2f}s (bulk manifest)")
+
+    manifest = generate_manifest(description, on_file)
+    for rel_path in manifest.truncated:
+        print(f"✂️ {rel_path} was cut off in the manifest.")
+    return manifest
+
+def generate_files(description, file_list, files_content, failed_files, base_path, manifest, pending=None,
+                   on_saved=None, problems=None):
+    """
+    Generate the pending files (default: all of file_list) in dependency
+    order, adding results to files_content and failures to failed_files.
+    Each file is written and recorded in the build manifest as soon as it is
+    ready, then passed to on_saved(rel_path). problems maps files being
+    regenerated to what the validator found wrong with them.
+    """
+    graph = build_dependency_graph(file_list, pending)
+    print(f"🔄 Generating {len(graph)} files in {graph_depth(graph)} dependency levels, "
+          f"up to {BUILD_CONCURRENCY} at a time...")
+    context_stats = {"sent": 0, "everything": 0, "outlined_files": 0, "outline_tokens": 0, "verbatim_tokens": 0}
+    memo_before = memo_stats("outline")
+
+    def generate(rel_path, dependencies):
+        # Whole files for the few this file most depends on, outlines for the rest
+        generated = files_content.copy()
+        compression = {}
+        context, stubs = select_context(rel_path, dependencies, generated, file_list, stats=compression)
+        sent = context_tokens(context, stubs)
+        with _print_lock:
+            context_stats["sent"] += sent
+            context_stats["everything"] += context_tokens(generated, {})
+            for key, value in compression.items():
+                context_stats[key] += value
+        log(f"📝 Generating content for: {rel_path} with context of {len(context)} files "
+            f"+ {len(stubs)} outlines (~{sent} tokens)")
 
         retries = 0
         max_retries = 5
         while retries < max_retries:
             try:
-                content = get_file_content_with_context(description, rel_path, files_content)
+                file_start = time.perf_counter()
+                content = get_file_content_with_context(description, rel_path, context, file_list, stubs,
+                                                        (problems or {}).get(rel_path))
                 files_content[rel_path] = content
-                i += 1  # Only advance index if successful
-                break  # Success, move to next file
-            except Exception as e:
-                error_message = str(e).lower()
-                if "rate limit" in error_message or "429" in error_message:
-                    wait_time = 5 * (retries + 1)
-                    print(f"⚠️ Rate limit hit. Waiting {wait_time}s before retrying ({retries+1}/{max_retries})...")
-                    time.sleep(wait_time)
-                    retries += 1
+                save_generated_file(base_path, rel_path, content, manifest)
+                if on_saved:
+                    on_saved(rel_path)
+                last_call = get_client().last_call() or {}
+                if last_call.get("cache_hit"):
+                    source = "cache hit"
                 else:
-                    print(f"❌ Failed to generate {rel_path}: {e}")
-                    failed_files.append(rel_path)
-                    i += 1  # Skip failed file and move on
-                    break
-        else:
-            print(f"❌ Giving up on {rel_path} after {max_retries} retries.")
-            failed_files.append(rel_path)
-            i += 1
+                    source = "reused connection" if last_call.get("reused_connection") else "new connection"
+                    if last_call.get("hedge_won"):
+                        source += ", hedged copy won"
+                log(f"⏱️ {rel_path} generated in {time.perf_counter() - file_start:.2f}s ({source})")
+                return
+            except GroqRateLimitError as e:
+                # The client already paced and retried this call; back off harder before the next round
+                wait_time = get_client().limiter_for(e.model).backoff(retries + 3, e.retry_after)
+                log(f"⚠️ Rate limit hit on {rel_path}. Waiting {wait_time:.0f}s before retrying ({retries+1}/{max_retries})...")
+                time.sleep(wait_time)
+                retries += 1
+            except Exception as e:
+                log(f"❌ Failed to generate {rel_path}: {e}")
+                failed_files.append(rel_path)
+                manifest.mark_failed(rel_path, e)
+                return
+        log(f"❌ Giving up on {rel_path} after {max_retries} retries.")
+        failed_files.append(rel_path)
+        manifest.mark_failed(rel_path, f"rate limited after {max_retries} retries")
+
+    run_graph(graph, generate)
+    failed_files.sort(key=file_list.index)
+    if context_stats["everything"]:
+        saved = 100 * (1 - context_stats["sent"] / context_stats["everything"])
+        print(f"📉 Context sent: ~{context_stats['sent']} tokens vs ~{context_stats['everything']} "
+              f"if every generated file were included ({saved:.0f}% less).")
+    if context_stats["verbatim_tokens"]:
+        computed, reused = (now - before for now, before in zip(memo_stats("outline"), memo_before))
+        saved = 100 * (1 - context_stats["outline_tokens"] / context_stats["verbatim_tokens"])
+        print(f"🗜️ Related files sent as outlines: ~{context_stats['outline_tokens']} tokens instead of "
+              f"~{context_stats['verbatim_tokens']} whole ({saved:.0f}% less); "
+              f"{computed} outlines computed, {reused} reused.")
+
+def validate_generated_files(description, file_list, files_content, failed_files, base_path, manifest,
+                             on_saved=None):
+    """Syntax-check every file; regenerate only the broken ones, telling the LLM what was wrong."""
+    for attempt in range(VALIDATION_ROUNDS + 1):
+        problems, elapsed = validate_project(files_content, file_list)
+        print(f"🔍 Validated {len(files_content)} files in {elapsed * 1000:.0f}ms: "
+              f"{f'{len(problems)} with problems' if problems else 'no problems found'}.")
+        for rel_path, found in problems.items():
+            print(f"   ❗ {rel_path}: {'; '.join(found)}")
+        if not problems:
+            return
+        if attempt == VALIDATION_ROUNDS:
+            print(f"⚠️ {len(problems)} file(s) still fail validation after {VALIDATION_ROUNDS} regeneration round(s).")
+            return
+        print(f"🔁 Regenerating {len(problems)} file(s) with the validator's findings "
+              f"(round {attempt + 1}/{VALIDATION_ROUNDS})...")
+        for rel_path in problems:
+            if rel_path in failed_files:
+                failed_files.remove(rel_path)
+        generate_files(description, file_list, files_content, failed_files, base_path, manifest,
+                       list(problems), on_saved=on_saved, problems=problems)
+
+def build_project(description, run_post_steps=True, mode="files", detach=False):
+    build_start = time.perf_counter()
+    for project_dir in find_unfinished_builds(description):
+        print(f"💡 An unfinished build of this description is in {project_dir}. "
+              f"Run `aitalk --resume {project_dir}` to finish it instead.")
+    # Save context of generated files
+    files_content = {}
 
-    # Write files to disk
+    if mode == "bulk":
+        manifest = get_bulk_manifest(description)
+        file_list = manifest.all_files()
+        files_content.update(manifest.files)
+        project_name = re.sub(r"[^\w\-]", "", (manifest.project_name or "").lower())
+        if not file_list:
+            print("⚠️ The manifest contained no files; falling back to per-file generation.")
+            file_list = get_file_list(description)
+        if not project_name:
+            project_name = get_project_name_from_description(description)
+        plan_cache.store(description, file_list, project_name)
+    else:
+        file_list, project_name = plan_project(description)
+    base_path = get_unique_project_dir(project_name)
+    print(f"📁 Creating project in: {base_path}")
+    make_dir(base_path)
+    manifest = BuildManifest.create(base_path, description, file_list, mode, project_name)
     for rel_path, content in files_content.items():
-        file_path = os.path.join(base_path, rel_path)
-        make_dir(os.path.dirname(file_path))
-        print(f"💾 Writing file: {file_path}")
-
-        if rel_path == 'package.json':
-            json_content = extract_first_json_object(content)
-            if json_content:
-                try:
-                    parsed_json = json.loads(json_content)
-                    # Add browserslist only if not already present
-                    if "browserslist" not in parsed_json:
-                        parsed_json["browserslist"] = {
-                            "production": [
-                                ">0.2%",
-                                "not dead",
-                                "not op_mini all"
-                            ],
-                            "development": [
-                                "last 1 chrome version",
-                                "last 1 firefox version",
-                                "last 1 safari version"
-                            ]
-                        }
-                    content = json.dumps(parsed_json, indent=2)
-                except Exception as e:
-                    print(f"⚠️ Warning: Could not parse extracted package.json content: {e}")
-            else:
-                print("⚠️ Warning: Could not extract a valid JSON object from package.json content.")
-
-        write_file(file_path, content)
-
-        # --- Inject react-scripts and start script if this is package.json ---
-        if rel_path == 'package.json':
-            package_path = file_path
-            try:
-                with open(package_path, 'r') as f:
-                    pkg = json.load(f)
-                scripts = pkg.setdefault('scripts', {})
-                dependencies = pkg.setdefault('dependencies', {})
-                if 'start' not in scripts:
-                    scripts['start'] = 'react-scripts start'
-                if 'react-scripts' not in dependencies:
-                    dependencies['react-scripts'] = '5.0.1'
-                with open(package_path, 'w') as f:
-                    json.dump(pkg, f, indent=2)
-            except Exception as e:
-                print(f"⚠️ Could not patch react-scripts/start script in package.json: {e}")
+        save_generated_file(base_path, rel_path, content, manifest)
+
+    return complete_build(description, base_path, file_list, files_content, manifest, run_post_steps, build_start,
+                          detach)
+
+def resume_project(project_dir, run_post_steps=True, detach=False):
+    """Finish an interrupted --create-project build from its build manifest."""
+    build_start = time.perf_counter()
+    project_dir = os.path.abspath(project_dir)
+    manifest = BuildManifest.load(project_dir)
+    if manifest is None:
+        print(f"❌ No build manifest ({BUILD_MANIFEST_NAME}) found in {project_dir}.")
+        return False
+    files_content = manifest.completed_files()
+    print(f"♻️ Resuming \"{manifest.description}\" in {project_dir}: "
+          f"{len(files_content)} of {len(manifest.file_list)} files already generated.")
+    return complete_build(manifest.description, project_dir, manifest.file_list, files_content, manifest,
+                          run_post_steps, build_start, detach)
+
+def complete_build(description, base_path, file_list, files_content, manifest, run_post_steps, build_start,
+                   detach=False):
+    """
+    Generate whatever is still missing, then report and run the git/npm steps.
+    Returns False if the project could not be installed or (detached) its dev server
+    did not become ready, otherwise the dev server's outcome or None when skipped.
+    """
+    failed_files = []
+    # npm install only needs package.json, so it runs while the other files are generated
+    install = BackgroundInstall(base_path) if run_post_steps else None
+
+    def installed():
+        """Whether a previous run of this build already installed the current package.json."""
+        return (manifest.step_done("install", package_json_hash(base_path))
+                and os.path.isdir(os.path.join(base_path, "node_modules")))
+
+    def on_saved(rel_path):
+        if install and rel_path == 'package.json' and not installed():
+            install.start()
+
+    if 'package.json' in files_content:
+        on_saved('package.json')  # already written by a bulk manifest or a previous run
+    pending = [rel_path for rel_path in file_list if rel_path not in files_content]
+    if files_content and pending:
+        print(f"🔁 {len(pending)} file(s) still to generate: {', '.join(pending)}")
+
+    # Boilerplate comes from the local template store instead of the LLM
+    context = template_context(description, manifest.project_name, file_list)
+    rendered = render_templates(pending, context)
+    for rel_path, (content, version) in rendered.items():
+        files_content[rel_path] = content
+        save_generated_file(base_path, rel_path, content, manifest, source=f"template:{version}")
+        on_saved(rel_path)
+        print(f"🧩 {rel_path} rendered from template ({version})")
+    pending = [rel_path for rel_path in pending if rel_path not in rendered]
+    if pending:
+        generate_files(description, file_list, files_content, failed_files, base_path, manifest, pending,
+                       on_saved=on_saved)
+    validate_generated_files(description, file_list, files_content, failed_files, base_path, manifest, on_saved)
+    print(f"⏱️ Generation finished in {time.perf_counter() - build_start:.2f}s: {get_client().connection_summary()}")
+    sources = [entry.get("source", "llm") for entry in manifest.data["files"].values() if entry.get("status") == "done"]
+    templated = sum(1 for source in sources if source.startswith("template:"))
+    print(f"🧩 Templates: {templated} file(s) rendered locally, {len(sources) - templated} generated by the LLM.")
 
     if failed_files:
         print("⚠️ The following files failed to generate:")
@@ -245,166 +545,178 @@ def build_project(description):
     else:
         print("✅ All files generated successfully.")
 
+    if not run_post_steps:
+        print("⏭️ Skipping git init, npm install and npm start (--no-install).")
+        return
+
     # ------------------------------
     # Now run git init, npm install, npm run start
     # ------------------------------
-
-    # Run `git init`
-    git_init_success = safe_run_command(["git", "init"], cwd=base_path)
-    if git_init_success:
-        # Make initial commit with message
-        safe_run_command(["git", "add", "."], cwd=base_path)
-        safe_run_command(["git", "commit", "-m", "Initial commit from our amazing kickass tool aitalk by Divyansh"], cwd=base_path)
+    ensure_gitignore(base_path, manifest)
+
+    # git runs on the step runner alongside the background npm install; steps a
+    # previous run of this build finished (see the manifest) are skipped
+    git_steps = [
+        ("git init", ["git", "init"], {"cwd": base_path, "retries": 3, "env": STEP_ENV}),
+        # npm install may still be writing the lockfile; it is committed once the install is done.
+        # node_modules and aitalk's own files are in .gitignore (see ensure_gitignore): naming
+        # ignored paths in an exclude pathspec would make git add fail
+        ("git add", ["git", "add", "--all", "--", ".", ":(exclude)package-lock.json"],
+         {"cwd": base_path, "retries": 3, "env": STEP_ENV}),
+        ("git commit", ["git", "commit", "-m", "Initial commit from our amazing kickass tool aitalk by Divyansh"],
+         {"cwd": base_path, "retries": 3, "env": STEP_ENV}),
+    ]
+    post_start = install.started or time.perf_counter()
+    git_ok = manifest.step_done("git")
+    if git_ok:
+        print("⏭️ git init, add and commit already done by an earlier run; skipping.")
     else:
-        print("⚠️ git init failed, skipping git commit steps.")
+        git_results = get_runner().run(run_chain(git_steps))
+        git_ok = git_results[-1].ok
+        if git_ok:
+            manifest.mark_step("git")
+        else:
+            print(f"⚠️ {git_results[-1].name} failed, skipping the remaining git steps.")
 
-    # Run npm install
-    npm_success, npm_output = safe_run_command(["npm", "install"], cwd=base_path, capture_output=True)
+    # Wait for the background npm install
+    if install.future is None and installed():
+        print("⏭️ npm install already done for this package.json by an earlier run; skipping.")
+        npm_success, npm_output = True, ""
+    else:
+        npm_success, npm_output = install.join()
+    report = get_runner().timing_report(time.perf_counter() - post_start)
+    if report:
+        print(report)
 
     if not npm_success:
-        print("❌ npm install failed. Attempting auto-repair via Groq...")
-
-        package_path = os.path.join(base_path, "package.json")
-        if not os.path.exists(package_path):
-            print("❌ No package.json found to repair.")
-            return
-
-        with open(package_path, "r") as f:
-            package_json_text = f.read()
-
-        all_files = {}
-        for root, dirs, files in os.walk(base_path):
-            for file in files:
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, base_path)
-                try:
-                    with open(full_path, "r") as f:
-                        all_files[rel_path] = f.read()
-                except Exception:
-                    continue
-
-        repair_prompt = f"""
-You are an expert in fixing npm errors in React projects.
-
-The following `npm install` failed with this error:
-{npm_output[:5000]}
-
-Below is the current `package.json` file:
-{package_json_text}
-
-Please fix the `package.json` and return ONLY the fixed JSON (no explanation, no backticks, no markdown).
-
-Make sure the new version fixes the issue and contains required dependencies for a modern React 18 app.
-"""
-        fixed_package = call_groq(repair_prompt, task_type="fix_package_json")
-        cleaned_package = extract_first_json_object(fixed_package)
-        if cleaned_package:
-            try:
-                parsed_fixed = json.loads(cleaned_package)
-
-                # Inject browserslist again if needed
-                if "browserslist" not in parsed_fixed:
-                    parsed_fixed["browserslist"] = {
-                        "production": [
-                            ">0.2%",
-                            "not dead",
-                            "not op_mini all"
-                        ],
-                        "development": [
-                            "last 1 chrome version",
-                            "last 1 firefox version",
-                            "last 1 safari version"
-                        ]
-                    }
-
-                with open(package_path, "w") as f:
-                    json.dump(parsed_fixed, f, indent=2)
-
-                print("🔁 Replacing package.json and retrying npm install...")
-
-                clean_node_modules(base_path)
-                retry_success, _ = safe_run_command(["npm", "install"], cwd=base_path, capture_output=True)
-
-                if retry_success:
-                    print("✅ npm install fixed and completed!")
-                    run_npm_start_with_auto_confirm(base_path)
-                else:
-                    print("❌ npm install failed even after repair.")
-            except Exception as e:
-                print("❌ Could not parse repaired package.json:", e)
-        else:
-            print("❌ Groq did not return a valid package.json.")
+        print("❌ npm install failed. Diagnosing...")
+        if not repair_npm_install(base_path, npm_output):
+            return False
+        print("✅ npm install fixed and completed!")
     else:
         print("✅ npm install succeeded. Starting project...")
-        run_npm_start_with_auto_confirm(base_path)
-
-def run_npm_start_with_auto_confirm(cwd):
-    print("🚀 Running npm start...")
-
-    process = subprocess.Popen(
-        ["npm", "start"],
-        cwd=cwd,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-        bufsize=1
-    )
-
-    def monitor_output():
-        sent_yes = False
+    manifest.mark_step("install", package_json_hash(base_path))
+    if git_ok:
+        commit_lockfile(base_path, manifest)
+    return run_npm_start_with_auto_confirm(base_path, detach)
+
+def ensure_gitignore(base_path, manifest):
+    """
+    Make sure .gitignore lists node_modules and aitalk's own files (build manifest, dev
+    server PID and log), creating or appending to it whatever the plan generated.
+    """
+    path = os.path.join(base_path, ".gitignore")
+    try:
+        with open(path, "r") as f:
+            content = f.read()
+    except OSError:
+        content = ""
+    listed = {line.strip().strip("/") for line in content.splitlines()}
+    missing = [entry for entry in ("/node_modules", BUILD_MANIFEST_NAME, DEV_SERVER_PID_FILE, DEV_SERVER_LOG_FILE)
+               if entry.strip("/") not in listed]
+    if not missing:
+        return
+    content += ("\n" if content and not content.endswith("\n") else "") + ("\n" if content else "")
+    content += "# aitalk\n" + "".join(f"{entry}\n" for entry in missing)
+    write_file(path, content)
+    print(f"🙈 Added {', '.join(missing)} to .gitignore.")
+    if manifest.data["files"].get(".gitignore", {}).get("status") == "done":
+        # keep the manifest's hash current, so a resume doesn't take this for a user edit
+        manifest.mark_done(".gitignore", content, manifest.data["files"][".gitignore"].get("source", "llm"))
+
+def commit_lockfile(base_path, manifest):
+    """
+    Commit the lockfile npm install wrote, with package.json and .npmrc in case a repair
+    changed them (legacy-peer-deps lives in .npmrc), so a fresh clone installs the same way.
+    """
+    lockfile_path = os.path.join(base_path, "package-lock.json")
+    if not os.path.exists(lockfile_path):
+        return True
+    paths = ["package.json", "package-lock.json"]
+    if os.path.exists(os.path.join(base_path, ".npmrc")):
+        paths.append(".npmrc")
+    contents = []
+    for rel_path in paths:
+        with open(os.path.join(base_path, rel_path), "r", encoding="utf-8") as f:
+            contents.append(f.read())
+    lockfile_hash = content_hash("\0".join(contents[1:]))
+    if manifest.step_done("lockfile", lockfile_hash):
+        print("⏭️ package-lock.json already committed by an earlier run; skipping.")
+        return True
+    results = get_runner().run(run_chain([
+        ("git add lockfile", ["git", "add", "--"] + paths, {"cwd": base_path, "env": STEP_ENV}),
+        ("git commit lockfile", ["git", "commit", "-m", "Add package-lock.json from npm install", "--"] + paths,
+         {"cwd": base_path, "env": STEP_ENV}),
+    ]))
+    if not results[-1].ok:
+        print(f"⚠️ {results[-1].name} failed; package-lock.json is not committed.")
+    else:
+        manifest.mark_step("lockfile", lockfile_hash)
+    return results[-1].ok
+
+def repair_npm_install(base_path, npm_output):
+    """Fix package.json from npm's errors (locally when possible, else via Groq) and reinstall."""
+    if not os.path.exists(os.path.join(base_path, "package.json")):
+        print("❌ No package.json found to repair.")
+        return False
+    applied = set()
+    for attempt in range(1, NPM_REPAIR_ROUNDS + 1):
+        findings = parse_npm_errors(npm_output)
+        for finding in findings:
+            print(f"🔎 {describe(finding)}")
         try:
-            for line in process.stdout:
-                print(line, end="")  # Print npm output to console
-
-                # Match the prompt more loosely
-                if (
-                    "would you like to run the app on another port" in line.lower()
-                    and not sent_yes
-                ):
-                    print("⚠️ Port 3000 is busy. Auto-confirming port change...")
-                    try:
-                        process.stdin.write("Y\n")
-                        process.stdin.flush()
-                        sent_yes = True
-                    except Exception as e:
-                        print(f"❌ Failed to send input to process: {e}")
-        except Exception as e:
-            print(f"❌ Error reading output: {e}")
-
-    thread = threading.Thread(target=monitor_output)
-    thread.start()
-    process.wait()
-    thread.join()
+            changes = apply_local_fixes(base_path, findings, applied) or llm_repair(base_path, findings, npm_output)
+        except (OSError, ValueError) as e:
+            print("❌ Could not repair package.json:", e)
+            return False
+        if not changes:
+            print("❌ No fix found for this npm error.")
+            return False
+        for change in changes:
+            print(f"🔧 {change}")
+        print(f"🔁 Retrying npm install (repair {attempt}/{NPM_REPAIR_ROUNDS})...")
+        clean_node_modules(base_path)
+        success, npm_output = npm_install(base_path)
+        if success:
+            return True
+    print("❌ npm install failed even after repair.")
+    return False
+
+def run_npm_start_with_auto_confirm(cwd, detach=False):
+    """
+    Start the dev server: in the foreground until it is stopped, or with detach=True
+    only until it is ready. Returns whether it started (and, detached, became ready).
+    """
+    print("🚀 Running npm start..." + (" (detached)" if detach else ""))
+    # Without a terminal the dev server exits instead of asking about a busy port, so pick a free one
+    preferred = int(os.environ.get("PORT", "3000"))
+    port = free_port(preferred)
+    if port != preferred:
+        print(f"⚠️ Port {preferred} is busy. Starting on port {port} instead...")
+    if detach:
+        return start_detached(cwd, port)
+    ok = run_foreground(cwd, port)
     print("✅ npm start completed.")
+    return ok
 
 # Utilities
 
-def safe_run_command(cmd, cwd=None, max_retries=3, capture_output=False):
-    env = os.environ.copy()
-    env["CI"] = "true"
-    for attempt in range(1, max_retries + 1):
-        try:
-            print(f"🔄 Running command (attempt {attempt}): {' '.join(cmd)}")
-            result = subprocess.run(
-                cmd,
-                cwd=cwd,
-                env=env,
-                check=True,
-                capture_output=capture_output,
-                text=True
-            )
-            return True if not capture_output else (True, result.stdout)
-        except subprocess.CalledProcessError as e:
-            print(f"⚠️ Command failed on attempt {attempt}: {e}")
-            if capture_output and e.stderr:
-                return False, e.stderr
-            if attempt < max_retries:
-                print("⏳ Retrying after 5 seconds...")
-                time.sleep(5)
-            else:
-                print("❌ Maximum retries reached. Giving up.")
-                return False if not capture_output else (False, e.stderr or "")
+STEP_ENV = {"CI": "true"}
+PACKAGE_JSON_POLL_SECONDS = 0.5
+
+async def npm_install_step(base_path):
+    """npm install through the shared package cache, starting from a stored lockfile when one matches."""
+    key, restored = restore_lockfile(base_path)
+    if restored:
+        log(f"📦 Reusing a cached lockfile for this dependency set ({key[:12]}).")
+    result = await run_step("npm install", install_command(), cwd=base_path, env=STEP_ENV)
+    if result.ok:
+        store_lockfile(base_path, key)
+    return result
+
+def npm_install(base_path):
+    result = get_runner().run(npm_install_step(base_path))
+    return result.ok, result.output
 
 def clean_node_modules(base_path):
     node_modules_path = os.path.join(base_path, 'node_modules')
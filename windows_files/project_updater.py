@@ -0,0 +1,277 @@
+# project_updater.py
+# --update-project: apply a change to a project created by --create-project,
+# regenerating only the files the change affects and leaving the rest untouched.
+
+import os
+import re
+import sys
+import time
+import difflib
+from groq_client import call_groq, get_client
+from build_manifest import BuildManifest, BUILD_MANIFEST_NAME
+from build_scheduler import build_dependency_graph, run_graph
+from context_selector import select_context, signature, import_graph, format_outlines
+from validator import validate_project, VALIDATION_ROUNDS
+from bulk_manifest import strip_code_fences
+from system_utils import atomic_write_many
+from project_builder import (log, extract_first_json_array, finalise_package_json, npm_install,
+                             repair_npm_install)
+
+UPDATE_MAX_FILES = int(os.getenv("AITALK_UPDATE_MAX_FILES", "8"))
+
+IGNORED_PARTS = {"node_modules", ".git", "build", "dist"}
+STOPWORDS = {"about", "after", "also", "change", "could", "every", "from", "have", "into", "make",
+             "more", "should", "some", "than", "that", "them", "then", "there", "this", "when",
+             "with", "would", "instead", "please", "app", "page", "file", "files", "update"}
+
+
+def read_project_files(project_dir, file_list):
+    """{rel_path: content} for the files of file_list that are on disk."""
+    files = {}
+    for rel_path in file_list:
+        try:
+            with open(os.path.join(project_dir, rel_path), "r") as f:
+                files[rel_path] = f.read()
+        except (OSError, UnicodeDecodeError):
+            continue
+    return files
+
+
+def clean_path(path):
+    """A project-relative path the LLM suggested, or None if it points outside the project."""
+    if not isinstance(path, str) or not path.strip():
+        return None
+    path = re.sub(r"^(\.?/)+", "", path.strip().replace("\\", "/"))  # "./src/x.js" and "/src/x.js" mean src/x.js
+    path = os.path.normpath(path).replace("\\", "/")
+    parts = path.split("/")
+    if os.path.isabs(path) or ".." in parts or IGNORED_PARTS & set(parts) or path == BUILD_MANIFEST_NAME:
+        return None
+    return path
+
+
+def generate_prompt_for_affected_files(description, change, files_content, file_list):
+    outline = "\n".join(f"- {path}: {signature(path, files_content[path])}" if path in files_content else f"- {path}"
+                        for path in file_list)
+    return f"""
+You are maintaining an existing React project that was built from this description:
+\"\"\"{description}\"\"\"
+
+Its files, with what each one exports:
+{outline}
+
+Requested change:
+\"\"\"{change}\"\"\"
+
+Which files must be modified or created to make this change? Only list files that really need to change.
+New files are allowed, with paths relative to the project root.
+
+Return ONLY a JSON array of at most {UPDATE_MAX_FILES} file paths, with no explanation.
+"""
+
+
+def select_affected_files_llm(description, change, files_content, file_list):
+    response = call_groq(generate_prompt_for_affected_files(description, change, files_content, file_list),
+                         task_type="update_project")
+    if re.fullmatch(r"\s*\[\s*\]\s*", response or ""):
+        return []
+    try:
+        paths = extract_first_json_array(response or "")
+    except ValueError:
+        return None
+    selected = [clean_path(p) for p in paths]
+    return list(dict.fromkeys(p for p in selected if p))[:UPDATE_MAX_FILES]
+
+
+def infer_affected_files(change, files_content, file_list):
+    """
+    Without the LLM: files whose path or content mention words of the change, plus the
+    files importing them (which render them and may have to pass new props along).
+    """
+    words = {w for w in re.findall(r"[a-z][a-z0-9]{3,}", change.lower()) if w not in STOPWORDS}
+    scores = {}
+    for path, content in files_content.items():
+        if path.endswith(".json"):
+            continue
+        name, text = path.lower(), content.lower()
+        score = sum(3 for w in words if w in name) + sum(1 for w in words if w in text)
+        if score:
+            scores[path] = score
+    if scores:
+        best = max(scores.values())
+        seeds = [p for p in file_list if scores.get(p, 0) * 2 >= best]
+    else:
+        seeds = [p for p in ("src/App.js", "src/App.jsx", "src/App.tsx") if p in files_content][:1]
+    graph = import_graph(files_content, file_list)
+    importers = [p for p in file_list if graph.get(p, set()) & set(seeds) and not p.endswith(".json")]
+    return list(dict.fromkeys(seeds + importers))[:UPDATE_MAX_FILES]
+
+
+def generate_prompt_for_file_update(description, change, filepath, current, context, stubs, all_files,
+                                    problems=None):
+    context_str = "".join(f"\nFile: {fpath}\n---\n{content}\n---\n" for fpath, content in context.items())
+    stubs_str = format_outlines(stubs)
+    if current is None:
+        current_str = f'"{filepath}" does not exist yet; create it.'
+    else:
+        current_str = f'Current content of "{filepath}":\n---\n{current}\n---'
+    problems_str = ""
+    if problems:
+        problems_str = ("\nA previous version of this update was rejected by a syntax check:\n"
+                        + "".join(f"- {problem}\n" for problem in problems)
+                        + "The new version must not have these problems.\n")
+    return f"""
+You are updating one file of an existing React project.
+
+Project Description:
+\"\"\"{description}\"\"\"
+
+Requested change:
+\"\"\"{change}\"\"\"
+
+All files in this project (import only from these):
+{", ".join(all_files)}
+
+Related files with their current content:
+{context_str or " none"}
+
+Other files (outlines only: imports, exports, signatures, selectors, dependencies):
+{stubs_str or " none"}
+
+{current_str}
+{problems_str}
+Now return the full updated content of the file: "{filepath}"
+
+RULES:
+- Change only what the requested change needs; keep everything else exactly as it is.
+- Output only valid file content, no markdown or explanation.
+- If it's JSON (like package.json), return valid JSON.
+- Do NOT add backticks, markdown, or any explanation.
+
+Return ONLY the file content as plain text.
+"""
+
+
+def regenerate(description, change, targets, files_content, all_files, problems=None):
+    """New content for each target (in dependency order, so later files see earlier updates)."""
+    working = dict(files_content)
+    updated, failed = {}, []
+
+    def generate(rel_path, dependencies):
+        others = {p: c for p, c in working.items() if p != rel_path}
+        context, stubs = select_context(rel_path, dependencies, others, all_files)
+        log(f"📝 Updating {rel_path} with context of {len(context)} files + {len(stubs)} outlines")
+        prompt = generate_prompt_for_file_update(description, change, rel_path, files_content.get(rel_path),
+                                                 context, stubs, all_files, (problems or {}).get(rel_path))
+        try:
+            content = strip_code_fences(call_groq(prompt, task_type="update_project", raise_errors=True) or "")
+        except Exception as e:
+            log(f"❌ Failed to update {rel_path}: {e}")
+            failed.append(rel_path)
+            return
+        if not content:
+            log(f"❌ Groq returned nothing for {rel_path}.")
+            failed.append(rel_path)
+            return
+        if rel_path == "package.json":
+            content = finalise_package_json(content)
+        # Keep the file's trailing newline convention so unchanged lines diff as unchanged
+        if files_content.get(rel_path, "").endswith("\n") and not content.endswith("\n"):
+            content += "\n"
+        updated[rel_path] = content
+        working[rel_path] = content
+
+    run_graph(build_dependency_graph(all_files, targets), generate)
+    return updated, failed
+
+
+def print_diff(rel_path, old, new):
+    lines = difflib.unified_diff((old or "").splitlines(keepends=True), new.splitlines(keepends=True),
+                                 fromfile="/dev/null" if old is None else f"a/{rel_path}",
+                                 tofile=f"b/{rel_path}")
+    for line in lines:
+        print(line if line.endswith("\n") else line + "\n", end="")
+
+
+def confirm(question):
+    """Ask on the terminal; without one (piped, scripts, CI) nothing is applied unless --yes was given."""
+    if not sys.stdin.isatty():
+        print("ℹ️ Not running in a terminal, so not applying without confirmation; pass --yes to apply.")
+        return False
+    return input(f"{question} [y/N] ").strip().lower() in ("y", "yes")
+
+
+def update_project(project_dir, change, run_post_steps=True, select="llm", assume_yes=False, dry_run=False):
+    """Apply `change` to a generated project, regenerating only the files it affects."""
+    start = time.perf_counter()
+    project_dir = os.path.abspath(project_dir)
+    manifest = BuildManifest.load(project_dir)
+    if manifest is None:
+        print(f"❌ No build manifest ({BUILD_MANIFEST_NAME}) found in {project_dir}; "
+              f"only projects created by aitalk --create-project can be updated.")
+        return
+    file_list = manifest.file_list
+    files_content = read_project_files(project_dir, file_list)
+    print(f"🛠️ Updating \"{manifest.description}\" in {project_dir} ({len(files_content)} files): {change}")
+
+    targets = None
+    if select == "llm":
+        print("🔎 Asking Groq which files this change affects...")
+        targets = select_affected_files_llm(manifest.description, change, files_content, file_list)
+        if targets is None:
+            print("⚠️ Could not read Groq's answer; inferring affected files from the import graph instead.")
+    if targets is None:
+        targets = infer_affected_files(change, files_content, file_list)
+    if not targets:
+        print("✅ Nothing in this project needs to change.")
+        return
+    new_files = [p for p in targets if p not in files_content]
+    all_files = list(dict.fromkeys(file_list + new_files))
+    print(f"🎯 {len(targets)} file(s) affected: {', '.join(targets)}"
+          + (f" ({len(new_files)} new)" if new_files else ""))
+
+    updated, failed = regenerate(manifest.description, change, targets, files_content, all_files)
+    for _ in range(VALIDATION_ROUNDS):
+        problems, _ = validate_project(updated, all_files)
+        if not problems:
+            break
+        for rel_path, found in problems.items():
+            print(f"   ❗ {rel_path}: {'; '.join(found)}")
+        print(f"🔁 Regenerating {len(problems)} file(s) with the validator's findings...")
+        fixed, _ = regenerate(manifest.description, change, list(problems), dict(files_content, **updated),
+                              all_files, problems)
+        updated.update(fixed)
+    else:
+        problems, _ = validate_project(updated, all_files)
+        if problems:
+            print(f"⚠️ Still failing validation: {', '.join(problems)}")
+
+    changed = {p: c for p, c in updated.items() if files_content.get(p) != c}
+    unchanged = [p for p in updated if p not in changed]
+    for rel_path in all_files:
+        if rel_path in changed:
+            print_diff(rel_path, files_content.get(rel_path), changed[rel_path])
+    calls = get_client().connection_summary()
+    print(f"📊 {len(changed)} file(s) changed, {len(unchanged)} came back identical, {len(failed)} failed; "
+          f"{len(files_content) - len(set(changed) & set(files_content))} file(s) untouched. {calls}")
+    if failed:
+        print(f"⚠️ Could not update: {', '.join(failed)}")
+    if not changed:
+        return
+    if dry_run:
+        print("🔍 Dry run: nothing was written.")
+        return
+    if not assume_yes and not confirm("Apply these changes?"):
+        print("↩️ Changes discarded.")
+        return
+
+    atomic_write_many(project_dir, changed)
+    manifest.record_update(change, changed)
+    print(f"✅ Updated {len(changed)} file(s) in {time.perf_counter() - start:.2f}s.")
+
+    if "package.json" in changed and run_post_steps:
+        print("📦 package.json changed; running npm install...")
+        success, output = npm_install(project_dir)
+        if not success:
+            print("❌ npm install failed. Diagnosing...")
+            if repair_npm_install(project_dir, output):
+                print("✅ npm install fixed and completed!")
@@ -1,5 +1,6 @@
 import os
 import subprocess
+import threading
 
 def make_dir(path):
     os.makedirs(path, exist_ok=True)
@@ -12,4 +13,77 @@ def run_command(command, cwd=None):
     print(f"👉 Running: {' '.join(command)} in {cwd or os.getcwd()}")
     result = subprocess.run(command, cwd=cwd)
     if result.returncode != 0:
-        print(f"❌ Command failed: {' '.join(command)}")
\ No newline at end of file
+        print(f"❌ Command failed: {' '.join(command)}")
+
+# Per-user state directory for caches, metrics and config (override with AITALK_HOME)
+AITALK_HOME = os.path.expanduser(os.getenv("AITALK_HOME", "~/.aitalk"))
+
+def aitalk_path(*parts):
+    path = os.path.join(AITALK_HOME, *parts)
+    make_dir(os.path.dirname(path))
+    return path
+
+def atomic_write(filepath, content):
+    """Write via a temp file + rename so readers never see a half-written file."""
+    make_dir(os.path.dirname(filepath) or ".")
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, filepath)
+
+def atomic_write_many(base_path, files):
+    """
+    Write {rel_path: content} under base_path as one step: every file goes to a temp file
+    first and only then are they renamed into place, so a failure leaves the tree unchanged.
+    """
+    staged = []
+    try:
+        for rel_path, content in files.items():
+            filepath = os.path.join(base_path, rel_path)
+            make_dir(os.path.dirname(filepath) or ".")
+            tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+            staged.append((tmp_path, filepath))
+            with open(tmp_path, 'w') as f:
+                f.write(content)
+    except OSError:
+        for tmp_path, _ in staged:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+    for tmp_path, filepath in staged:
+        os.replace(tmp_path, filepath)
+
+class FileLock:
+    """Exclusive inter-process lock on a lock file (fcntl on macOS/Linux, msvcrt on Windows)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        make_dir(os.path.dirname(self.path) or ".")
+        self._file = open(self.path, 'a+')
+        if os.name == 'nt':
+            import msvcrt
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if os.name == 'nt':
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
@@ -0,0 +1,300 @@
+# validator.py
+# Syntax checks for generated files, run before anything tries to install or start them.
+#
+# JSON is parsed; JS/JSX and CSS go through a small tokenizer that checks brackets,
+# quotes, comments and JSX tags without understanding the grammar; relative imports
+# must point at a file in the project. Larger projects are checked in a process pool.
+
+import os
+import json
+import time
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from context_selector import parse_imports, resolve_import
+
+VALIDATION_ROUNDS = int(os.getenv("AITALK_VALIDATION_ROUNDS", "2"))
+VALIDATION_WORKERS = int(os.getenv("AITALK_VALIDATION_WORKERS", "0")) or min(os.cpu_count() or 1, 8)
+# Below this many files starting worker processes costs more than the checks themselves
+POOL_MIN_FILES = 24
+
+JS_EXTENSIONS = (".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs")
+CSS_EXTENSIONS = (".css", ".scss", ".less")
+CLOSERS = {")": "(", "]": "[", "}": "{"}
+# After one of these (or at the start of the file) "/" starts a regex and "<" can start JSX
+EXPRESSION_START = set("([{,;:=!&|?+-*%~^<>")
+EXPRESSION_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "yield", "await",
+                       "void", "delete", "new", "throw", "instanceof"}
+
+
+def _line(content, pos):
+    return content.count("\n", 0, pos) + 1
+
+
+def _scan_string(content, i, quote):
+    """Index just past the string literal starting at i, or None if it never ends on its line."""
+    j = i + 1
+    while j < len(content):
+        ch = content[j]
+        if ch == "\\":
+            j += 2
+            continue
+        if ch == quote:
+            return j + 1
+        if ch == "\n":
+            return None
+        j += 1
+    return None
+
+
+def _scan_template(content, j):
+    """Scan template literal text from j; returns (index, "end" | "expr" | None for unterminated)."""
+    while j < len(content):
+        ch = content[j]
+        if ch == "\\":
+            j += 2
+        elif ch == "`":
+            return j + 1, "end"
+        elif content.startswith("${", j):
+            return j + 2, "expr"
+        else:
+            j += 1
+    return j, None
+
+
+def _tag_name(content, i):
+    j = i
+    while j < len(content) and (content[j].isalnum() or content[j] in "_$.:-"):
+        j += 1
+    return content[i:j], j
+
+
+def check_js_syntax(content, jsx=True):
+    """First bracket, quote, comment or JSX tag problem in JS/JSX source as "line N: ...", or None."""
+    stack = []  # (kind, position, tag name); kind is "(", "[", "{", "${", "tag" or "children"
+    n = len(content)
+    i = 0
+    prev, word = "", ""  # last significant character and identifier in JS code
+
+    def opening(pos):
+        kind, start, name = stack[pos]
+        return f"<{name}>" if kind in ("tag", "children") else f"'{kind}'", _line(content, start)
+
+    while i < n:
+        ch = content[i]
+        mode = stack[-1][0] if stack else "{"
+
+        if mode == "tag":
+            if ch in "\"'":
+                end = content.find(ch, i + 1)
+                if end == -1:
+                    return f"line {_line(content, i)}: unterminated attribute string"
+                i = end + 1
+            elif ch == "{":
+                stack.append(("{", i, ""))
+                prev, word = "{", ""
+                i += 1
+            elif content.startswith("/>", i):
+                stack.pop()
+                prev, word = "a", ""
+                i += 2
+            elif ch == ">":
+                _, start, name = stack.pop()
+                stack.append(("children", start, name))
+                i += 1
+            else:
+                i += 1
+            continue
+
+        if mode == "children":
+            if ch == "{":
+                stack.append(("{", i, ""))
+                prev, word = "{", ""
+                i += 1
+            elif content.startswith("</", i):
+                name, j = _tag_name(content, i + 2)
+                end = content.find(">", j)
+                if end == -1:
+                    return f"line {_line(content, i)}: unterminated closing tag </{name}"
+                _, start, opened = stack.pop()
+                if name != opened:
+                    return (f"line {_line(content, i)}: </{name}> does not match <{opened}> "
+                            f"opened on line {_line(content, start)}")
+                prev, word = "a", ""
+                i = end + 1
+            elif ch == "<" and i + 1 < n and (content[i + 1].isalpha() or content[i + 1] in "_$>"):
+                name, j = _tag_name(content, i + 1)
+                stack.append(("tag", i, name))
+                i = j
+            else:
+                i += 1  # JSX text: quotes and apostrophes are just text here
+            continue
+
+        # JavaScript
+        expression_start = prev == "" or prev in EXPRESSION_START or (prev == "a" and word in EXPRESSION_KEYWORDS)
+        if ch.isspace():
+            i += 1
+        elif content.startswith("//", i):
+            end = content.find("\n", i)
+            i = n if end == -1 else end
+        elif content.startswith("/*", i):
+            end = content.find("*/", i + 2)
+            if end == -1:
+                return f"line {_line(content, i)}: unterminated /* comment"
+            i = end + 2
+        elif ch in "\"'":
+            end = _scan_string(content, i, ch)
+            if end is None:
+                return f"line {_line(content, i)}: unterminated string"
+            i, prev, word = end, "a", ""
+        elif ch == "`":
+            end, state = _scan_template(content, i + 1)
+            if state is None:
+                return f"line {_line(content, i)}: unterminated template literal"
+            if state == "expr":
+                stack.append(("${", i, ""))
+                prev, word = "{", ""
+            else:
+                prev, word = "a", ""
+            i = end
+        elif ch == "/" and expression_start:
+            # A regex literal if it closes on this line; otherwise treat it as division
+            j, in_class = i + 1, False
+            while j < n and content[j] != "\n":
+                if content[j] == "\\":
+                    j += 1
+                elif content[j] == "[":
+                    in_class = True
+                elif content[j] == "]":
+                    in_class = False
+                elif content[j] == "/" and not in_class:
+                    break
+                j += 1
+            if j < n and content[j] == "/":
+                i, prev, word = j + 1, "a", ""
+            else:
+                i, prev, word = i + 1, "/", ""
+        elif content.startswith("<<", i):
+            prev, word = "<", ""  # shift, not the start of a tag
+            i += 2
+        elif ch == "<" and jsx and expression_start and i + 1 < n and (content[i + 1].isalpha() or content[i + 1] in "_$>"):
+            name, j = _tag_name(content, i + 1)
+            stack.append(("tag", i, name))
+            i = j
+        elif ch in "([{":
+            stack.append((ch, i, ""))
+            prev, word = ch, ""
+            i += 1
+        elif ch in ")]}":
+            if not stack:
+                return f"line {_line(content, i)}: unexpected '{ch}'"
+            kind = stack[-1][0]
+            if ch == "}" and kind == "${":
+                stack.pop()
+                end, state = _scan_template(content, i + 1)
+                if state is None:
+                    return f"line {_line(content, i)}: unterminated template literal"
+                if state == "expr":
+                    stack.append(("${", i, ""))
+                    prev, word = "{", ""
+                else:
+                    prev, word = "a", ""
+                i = end
+                continue
+            if kind != CLOSERS[ch]:
+                what, line = opening(-1)
+                return f"line {_line(content, i)}: unexpected '{ch}', {what} from line {line} is still open"
+            stack.pop()
+            prev, word = ch, ""
+            i += 1
+        elif ch.isalnum() or ch in "_$":
+            j = i
+            while j < n and (content[j].isalnum() or content[j] in "_$"):
+                j += 1
+            prev, word = "a", content[i:j]
+            i = j
+        else:
+            prev, word = ch, ""
+            i += 1
+
+    if stack:
+        what, line = opening(-1)
+        return f"line {line}: {what} is never closed"
+    return None
+
+
+def check_css_syntax(content):
+    """Unbalanced braces, unterminated strings or comments in a stylesheet, or None."""
+    depth = []
+    i, n = 0, len(content)
+    while i < n:
+        ch = content[i]
+        if content.startswith("/*", i):
+            end = content.find("*/", i + 2)
+            if end == -1:
+                return f"line {_line(content, i)}: unterminated /* comment"
+            i = end + 2
+            continue
+        if ch in "\"'":
+            end = _scan_string(content, i, ch)
+            if end is None:
+                return f"line {_line(content, i)}: unterminated string"
+            i = end
+            continue
+        if ch == "{":
+            depth.append(i)
+        elif ch == "}":
+            if not depth:
+                return f"line {_line(content, i)}: unexpected '}}'"
+            depth.pop()
+        i += 1
+    if depth:
+        return f"line {_line(content, depth[-1])}: '{{' is never closed"
+    return None
+
+
+def validate_file(path, content, known_files):
+    """Problems found in one file, as a list of messages (empty when it looks fine)."""
+    problems = []
+    if path.endswith(".json"):
+        try:
+            json.loads(content)
+        except ValueError as e:
+            problems.append(f"invalid JSON: {e}")
+    elif path.endswith(JS_EXTENSIONS):
+        error = check_js_syntax(content, jsx=not path.endswith((".ts", ".mjs", ".cjs")))
+        if error:
+            problems.append(error)
+    elif path.endswith(CSS_EXTENSIONS):
+        error = check_css_syntax(content)
+        if error:
+            problems.append(error)
+    for spec in parse_imports(path, content):
+        if spec.startswith((".", "/")) and resolve_import(path, spec, known_files) is None:
+            problems.append(f"imports '{spec}', which is not a file in this project")
+    return problems
+
+
+def _validate_item(item, known_files):
+    path, content = item
+    return path, validate_file(path, content, known_files)
+
+
+def validate_project(files_content, all_files, max_workers=VALIDATION_WORKERS):
+    """
+    Check every file in files_content. Returns ({path: [problems]} for the files
+    with problems, seconds taken).
+    """
+    start = time.perf_counter()
+    known = frozenset(all_files) | frozenset(files_content)
+    items = sorted(files_content.items())
+    results = None
+    if max_workers > 1 and len(items) >= POOL_MIN_FILES:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                chunksize = max(1, len(items) // (max_workers * 4))
+                results = list(pool.map(_validate_item, items, repeat(known), chunksize=chunksize))
+        except (OSError, RuntimeError) as e:  # no fork/semaphores here, e.g. a locked-down sandbox
+            print(f"⚠️ Validating in-process ({e}).")
+    if results is None:
+        results = [_validate_item(item, known) for item in items]
+    return {path: problems for path, problems in results if problems}, time.perf_counter() - start